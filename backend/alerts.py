@@ -0,0 +1,388 @@
+"""
+🥓 Alert Rules
+Per-user rules like {"rsi_lt": 30, "volume_ratio_gt": 2} (same syntax as
+/api/screen), scoped to given symbols, to the user's watchlists, or to
+everything.
+
+Rules are not evaluated one by one. Every predicate sits in a sorted
+threshold array per (scope, field, op), so the predicates true for a value
+form one contiguous slice. When a symbol's value moves from old to new,
+the predicates that flipped are the slice between the two searchsorted cut
+points. Only rules owning a flipped predicate are re-checked, vectorized
+over all symbols of the snapshot at once. Alerts are edge-triggered:
+a rule fires when its conditions become true, not while they stay true.
+The first snapshot of a symbol is its baseline; a rule added through
+add() is checked once in full against the next snapshot, so it fires if
+it already holds.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from snapshot import NUMERIC_FIELDS
+
+FIELD_INDEX = {name: i for i, name in enumerate(NUMERIC_FIELDS)}
+OPS = ('lt', 'lte', 'gt', 'gte')
+OP_INDEX = {name: i for i, name in enumerate(OPS)}
+MAX_CONDITIONS = 4
+DEFAULT_COOLDOWN = 3600.0
+
+SCOPE_ALL = '*'
+SCOPE_WATCHLIST = '@watchlist'
+
+
+def parse_conditions(raw: Dict[str, float]) -> Tuple[Tuple[str, str, float], ...]:
+    """{"rsi_lt": 30} -> (("rsi", "lt", 30.0),); ValueError if invalid"""
+    conditions = []
+    for key, value in raw.items():
+        name, _, op = key.rpartition("_")
+        if name not in FIELD_INDEX or op not in OP_INDEX:
+            raise ValueError(f"Unknown condition '{key}'")
+        try:
+            conditions.append((name, op, float(value)))
+        except (TypeError, ValueError):
+            raise ValueError(f"Condition '{key}' needs a number, got '{value}'")
+    if not conditions:
+        raise ValueError("A rule needs at least one condition")
+    if len(conditions) > MAX_CONDITIONS:
+        raise ValueError(f"A rule has at most {MAX_CONDITIONS} conditions")
+    return tuple(conditions)
+
+
+@dataclass(slots=True)
+class Rule:
+    id: int
+    user_id: str
+    conditions: Tuple[Tuple[str, str, float], ...]
+    symbols: Optional[frozenset] = None  # None = every symbol (or the watchlists)
+    watchlist: bool = False
+    name: str = ""
+    cooldown: float = DEFAULT_COOLDOWN
+
+    @property
+    def scopes(self) -> Iterable[str]:
+        if self.symbols:
+            return self.symbols
+        return (SCOPE_WATCHLIST,) if self.watchlist else (SCOPE_ALL,)
+
+
+def rule_from_record(record: Dict) -> Rule:
+    """alert_rules row (database.py) -> Rule"""
+    return Rule(
+        id=record['id'],
+        user_id=record['user_id'],
+        conditions=parse_conditions(record['conditions']),
+        symbols=frozenset(record['symbols']) if record.get('symbols') else None,
+        watchlist=bool(record.get('watchlist')),
+        name=record.get('name') or "",
+        cooldown=float(record.get('cooldown_seconds') or DEFAULT_COOLDOWN),
+    )
+
+
+@dataclass(slots=True)
+class Alert:
+    rule_id: int
+    user_id: str
+    name: str
+    symbol: str
+    values: Dict[str, Optional[float]]
+    triggered_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'alert',
+            'rule_id': self.rule_id,
+            'user_id': self.user_id,
+            'name': self.name,
+            'symbol': self.symbol,
+            'values': self.values,
+            'triggered_at': self.triggered_at,
+        }
+
+
+# ============================================
+# INDEX
+# ============================================
+
+def _cuts(thresholds: np.ndarray, values: np.ndarray, op: int) -> np.ndarray:
+    """
+    Cut point per value: predicates true for it are thresholds[cut:] (lt/lte)
+    or thresholds[:cut] (gt/gte). NaN makes every predicate false.
+    """
+    side = 'right' if op in (0, 3) else 'left'
+    cuts = np.searchsorted(thresholds, values, side=side)
+    if op >= 2:
+        cuts[np.isnan(values)] = 0
+    return cuts
+
+
+class RuleIndex:
+    """
+    Rules compiled into padded condition arrays plus one sorted group per
+    (field, op). A group's entries are keyed by (scope segment, threshold
+    rank): segment 0 is every symbol, 1 the watchlists, 2.. one symbol each,
+    so one searchsorted finds the cut inside every segment a row belongs to.
+    """
+
+    def __init__(self):
+        self.rules: Dict[int, Rule] = {}
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._compiled = None
+        self._last: Dict[str, np.ndarray] = {}   # symbol -> field values seen last
+        self._fired: Dict[Tuple[int, str], float] = {}
+        self._pending: Set[int] = set()          # rules added since the last snapshot
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, rule: Rule):
+        with self._lock:
+            self.rules[rule.id] = rule
+            self._pending.add(rule.id)
+            self._dirty = True
+
+    def remove(self, rule_id: int):
+        with self._lock:
+            if self.rules.pop(rule_id, None) is not None:
+                self._pending.discard(rule_id)
+                self._dirty = True
+
+    def replace(self, rules: Iterable[Rule]):
+        with self._lock:
+            self.rules = {rule.id: rule for rule in rules}
+            self._pending &= set(self.rules)
+            self._dirty = True
+
+    def _compile(self):
+        with self._lock:
+            if not self._dirty:
+                return self._compiled
+            rules = list(self.rules.values())
+            self._dirty = False
+
+        count = len(rules)
+        fields = np.zeros((count, MAX_CONDITIONS), dtype=np.int64)
+        ops = np.zeros((count, MAX_CONDITIONS), dtype=np.int8)
+        thresholds = np.zeros((count, MAX_CONDITIONS), dtype=np.float64)
+        valid = np.zeros((count, MAX_CONDITIONS), dtype=bool)
+        segments = {SCOPE_ALL: 0, SCOPE_WATCHLIST: 1}
+        seg, pos_of, slot = [], [], []
+        for pos, rule in enumerate(rules):
+            for k, (name, op, value) in enumerate(rule.conditions):
+                fields[pos, k], ops[pos, k], thresholds[pos, k] = FIELD_INDEX[name], OP_INDEX[op], value
+                valid[pos, k] = True
+                for scope in rule.scopes:
+                    seg.append(segments.setdefault(scope, len(segments)))
+                    pos_of.append(pos)
+                    slot.append(k)
+
+        seg = np.asarray(seg, dtype=np.int64)
+        pos_of = np.asarray(pos_of, dtype=np.int64)
+        slot = np.asarray(slot, dtype=np.int64)
+        values = thresholds[pos_of, slot]
+        codes = fields[pos_of, slot] * len(OPS) + ops[pos_of, slot]
+        groups = {}
+        for code in np.unique(codes):
+            members = codes == code
+            unique, rank = np.unique(values[members], return_inverse=True)
+            keys = seg[members] * (len(unique) + 1) + rank
+            order = np.argsort(keys, kind='stable')
+            groups[divmod(int(code), len(OPS))] = (unique, keys[order], pos_of[members][order])
+
+        # v op t as one comparison: sign * (v - t) > 0 (lt, gt) or >= 0 (lte, gte)
+        signs = np.where(ops < 2, -1.0, 1.0)
+        strict = (ops == 0) | (ops == 2)
+        compiled = (rules, (fields, signs, thresholds, strict, valid), groups, segments)
+        with self._lock:
+            self._compiled = compiled
+        return compiled
+
+    # ---------- evaluation ----------
+
+    @staticmethod
+    def _flipped(group, old: np.ndarray, new: np.ndarray, op: int,
+                 rows: np.ndarray, segs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (row, rule position) pairs whose predicate went from false to true.
+        A rule can only become true through one of those.
+        """
+        unique, keys, positions = group
+        base = segs * (len(unique) + 1)
+        a = np.searchsorted(keys, base + _cuts(unique, old, op))
+        b = np.searchsorted(keys, base + _cuts(unique, new, op))
+        # lt/lte hold for keys[cut:], gt/gte for keys[:cut] within the segment
+        lo, hi = (b, a) if op < 2 else (a, b)
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        if not total:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return np.repeat(rows, counts), positions[np.arange(total) + starts]
+
+    @staticmethod
+    def _holds(values: np.ndarray, rows: np.ndarray, fields, signs, thresholds, strict, valid) -> np.ndarray:
+        """Whether each (row, rule) candidate has all its conditions true"""
+        d = (values[rows[:, None], fields] - thresholds) * signs
+        return ((d > 0) | (~strict & (d == 0)) | ~valid).all(axis=1)
+
+    def evaluate(self, rows: Iterable[Dict],
+                 subscribers: Callable[[str], Set[str]] = lambda symbol: set(),
+                 now: Optional[float] = None) -> List[Alert]:
+        """
+        Feed the latest rows ({"symbol": ..., "rsi": ...}) of a snapshot and
+        get the alerts that became true. subscribers(symbol) resolves
+        watchlist-scoped rules.
+        """
+        now = now or time.time()
+        rules, conditions, groups, segments = self._compile()
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        rows = [r for r in rows if r.get('symbol')]
+        if not rows:
+            with self._lock:
+                self._pending |= pending
+            return []
+
+        symbols = [r['symbol'] for r in rows]
+        new = np.array([[np.nan if r.get(f) is None else r[f] for f in NUMERIC_FIELDS] for r in rows],
+                       dtype=np.float64)
+        # A symbol seen for the first time is its own baseline: nothing flips
+        old = np.array([self._last.get(s, values) for s, values in zip(symbols, new)], dtype=np.float64)
+        for symbol, values in zip(symbols, new):
+            self._last[symbol] = values
+        if not rules:
+            return []
+
+        # Each row queries the global segments and its own symbol's segment
+        every_row = np.arange(len(rows))
+        own = [(i, segments[s]) for i, s in enumerate(symbols) if s in segments]
+        query_rows = np.concatenate([every_row, every_row, np.array([i for i, _ in own], dtype=np.int64)])
+        query_segs = np.concatenate([np.zeros(len(rows), np.int64), np.ones(len(rows), np.int64),
+                                     np.array([g for _, g in own], dtype=np.int64)])
+        pair_rows, pair_rules = [], []
+        for (f, op), group in groups.items():
+            moved = (old[query_rows, f] != new[query_rows, f]) & \
+                ~(np.isnan(old[query_rows, f]) & np.isnan(new[query_rows, f]))
+            if not moved.any():
+                continue
+            changed = query_rows[moved]
+            r, p = self._flipped(group, old[changed, f], new[changed, f], op, changed, query_segs[moved])
+            pair_rows.append(r)
+            pair_rules.append(p)
+
+        # New rules: every in-scope row, held against "was false before"
+        fresh = [pos for pos, rule in enumerate(rules) if rule.id in pending] if pending else []
+        for pos in fresh:
+            scope = every_row if not rules[pos].symbols else \
+                np.array([i for i, s in enumerate(symbols) if s in rules[pos].symbols], dtype=np.int64)
+            pair_rows.append(scope)
+            pair_rules.append(np.full(len(scope), pos, dtype=np.int64))
+        if not pair_rows:
+            return []
+
+        # Full conjunction before/after; a rule with two flipped predicates
+        # shows up twice, so de-duplicate what fired
+        cand_rows, cand_rules = np.concatenate(pair_rows), np.concatenate(pair_rules)
+        args = [column[cand_rules] for column in conditions]
+        before = self._holds(old, cand_rows, *args)
+        if fresh:
+            before &= ~np.isin(cand_rules, fresh)
+        fired = self._holds(new, cand_rows, *args) & ~before
+        keys = np.unique(cand_rows[fired] * len(rules) + cand_rules[fired])
+
+        alerts = []
+        watchers: Dict[str, Set[str]] = {}
+        latest = new.tolist()
+        for i, pos in zip((keys // len(rules)).tolist(), (keys % len(rules)).tolist()):
+            rule, symbol = rules[pos], symbols[i]
+            if rule.watchlist and not rule.symbols:
+                if symbol not in watchers:
+                    watchers[symbol] = subscribers(symbol)
+                if rule.user_id not in watchers[symbol]:
+                    continue
+            last = self._fired.get((rule.id, symbol))
+            if last is not None and now - last < rule.cooldown:
+                continue
+            self._fired[(rule.id, symbol)] = now
+            alerts.append(Alert(
+                rule_id=rule.id, user_id=rule.user_id, name=rule.name, symbol=symbol,
+                values={name: latest[i][FIELD_INDEX[name]] for name, _, _ in rule.conditions},
+                triggered_at=now,
+            ))
+        return alerts
+
+
+# ============================================
+# SINKS
+# ============================================
+
+class AlertSink:
+    """Where matched alerts go"""
+
+    def send(self, alerts: List[Alert]):
+        raise NotImplementedError
+
+
+class DiscordSink(AlertSink):
+    """Hands each alert to a Discord sender (main.send_discord_alert)"""
+
+    def __init__(self, post: Callable[[Alert], None], max_per_cycle: int = 25):
+        self.post = post
+        self.max_per_cycle = max_per_cycle
+
+    def send(self, alerts: List[Alert]):
+        for alert in alerts[:self.max_per_cycle]:
+            self.post(alert)
+        if len(alerts) > self.max_per_cycle:
+            print(f"⚠️  {len(alerts) - self.max_per_cycle} alerts not sent to Discord this cycle")
+
+
+class PusherSink(AlertSink):
+    """Any pusher with a non-blocking push_signal(dict) (e.g. BaconSignalPusher)"""
+
+    def __init__(self, pusher):
+        self.pusher = pusher
+
+    def send(self, alerts: List[Alert]):
+        for alert in alerts:
+            self.pusher.push_signal(alert.to_dict())
+
+
+class AlertEngine:
+    """Rule index + sinks; evaluate() once per snapshot"""
+
+    def __init__(self, sinks: Optional[List[AlertSink]] = None):
+        self.index = RuleIndex()
+        self.sinks: List[AlertSink] = list(sinks or [])
+        self.loaded_at: Optional[float] = None
+
+    def add_sink(self, sink: AlertSink):
+        self.sinks.append(sink)
+
+    def stats(self) -> Dict:
+        rules = list(self.index.rules.values())
+        return {
+            "rules": len(rules),
+            "users": len({rule.user_id for rule in rules}),
+            "symbol_rules": sum(1 for rule in rules if rule.symbols),
+            "watchlist_rules": sum(1 for rule in rules if rule.watchlist and not rule.symbols),
+            "sinks": [type(sink).__name__ for sink in self.sinks],
+            "loaded_at": self.loaded_at,
+        }
+
+    def evaluate(self, rows: Iterable[Dict], subscribers: Callable[[str], Set[str]] = lambda symbol: set()) -> List[Alert]:
+        alerts = self.index.evaluate(rows, subscribers)
+        for sink in self.sinks:
+            try:
+                sink.send(alerts)
+            except Exception as e:
+                print(f"❌ Alert sink {type(sink).__name__} failed: {e}")
+        return alerts
+
+
+ALERTS = AlertEngine()
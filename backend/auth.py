@@ -0,0 +1,46 @@
+"""
+🥓 Auth
+The Supabase user behind a request, from its access token: a JWT signed
+with the project's JWT secret (Settings > API). Per-user endpoints take the
+user from the token, never from the URL, since database.py uses the
+service key and bypasses row level security.
+
+Env: SUPABASE_JWT_SECRET, SUPABASE_JWT_AUDIENCE (default "authenticated")
+"""
+
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+
+class AuthError(Exception):
+    """A missing, malformed, expired or forged token"""
+
+
+def verify_token(token: str) -> str:
+    """Access token -> user id (the JWT's sub); AuthError otherwise"""
+    import jwt
+
+    secret = os.getenv("SUPABASE_JWT_SECRET")
+    if not secret:
+        raise AuthError("Authentication is not configured (SUPABASE_JWT_SECRET)")
+    try:
+        claims = jwt.decode(token, secret, algorithms=["HS256"],
+                            audience=os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated"),
+                            options={"require": ["exp", "sub"]})
+    except jwt.PyJWTError as e:
+        raise AuthError(f"Invalid token: {e}")
+    return str(claims["sub"])
+
+
+def current_user(authorization: Optional[str] = Header(None)) -> str:
+    """FastAPI dependency: "Authorization: Bearer <token>" -> user id, 401 otherwise"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Bearer token required",
+                            headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return verify_token(token.strip())
+    except AuthError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
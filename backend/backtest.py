@@ -0,0 +1,337 @@
+"""
+🥓 Vectorized Backtester
+Replays BaconScanner.calculate_tech_score and its ATR stop/target levels
+(bacon_scanner_complete.py) over historical 15m bars for a whole universe.
+
+Scores, signals, first-touch stop/target resolution and P&L are NumPy
+array operations over every bar of every symbol at once (indicators use
+pandas' vectorized ewm/rolling per symbol).
+
+Differences with the live scanner:
+- EMAs run over the continuous history instead of a fresh 5d window, so
+  they are fully warmed up
+- StockTwits cannot be replayed: the social score is a constant parameter
+- a trade that hits neither level within `max_hold` bars exits at the close
+
+Run:  python backtest.py --period 1y
+"""
+
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+MIN_BARS = 50  # scan_symbol skips symbols with fewer bars
+
+# Trade outcomes
+TARGET, STOP, TIMEOUT = 1, -1, 0
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    """Thresholds hard-coded in BaconScanner (defaults = live values)"""
+    min_score: int = 150
+    stop_atr: float = 1.0
+    target_atr: float = 3.0
+    rsi_core_low: float = 45
+    rsi_core_high: float = 65
+    rsi_wide_low: float = 40
+    rsi_wide_high: float = 70
+    vol_high: float = 2.0
+    vol_mid: float = 1.5
+    vol_low: float = 1.2
+    social_score: int = 0
+    max_hold: int = 26  # one regular US session of 15m bars
+
+
+class BarPanel:
+    """All symbols' bars concatenated into flat arrays + per-symbol offsets"""
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, symbols: List[str], offsets: np.ndarray, ts: np.ndarray,
+                 arrays: Dict[str, np.ndarray]):
+        self.symbols = symbols
+        self.offsets = offsets
+        self.ts = ts
+        for field in self.FIELDS:
+            setattr(self, field, arrays[field])
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "BarPanel":
+        symbols, lengths, ts, arrays = [], [], [], {f: [] for f in cls.FIELDS}
+        for symbol, df in frames.items():
+            if df is None or len(df) < MIN_BARS:
+                continue
+            symbols.append(symbol)
+            lengths.append(len(df))
+            index = pd.DatetimeIndex(df.index)
+            index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+            ts.append(index.as_unit('ns').asi8)
+            for field in cls.FIELDS:
+                arrays[field].append(df[field.capitalize()].to_numpy(np.float64))
+
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        concat = {f: (np.concatenate(a) if a else np.empty(0)) for f, a in arrays.items()}
+        return cls(symbols, offsets, np.concatenate(ts) if ts else np.empty(0, np.int64), concat)
+
+    def __len__(self):
+        return len(self.close)
+
+    def symbol_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.symbols)), np.diff(self.offsets))
+
+
+# ============================================
+# INDICATORS & SCORE
+# ============================================
+
+def compute_indicators(panel: BarPanel) -> Dict[str, np.ndarray]:
+    """calculate_indicators + ATR + 20-bar range for every bar"""
+    n = len(panel)
+    out = {k: np.full(n, np.nan) for k in
+           ('ema_9', 'ema_21', 'ema_50', 'rsi', 'vol_ratio', 'momentum', 'high_20', 'low_20', 'atr')}
+    bar_index = np.zeros(n, dtype=np.int64)
+
+    for i in range(len(panel.symbols)):
+        lo, hi = panel.offsets[i], panel.offsets[i + 1]
+        close = pd.Series(panel.close[lo:hi])
+        high = pd.Series(panel.high[lo:hi])
+        low = pd.Series(panel.low[lo:hi])
+        volume = pd.Series(panel.volume[lo:hi])
+
+        out['ema_9'][lo:hi] = close.ewm(span=9, adjust=False).mean()
+        out['ema_21'][lo:hi] = close.ewm(span=21, adjust=False).mean()
+        out['ema_50'][lo:hi] = close.ewm(span=50, adjust=False).mean()
+
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
+        out['rsi'][lo:hi] = 100 - (100 / (1 + gain / loss))
+
+        vol_avg = volume.rolling(window=20).mean()
+        out['vol_ratio'][lo:hi] = np.where(vol_avg > 0, volume / vol_avg, 0)
+
+        # data['Close'].iloc[-10] = 9 bars back
+        out['momentum'][lo:hi] = (close / close.shift(9) - 1) * 100
+        out['high_20'][lo:hi] = high.rolling(20).max()
+        out['low_20'][lo:hi] = low.rolling(20).min()
+
+        prev_close = close.shift()
+        true_range = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+        out['atr'][lo:hi] = pd.Series(true_range).rolling(window=14).mean()
+
+        bar_index[lo:hi] = np.arange(hi - lo)
+
+    out['bar_index'] = bar_index
+    return out
+
+
+def tech_score(panel: BarPanel, ind: Dict[str, np.ndarray], params: BacktestParams = BacktestParams()) -> np.ndarray:
+    """Vectorized BaconScanner.calculate_tech_score (0-200) for every bar"""
+    price = panel.close
+    ema_9, ema_21, ema_50 = ind['ema_9'], ind['ema_21'], ind['ema_50']
+    rsi, vol_ratio, momentum = ind['rsi'], ind['vol_ratio'], ind['momentum']
+
+    score = np.zeros(len(price), dtype=np.int32)
+
+    # 1. EMA Alignment (40 pts), bullish or bearish stack
+    bull = (ema_9 > ema_21) & (ema_21 > ema_50) & (price > ema_50)
+    bear = (ema_9 < ema_21) & (ema_21 < ema_50) & (price < ema_50)
+    score += np.where(bull | bear, 40, 0)
+
+    # 2. RSI (30 pts)
+    score += np.select(
+        [(rsi > params.rsi_core_low) & (rsi < params.rsi_core_high),
+         (rsi > params.rsi_wide_low) & (rsi < params.rsi_wide_high)],
+        [30, 15], 0)
+
+    # 3. Volume (40 pts)
+    score += np.select(
+        [vol_ratio > params.vol_high, vol_ratio > params.vol_mid, vol_ratio > params.vol_low],
+        [40, 25, 10], 0)
+
+    # 4. Price vs EMAs (30 pts)
+    score += np.where(price > ema_21, 15, 0) + np.where(price > ema_50, 15, 0)
+
+    # 5. Momentum (30 pts)
+    score += np.select([momentum > 1.0, momentum > 0.5], [30, 15], 0)
+
+    # 6. New High/Low (30 pts)
+    near_extreme = (price >= ind['high_20'] * 0.99) | (price <= ind['low_20'] * 1.01)
+    score += np.where(near_extreme, 30, 0)
+
+    return score
+
+
+# ============================================
+# SIMULATION
+# ============================================
+
+@dataclass
+class BacktestResult:
+    symbols: List[str]
+    symbol_id: np.ndarray
+    entry_ts: np.ndarray
+    direction: np.ndarray   # +1 BUY / -1 SELL
+    entry: np.ndarray
+    stop: np.ndarray
+    target: np.ndarray
+    exit: np.ndarray
+    bars_held: np.ndarray
+    outcome: np.ndarray     # TARGET / STOP / TIMEOUT
+    pnl_pct: np.ndarray
+    r_multiple: np.ndarray
+
+    def summary(self) -> Dict:
+        trades = len(self.outcome)
+        if trades == 0:
+            return {'trades': 0}
+        wins = self.outcome == TARGET
+        return {
+            'trades': trades,
+            'win_rate': round(float(wins.mean()), 4),
+            'stop_rate': round(float((self.outcome == STOP).mean()), 4),
+            'timeout_rate': round(float((self.outcome == TIMEOUT).mean()), 4),
+            'avg_r': round(float(self.r_multiple.mean()), 4),
+            'avg_pnl_pct': round(float(self.pnl_pct.mean()), 4),
+            'total_pnl_pct': round(float(self.pnl_pct.sum()), 2),
+            'avg_bars_held': round(float(self.bars_held.mean()), 2),
+        }
+
+    def by_symbol(self) -> Dict[str, Dict]:
+        counts = np.bincount(self.symbol_id, minlength=len(self.symbols))
+        wins = np.bincount(self.symbol_id, weights=self.outcome == TARGET, minlength=len(self.symbols))
+        r_sum = np.bincount(self.symbol_id, weights=self.r_multiple, minlength=len(self.symbols))
+        return {
+            s: {'trades': int(counts[i]), 'win_rate': round(float(wins[i] / counts[i]), 4),
+                'avg_r': round(float(r_sum[i] / counts[i]), 4)}
+            for i, s in enumerate(self.symbols) if counts[i]
+        }
+
+
+def signal_mask(panel: BarPanel, ind: Dict[str, np.ndarray], params: BacktestParams,
+                score: Optional[np.ndarray] = None) -> np.ndarray:
+    """Bars where scan_symbol would emit a signal (first bar of each run only)"""
+    if score is None:
+        score = tech_score(panel, ind, params)
+    signal = (ind['bar_index'] >= MIN_BARS - 1) & (score + params.social_score >= params.min_score)
+    signal &= np.isfinite(ind['atr']) & (ind['atr'] > 0)
+    # A signal that persists over consecutive bars is one trade
+    previous = np.concatenate([[False], signal[:-1]])
+    previous[panel.offsets[:-1]] = False
+    return signal & ~previous
+
+
+def simulate(panel: BarPanel, ind: Dict[str, np.ndarray], params: BacktestParams = BacktestParams(),
+             score: Optional[np.ndarray] = None, chunk: int = 50_000) -> BacktestResult:
+    """Resolve every signal by first touch of stop or target within max_hold bars"""
+    entries = np.flatnonzero(signal_mask(panel, ind, params, score))
+    hold = params.max_hold
+    sym = panel.symbol_ids()
+
+    price = panel.close[entries]
+    atr = ind['atr'][entries]
+    direction = np.where(price > ind['ema_21'][entries], 1, -1)
+    stop = price - direction * atr * params.stop_atr
+    target = price + direction * atr * params.target_atr
+
+    # Future windows (bars i+1 .. i+hold), padded so every entry has `hold` slots
+    pad = np.full(hold, np.nan)
+    high_w = sliding_window_view(np.concatenate([panel.high[1:], pad, [np.nan]]), hold)
+    low_w = sliding_window_view(np.concatenate([panel.low[1:], pad, [np.nan]]), hold)
+    close_w = sliding_window_view(np.concatenate([panel.close[1:], pad, [np.nan]]), hold)
+    sym_w = sliding_window_view(np.concatenate([sym[1:], np.full(hold + 1, -1)]), hold)
+
+    exit_price = np.empty(len(entries))
+    bars_held = np.empty(len(entries), dtype=np.int64)
+    outcome = np.empty(len(entries), dtype=np.int8)
+
+    for start in range(0, len(entries), chunk):
+        idx = entries[start:start + chunk]
+        part = slice(start, start + len(idx))
+        d = direction[part][:, None]
+        s, t = stop[part][:, None], target[part][:, None]
+
+        same = sym_w[idx] == sym[idx][:, None]
+        highs, lows, closes = high_w[idx], low_w[idx], close_w[idx]
+
+        hit_stop = same & np.where(d > 0, lows <= s, highs >= s)
+        hit_target = same & np.where(d > 0, highs >= t, lows <= t)
+
+        first_stop = np.where(hit_stop.any(axis=1), hit_stop.argmax(axis=1), hold)
+        first_target = np.where(hit_target.any(axis=1), hit_target.argmax(axis=1), hold)
+        last_bar = same.sum(axis=1) - 1  # bars available before the data ends
+
+        # Both levels in the same bar: assume the stop filled first
+        is_target = first_target < first_stop
+        is_stop = ~is_target & (first_stop < hold)
+
+        out = np.full(len(idx), TIMEOUT, dtype=np.int8)
+        out[is_target] = TARGET
+        out[is_stop] = STOP
+        held = np.where(is_target, first_target, np.where(is_stop, first_stop, last_bar))
+
+        timeout_close = closes[np.arange(len(idx)), np.maximum(last_bar, 0)]
+        timeout_close = np.where(last_bar >= 0, timeout_close, price[part])
+        exit_price[part] = np.where(is_target, target[part], np.where(is_stop, stop[part], timeout_close))
+        bars_held[part] = held + 1
+        outcome[part] = out
+
+    move = direction * (exit_price - price)
+    return BacktestResult(
+        symbols=panel.symbols,
+        symbol_id=sym[entries],
+        entry_ts=panel.ts[entries],
+        direction=direction,
+        entry=price,
+        stop=stop,
+        target=target,
+        exit=exit_price,
+        bars_held=bars_held,
+        outcome=outcome,
+        pnl_pct=move / price * 100,
+        r_multiple=move / (atr * params.stop_atr),
+    )
+
+
+def run_backtest(frames: Dict[str, pd.DataFrame], params: BacktestParams = BacktestParams()) -> BacktestResult:
+    panel = BarPanel.from_frames(frames)
+    return simulate(panel, compute_indicators(panel), params)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from market_data import get_provider
+
+    parser = argparse.ArgumentParser(description="Backtest the 15m BaconScanner scorer")
+    parser.add_argument("symbols", nargs="*", help="defaults to the bacon_scanner_complete WATCHLIST")
+    parser.add_argument("--period", default="1y", help="yfinance serves at most 60d of 15m bars")
+    parser.add_argument("--interval", default="15m")
+    for field, value in asdict(BacktestParams()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if not symbols:
+        from bacon_scanner_complete import WATCHLIST
+        symbols = WATCHLIST
+
+    params = BacktestParams(**{f: getattr(args, f) for f in asdict(BacktestParams())})
+    provider = get_provider()
+    frames = {s: provider.history(s, period=args.period, interval=args.interval) for s in symbols}
+
+    t0 = time.perf_counter()
+    result = run_backtest(frames, params)
+    elapsed = time.perf_counter() - t0
+
+    print(json.dumps(result.summary(), indent=2))
+    print(f"⏱️  {sum(len(df) for df in frames.values()):,} bars, {len(frames)} symbols in {elapsed:.2f}s")
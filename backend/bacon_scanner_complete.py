@@ -4,15 +4,20 @@
 96% Win Rate Algorithm
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import requests
+import asyncio
+import os
 from datetime import datetime
 import uvicorn
 
+from market_data import get_provider
+import metrics
+from metrics import StageTimer, SYMBOLS_SCANNED, SYMBOLS_SIGNALLED, SYMBOLS_ERRORED
+
 app = FastAPI(title="🥓 BaconAlgo API")
 
 # CORS
@@ -35,27 +40,65 @@ WATCHLIST = [
 class BaconScanner:
     """Scanner avec algorithme 96%"""
     
-    def __init__(self):
+    def __init__(self, provider=None, database=None):
         self.min_score = 150  # Score minimum pour signal
+        self.provider = provider  # None = provider actif (market_data)
+        self.database = database  # None = signals are not stored
+    
+    def scan(self, symbols):
+        """Scan une liste de symboles, triés par score"""
+        signals = []
+        remaining = len(symbols)
+        metrics.SCAN_QUEUE_DEPTH.inc(remaining)
+        try:
+            for symbol in symbols:
+                signal = self.scan_symbol(symbol)
+                remaining -= 1
+                metrics.SCAN_QUEUE_DEPTH.dec()
+                if signal:
+                    signals.append(signal)
+        finally:
+            metrics.SCAN_QUEUE_DEPTH.dec(remaining)
+        
+        signals.sort(key=lambda x: x['total_score'], reverse=True)
+        self.persist(signals)
+        metrics.mark_snapshot()
+        return signals
+    
+    def persist(self, signals):
+        """Store the signals in Supabase (timed as the 'persistence' stage)"""
+        if self.database is None or not signals:
+            return
+        
+        async def save_all():
+            for signal in signals:
+                await self.database.save_signal(signal)
+        
+        asyncio.run(save_all())
         
     def scan_symbol(self, symbol):
         """Scan complet d'un symbole"""
+        SYMBOLS_SCANNED.inc(scanner='bacon15m')
+        timer = StageTimer('bacon15m')
         try:
             print(f"  📊 Scanning {symbol}...")
             
             # Get data
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period='5d', interval='15m')
+            data = (self.provider or get_provider()).history(symbol, period='5d', interval='15m')
+            timer.lap('fetch')
             
             if len(data) < 50:
                 return None
             
             # Calculate indicators
             indicators = self.calculate_indicators(data)
+            timer.lap('indicators')
             
             # Calculate scores
             tech_score = self.calculate_tech_score(data, indicators)
+            timer.lap('scoring')
             social_score = self.get_social_score(symbol)
+            timer.lap('social')
             total_score = tech_score + social_score
             
             # Filter - only quality signals
@@ -100,10 +143,13 @@ class BaconScanner:
                 'timestamp': datetime.now().isoformat()
             }
             
+            timer.lap('scoring')
+            SYMBOLS_SIGNALLED.inc(scanner='bacon15m')
             print(f"     ✅ {symbol}: {total_score}/230 - {direction} SIGNAL!")
             return signal
             
         except Exception as e:
+            SYMBOLS_ERRORED.inc(scanner='bacon15m')
             print(f"     ⚠️  Error scanning {symbol}: {e}")
             return None
     
@@ -266,8 +312,19 @@ class BaconScanner:
         else:
             return 'OKAY'
 
+def connect_database():
+    """Supabase client when SUPABASE_URL is set, None otherwise"""
+    if not os.getenv("SUPABASE_URL"):
+        return None
+    try:
+        from database import Database
+        return Database()
+    except Exception as e:
+        print(f"⚠️  Signals will not be stored: {e}")
+        return None
+
 # Initialize scanner
-scanner = BaconScanner()
+scanner = BaconScanner(database=connect_database())
 
 @app.get("/")
 def root():
@@ -284,20 +341,18 @@ def root():
         }
     }
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/api/scan")
 def full_scan():
     """Full market scan - all symbols"""
     print(f"\n🔍 Starting full scan ({len(WATCHLIST)} symbols)...")
     
-    signals = []
-    
-    for symbol in WATCHLIST:
-        signal = scanner.scan_symbol(symbol)
-        if signal:
-            signals.append(signal)
-    
-    # Sort by score
-    signals.sort(key=lambda x: x['total_score'], reverse=True)
+    # Sorted by score
+    signals = scanner.scan(WATCHLIST)
     
     print(f"\n✅ Scan complete: {len(signals)}/{len(WATCHLIST)} signals found!\n")
     
@@ -315,14 +370,7 @@ def quick_scan():
     print(f"\n🔍 Quick scan (10 symbols)...")
     
     quick_list = WATCHLIST[:10]
-    signals = []
-    
-    for symbol in quick_list:
-        signal = scanner.scan_symbol(symbol)
-        if signal:
-            signals.append(signal)
-    
-    signals.sort(key=lambda x: x['total_score'], reverse=True)
+    signals = scanner.scan(quick_list)
     
     return {
         "success": True,
@@ -0,0 +1,362 @@
+"""
+🥓 BaconAlgo Signal Pusher
+Non-blocking, batched delivery of signals to pluggable sinks (HTTP, WebSocket
+broadcast, JSON-lines file).
+
+push_signal() only drops the signal into a bounded buffer and returns. A
+background asyncio loop flushes the buffer `window` seconds after the first
+signal arrives, in batches of `batch_size`. A newer signal for a symbol that
+is still waiting replaces the older one (coalescing). When the buffer is
+full, new symbols are dropped and counted. A sink that fails a batch
+retries it with exponential backoff and full jitter.
+
+    pusher = BaconSignalPusher()    # sinks from the environment
+    pusher = BaconSignalPusher(sinks=[HttpSink(url), FileSink("signals.jsonl")])
+    pusher.push_signal({'symbol': 'TSLA', 'entry': 312.45, 'tp1': 321.95, ...})
+
+Env: BACON_PUSH_URL (+ BACON_PUSH_TOKEN), BACON_PUSH_FILE, BACON_PUSH_QUEUE,
+BACON_PUSH_BATCH, BACON_PUSH_WINDOW, BACON_PUSH_RETRIES
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+SIGNAL_FIELDS = (
+    'symbol', 'timeframe', 'style', 'rating', 'score', 'entry', 'tp1', 'tp2', 'tp3',
+    'stop_loss', 'rr', 'resistance', 'support', 'setup', 'wave', 'confluence', 'description',
+)
+
+MAX_QUEUE = int(os.getenv("BACON_PUSH_QUEUE", "10000"))
+BATCH_SIZE = int(os.getenv("BACON_PUSH_BATCH", "200"))
+WINDOW = float(os.getenv("BACON_PUSH_WINDOW", "1.0"))
+RETRIES = int(os.getenv("BACON_PUSH_RETRIES", "3"))
+
+
+def signal_key(signal: Dict) -> Hashable:
+    """Signals sharing a key coalesce: one per symbol / timeframe (alerts: per rule)"""
+    return (signal.get('type', 'signal'), signal.get('symbol'), signal.get('timeframe'),
+            signal.get('user_id'), signal.get('rule_id'))
+
+
+def dumps(payload: Any) -> str:
+    """JSON that tolerates numpy scalars"""
+    return json.dumps(payload, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+
+
+class PushError(Exception):
+    """A failed delivery; retry=False for errors a retry cannot fix (HTTP 4xx)"""
+
+    def __init__(self, message: str, retry: bool = True):
+        super().__init__(message)
+        self.retry = retry
+
+
+# ============================================
+# SINKS
+# ============================================
+
+class SignalSink:
+    name = "sink"
+
+    async def send(self, batch: List[Dict]):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class HttpSink(SignalSink):
+    """POST {"signals": [...]} to a URL (aiohttp, one session per pusher loop)"""
+
+    name = "http"
+
+    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0):
+        self.url = url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self._session = None
+
+    async def send(self, batch: List[Dict]):
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        try:
+            async with self._session.post(self.url, data=dumps({"signals": batch}), headers=self.headers) as response:
+                if response.status >= 400:
+                    retry = response.status == 429 or response.status >= 500
+                    raise PushError(f"HTTP {response.status} from {self.url}", retry=retry)
+        except aiohttp.ClientError as e:
+            raise PushError(f"{type(e).__name__}: {e}")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class WebSocketSink(SignalSink):
+    """
+    Broadcast to connected WebSocket clients (FastAPI), each on the event
+    loop it was registered from. A client registered with a user_id also
+    gets that user's alerts; anyone else only gets signals without a
+    user_id. A client that fails a send is dropped, not retried.
+    """
+
+    name = "websocket"
+
+    def __init__(self, send_timeout: float = 5.0):
+        self.send_timeout = send_timeout
+        self._clients: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def register(self, websocket, user_id: Optional[str] = None):
+        """Call from the websocket's own event loop"""
+        with self._lock:
+            self._clients[websocket] = (asyncio.get_running_loop(), user_id)
+
+    def unregister(self, websocket):
+        with self._lock:
+            self._clients.pop(websocket, None)
+
+    def __len__(self):
+        return len(self._clients)
+
+    async def send(self, batch: List[Dict]):
+        with self._lock:
+            clients = list(self._clients.items())
+        sends, targets = [], []
+        for websocket, (loop, user_id) in clients:
+            signals = [s for s in batch if s.get('user_id') in (None, user_id)]
+            if not signals:
+                continue
+            message = dumps({"type": "signals", "signals": signals})
+            future = asyncio.run_coroutine_threadsafe(websocket.send_text(message), loop)
+            sends.append(asyncio.wait_for(asyncio.wrap_future(future), self.send_timeout))
+            targets.append(websocket)
+        for websocket, result in zip(targets, await asyncio.gather(*sends, return_exceptions=True)):
+            if isinstance(result, BaseException):
+                self.unregister(websocket)
+
+
+class FileSink(SignalSink):
+    """Append one JSON line per signal"""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, lines: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def send(self, batch: List[Dict]):
+        await asyncio.to_thread(self._write, "".join(dumps(s) + "\n" for s in batch))
+
+
+def sinks_from_env() -> List[SignalSink]:
+    sinks: List[SignalSink] = []
+    if os.getenv("BACON_PUSH_URL"):
+        token = os.getenv("BACON_PUSH_TOKEN")
+        sinks.append(HttpSink(os.environ["BACON_PUSH_URL"],
+                              headers={"Authorization": f"Bearer {token}"} if token else None))
+    if os.getenv("BACON_PUSH_FILE"):
+        sinks.append(FileSink(os.environ["BACON_PUSH_FILE"]))
+    return sinks
+
+
+# ============================================
+# PUSHER
+# ============================================
+
+class BaconSignalPusher:
+    """Push trading signals without ever blocking the scanner"""
+
+    def __init__(self, sinks: Optional[List[SignalSink]] = None, max_queue: int = MAX_QUEUE,
+                 batch_size: int = BATCH_SIZE, window: float = WINDOW, retries: int = RETRIES,
+                 backoff: float = 0.5, max_backoff: float = 30.0,
+                 key: Callable[[Dict], Hashable] = signal_key):
+        self.sinks: List[SignalSink] = sinks_from_env() if sinks is None else list(sinks)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.window = window
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.key = key
+
+        self._pending: Dict[Hashable, Dict] = {}   # insertion-ordered: oldest first
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._woken = False
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        self.pushed_count = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def add_sink(self, sink: SignalSink):
+        self.sinks.append(sink)
+
+    # ---------- producer side (any thread, never blocks) ----------
+
+    def push_signal(self, signal_data: Dict) -> bool:
+        """
+        Queue one signal (keys: SIGNAL_FIELDS, extra keys are kept).
+        False if it was rejected: no symbol, buffer full or pusher closed.
+        """
+        if not signal_data.get('symbol'):
+            print(f"⚠️  Signal without a symbol ignored: {signal_data}")
+            return False
+        payload = dict(signal_data)
+        payload.setdefault('type', 'signal')
+        payload.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+        key = self.key(payload)
+
+        with self._lock:
+            if self._closed:
+                return False
+            if key in self._pending:
+                self.coalesced += 1
+            elif len(self._pending) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self._pending[key] = payload
+            wake = not self._woken
+            self._woken = True
+
+        if wake:
+            self._start()
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def push_multiple_signals(self, signals: List[Dict]) -> int:
+        """Queue several signals; returns how many were accepted"""
+        return sum(1 for signal in signals if self.push_signal(signal))
+
+    # ---------- delivery loop (own thread) ----------
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run, args=(ready,), name="bacon-signal-pusher", daemon=True)
+            thread.start()
+            ready.wait()
+            self._thread = thread
+            atexit.register(self.close)
+
+    def _run(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._main(ready))
+        self._loop.close()
+
+    async def _main(self, ready: threading.Event):
+        self._wake = asyncio.Event()
+        ready.set()
+        while True:
+            await self._wake.wait()
+            if not self._closed:
+                # Let updates to the same symbols coalesce before sending
+                await asyncio.sleep(self.window)
+            self._wake.clear()
+            await self._drain()
+            if self._closed:
+                with self._lock:
+                    if not self._pending:
+                        break
+        for sink in self.sinks:
+            try:
+                await sink.close()
+            except Exception as e:
+                print(f"⚠️  Closing {sink.name} sink failed: {e}")
+
+    def _take(self) -> List[Dict]:
+        with self._lock:
+            keys = list(self._pending)[:self.batch_size]
+            batch = [self._pending.pop(k) for k in keys]
+            if not self._pending:
+                self._woken = False
+        return batch
+
+    async def _drain(self):
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            await asyncio.gather(*(self._deliver(sink, batch) for sink in self.sinks))
+            self.batches += 1
+            self.pushed_count += len(batch)
+
+    async def _deliver(self, sink: SignalSink, batch: List[Dict]) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                await sink.send(batch)
+                return True
+            except Exception as e:
+                retry = getattr(e, 'retry', True)
+                if attempt == self.retries or not retry:
+                    self.failed += len(batch)
+                    print(f"❌ {sink.name} sink: {len(batch)} signals not delivered: {e}")
+                    return False
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                print(f"⚠️  {sink.name} sink failed ({e}), retry {attempt + 1}/{self.retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return False
+
+    # ---------- lifecycle ----------
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Deliver everything queued now (blocking); False on timeout"""
+        if self._thread is None:
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting signals, deliver what is queued and stop the loop"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is None:
+            return
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._wake.set)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"⚠️  Signal pusher closed with {len(self._pending)} signals undelivered")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            queued = len(self._pending)
+        return {
+            "queued": queued,
+            "pushed": self.pushed_count,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "sinks": [sink.name for sink in self.sinks],
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+🥓 Cold start benchmark
+Import time of main.py and time from process spawn to the first /health 200.
+
+Usage (from backend/):
+    python benchmarks/bench_cold_start.py [--runs 5] [--importtime]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import() -> float:
+    """Seconds for a fresh interpreter to `import main`"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_health(timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn to the first successful GET /health"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, PYTHONUNBUFFERED="1"),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summary(label: str, values):
+    print(f"{label:28} median {statistics.median(values) * 1000:8.1f} ms   "
+          f"min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="show the slowest imports (-X importtime)")
+    args = parser.parse_args()
+
+    summary("import main", [measure_import() for _ in range(args.runs)])
+    summary("spawn -> first /health", [measure_first_health() for _ in range(args.runs)])
+
+    if args.importtime:
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                             cwd=BACKEND_DIR, capture_output=True, text=True)
+        rows = [line for line in out.stderr.splitlines() if line.startswith("import time:") and "|" in line]
+        rows = [r for r in rows if r.split("|")[1].strip().isdigit()]
+        rows.sort(key=lambda r: int(r.split("|")[1]), reverse=True)
+        print("\nSlowest imports (cumulative us):")
+        for row in rows[:15]:
+            print("  " + row.replace("import time:", "").strip())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+🥓 BaconAlgo Benchmarks
+Indicator kernels, symbol analysis and full scans on synthetic OHLCV.
+
+Usage (from backend/):
+    python benchmarks/run_benchmarks.py              # compare against baselines
+    python benchmarks/run_benchmarks.py --save       # record new baselines
+    python benchmarks/run_benchmarks.py --quick      # skip the 5,000-symbol scan
+    python benchmarks/run_benchmarks.py --only scan  # name filter
+    python benchmarks/run_benchmarks.py --only results  # result representation (memory + throughput)
+    python benchmarks/run_benchmarks.py --only alerts   # alert rules per snapshot
+    python benchmarks/run_benchmarks.py --only profile  # volume profiles
+
+Each benchmark reports the median of several timed rounds. Regressions fail
+the run only against baselines saved on the same machine (fingerprint in
+baselines.json); elsewhere they are printed as warnings.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from fixtures import synthetic_ohlcv, synthetic_universe  # noqa: E402
+
+BASELINE_FILE = BENCH_DIR / "baselines.json"
+SCAN_SIZES = [50, 500, 5000]
+RESULT_ROWS = 5000
+ALERT_RULES = 100_000
+ALERT_SYMBOLS = 500
+REPEATS = 5              # timed rounds per benchmark; the median is reported
+MEMORY_FLOOR_KB = 64     # peak growth below this is never a regression
+
+
+class Benchmark:
+    def __init__(self, name: str, func: Callable, ops_per_call: int = 1, min_time: float = 0.1,
+                 repeats: int = REPEATS):
+        self.name = name
+        self.func = func
+        self.ops_per_call = ops_per_call
+        self.min_time = min_time
+        self.repeats = repeats
+
+    def _round(self) -> float:
+        """Seconds per call over at least min_time (one call at min_time=0)"""
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            self.func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time:
+                return elapsed / calls
+
+    def run(self) -> Dict:
+        self.func()  # warm-up
+        reference = reference_seconds()
+        per_call = statistics.median(self._round() for _ in range(self.repeats))
+
+        tracemalloc.start()
+        self.func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "ops_per_sec": self.ops_per_call / per_call,
+            "mean_ms": per_call * 1000,
+            "peak_kb": peak / 1024,
+            "reference_ms": reference * 1000,
+        }
+
+
+def reference_seconds(repeats: int = REPEATS) -> float:
+    """
+    Fixed pandas/numpy/Python workload timed right before each benchmark.
+    Baselines are scaled by how much faster or slower it ran than when they
+    were saved, so machine-wide drift (CPU steal, frequency) cancels out.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = pd.Series(np.random.default_rng(0).normal(size=200_000)).cumsum()
+
+    def work():
+        values.rolling(20).mean().iloc[-1]
+        np.sort(values.to_numpy())
+        sum(i * i for i in range(200_000))
+
+    work()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def build_benchmarks(quick: bool = False, only: str = "") -> List[Benchmark]:
+    """Benchmarks whose name contains only; fixtures are built for those alone"""
+    def wanted(*names: str) -> bool:
+        return any(only in name for name in names)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+        from bacon_scanner_complete import BaconScanner
+    from market_data import ReplayProvider, set_provider
+
+    benches = []
+    daily = synthetic_ohlcv(100, '1d', seed=1)
+    kernels = ["calculate_rsi", "calculate_avwap", "calculate_ml_features", "BaconScanner.calculate_indicators",
+               "BaconScanner.calculate_tech_score", "BaconScanner.calculate_atr"]
+    if wanted(*kernels):
+        intraday = synthetic_ohlcv(130, '15m', seed=2)
+        scanner = BaconScanner()
+        indicators = scanner.calculate_indicators(intraday)
+        benches += [
+            Benchmark("calculate_rsi", lambda: main.calculate_rsi(daily['Close'])),
+            Benchmark("calculate_avwap", lambda: main.calculate_avwap(daily, 21)),
+            Benchmark("calculate_ml_features", lambda: main.calculate_ml_features(daily)),
+            Benchmark("BaconScanner.calculate_indicators", lambda: scanner.calculate_indicators(intraday)),
+            Benchmark("BaconScanner.calculate_tech_score",
+                      lambda: scanner.calculate_tech_score(intraday, indicators)),
+            Benchmark("BaconScanner.calculate_atr", lambda: scanner.calculate_atr(intraday)),
+        ]
+
+    if wanted("analyze_symbol"):
+        single = ReplayProvider(frames={("AAPL", "1d"): daily})
+
+        def analyze_one():
+            set_provider(single)
+            main.reset_delta_cache()
+            main.analyze_symbol("AAPL")
+
+        benches.append(Benchmark("analyze_symbol", analyze_one))
+
+    if wanted("resample_15m_to_30m_1h_4h_1d"):
+        from resample import resample_all
+        from sessions import NYSE
+
+        # 60 days of 15m bars (yfinance's intraday limit) -> the shared timeframes
+        base_15m = synthetic_ohlcv(60 * 96, '15m', seed=3)
+        benches.append(Benchmark("resample_15m_to_30m_1h_4h_1d",
+                                 lambda: resample_all(base_15m, ['30m', '1h', '4h', '1d'], NYSE)))
+
+    if wanted("levels_500_new_bars", "levels_500_cached", "profile_500_build", "profile_500_incremental"):
+        universe = {symbol: df for (symbol, _), df in synthetic_universe(500, '1d', n_bars=100).items()}
+
+    if wanted("levels_500_new_bars", "levels_500_cached"):
+        from levels import LevelEngine
+
+        # Zones + targets for a universe: every bar new vs served from the zone cache
+        cached = LevelEngine()
+        cached.levels(universe)
+        benches.append(Benchmark("levels_500_new_bars", lambda: LevelEngine().levels(universe), ops_per_call=500))
+        benches.append(Benchmark("levels_500_cached", lambda: cached.levels(universe), ops_per_call=500))
+
+    if wanted("profile_500_build", "profile_500_incremental"):
+        from volume_profile import ProfileEngine
+
+        # Volume profiles: one bincount for the universe vs in-place updates of kept histograms
+        profiles = ProfileEngine()
+        profiles.profiles(universe)
+        benches.append(Benchmark("profile_500_build", lambda: ProfileEngine().profiles(universe), ops_per_call=500))
+        benches.append(Benchmark("profile_500_incremental", lambda: profiles.profiles(universe), ops_per_call=500))
+
+    for size in SCAN_SIZES:
+        if (quick and size > 500) or not wanted(f"scan_{size}", f"rescan_unchanged_{size}"):
+            continue
+        frames = synthetic_universe(size, '1d', n_bars=100)
+        provider = ReplayProvider(frames=frames)
+        symbols = [symbol for symbol, _ in frames]
+
+        def scan(provider=provider, symbols=symbols):
+            set_provider(provider)
+            main.reset_delta_cache()
+            main.run_scan(symbols)
+
+        def rescan(provider=provider, symbols=symbols):
+            # Same bars as the previous scan: everything served by the delta cache
+            set_provider(provider)
+            main.run_scan(symbols)
+
+        # A cold scan per round; 5,000 symbols take tens of seconds each
+        benches.append(Benchmark(f"scan_{size}", scan, ops_per_call=size, min_time=0,
+                                 repeats=3 if size > 500 else REPEATS))
+        benches.append(Benchmark(f"rescan_unchanged_{size}", rescan, ops_per_call=size))
+
+    if wanted(*(f"results_{kind}_{RESULT_ROWS}" for kind in
+                ("pydantic", "compact", "masks", "held_pydantic", "held_compact"))):
+        benches += result_benchmarks(main, RESULT_ROWS)
+    n_rules = 10_000 if quick else ALERT_RULES
+    if wanted(f"alerts_evaluate_{n_rules}_rules_{ALERT_SYMBOLS}_symbols"):
+        benches += alert_benchmarks(n_rules, ALERT_SYMBOLS)
+    return [bench for bench in benches if only in bench.name]
+
+
+def result_benchmarks(main, n: int) -> List[Benchmark]:
+    """Building + serializing n scan results: Pydantic models vs slotted rows"""
+    import random
+
+    import confluences as cc
+
+    rng = random.Random(0)
+    mask = (cc.RSI_BUY_ZONE | cc.VOLUME_EXPLOSION | cc.ABOVE_AVWAP_5D | cc.ABOVE_AVWAP_13D |
+            cc.POSITIVE_MOMENTUM | cc.ML_BUY)
+    params = (2.4, 3.1, 61.0)
+    fields = []
+    for i in range(n):
+        price = rng.uniform(5, 500)
+        fields.append(dict(
+            symbol=f"SYN{i:05d}", price=price, signal="⭐ HIGH QUALITY SIGNAL", rsi=rng.uniform(20, 80),
+            volume=rng.randint(10_000, 10_000_000), volume_ratio=rng.uniform(0.5, 3),
+            change_1d=rng.uniform(-5, 5), change_5d=rng.uniform(-10, 10), avwap_5d=price * 0.99,
+            avwap_13d=price * 0.98, avwap_21d=price * 0.97, confluence_count=cc.count(mask),
+            ml_prediction="BUY", ml_confidence=61.0))
+    labels = cc.labels(mask, params)
+
+    def pydantic_models():
+        results = [main.SignalResult(confluences=list(labels), **f) for f in fields]
+        main.ScanResponse(total_scanned=n, signals_found=n, results=results,
+                          scan_time="0.00s").model_dump_json()
+
+    def compact_rows():
+        results = [main.ScanRow(confluence_mask=mask, confluence_params=params, **f) for f in fields]
+        main.json_response({"total_scanned": n, "signals_found": n,
+                            "results": [r.to_dict() for r in results], "scan_time": "0.00s"})
+
+    def compact_masks():
+        # labels=false: the client decodes masks with /api/confluences
+        results = [main.ScanRow(confluence_mask=mask, confluence_params=params, **f) for f in fields]
+        main.json_response({"total_scanned": n, "signals_found": n,
+                            "results": [r.to_dict(False) for r in results], "scan_time": "0.00s"})
+
+    def hold_pydantic():
+        return [main.SignalResult(confluences=list(labels), **f) for f in fields]
+
+    def hold_compact():
+        return [main.ScanRow(confluence_mask=mask, confluence_params=params, **f) for f in fields]
+
+    return [
+        Benchmark(f"results_pydantic_{n}", pydantic_models, ops_per_call=n),
+        Benchmark(f"results_compact_{n}", compact_rows, ops_per_call=n),
+        Benchmark(f"results_masks_{n}", compact_masks, ops_per_call=n),
+        # Peak KB here = memory held by n results in the scan loop
+        Benchmark(f"results_held_pydantic_{n}", hold_pydantic, ops_per_call=n),
+        Benchmark(f"results_held_compact_{n}", hold_compact, ops_per_call=n),
+    ]
+
+
+def alert_benchmarks(n_rules: int, n_symbols: int) -> List[Benchmark]:
+    """
+    One snapshot of n_symbols small moves against n_rules rules (90% on a
+    few symbols, 8% on every symbol, 2% on watchlists)
+    """
+    import random
+
+    from alerts import OPS, Rule, RuleIndex
+
+    rng = random.Random(0)
+    symbols = [f"SYN{i:05d}" for i in range(n_symbols)]
+    ranges = {'rsi': (10, 90), 'volume_ratio': (0.5, 4), 'change_1d': (-5, 5), 'atr_pct': (0.5, 5)}
+    index = RuleIndex()
+    rules = []
+    for i in range(n_rules):
+        conditions = tuple((name, rng.choice(OPS), rng.uniform(*ranges[name]))
+                           for name in rng.sample(sorted(ranges), rng.randint(1, 3)))
+        scope = rng.random()
+        rules.append(Rule(id=i, user_id=f"user{i % 5000}", conditions=conditions,
+                          symbols=frozenset(rng.sample(symbols, 3)) if scope < 0.9 else None,
+                          watchlist=scope > 0.98, cooldown=0))
+    index.replace(rules)
+    rows = [{'symbol': s, **{name: rng.uniform(*bounds) for name, bounds in ranges.items()}} for s in symbols]
+    index.evaluate(rows)  # compile + baseline
+
+    def snapshot():
+        for row in rows:
+            row['rsi'] += rng.gauss(0, 0.1)
+            row['volume_ratio'] *= 1 + rng.gauss(0, 0.005)
+            row['change_1d'] += rng.gauss(0, 0.02)
+            row['atr_pct'] += rng.gauss(0, 0.005)
+        index.evaluate(rows)
+
+    return [Benchmark(f"alerts_evaluate_{n_rules}_rules_{n_symbols}_symbols", snapshot, ops_per_call=n_symbols)]
+
+
+def machine_fingerprint() -> Dict:
+    """What makes timings comparable: baselines only gate runs on the same machine"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return {
+        "platform": platform.platform(),
+        "cpu": cpu,
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def load_baselines() -> Dict:
+    if BASELINE_FILE.exists():
+        return json.loads(BASELINE_FILE.read_text())
+    return {}
+
+
+def expected_ops(result: Dict, baseline: Dict) -> float:
+    """Baseline throughput scaled to this run's speed of the reference workload"""
+    if "reference_ms" not in baseline:
+        return baseline["ops_per_sec"]
+    return baseline["ops_per_sec"] * baseline["reference_ms"] / result["reference_ms"]
+
+
+def check_regression(name: str, result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    failures = []
+    expected = expected_ops(result, baseline)
+    if result["ops_per_sec"] < expected * (1 - tolerance):
+        failures.append(f"{name}: {result['ops_per_sec']:.1f} ops/s < baseline {expected:.1f} "
+                        f"(scaled from {baseline['ops_per_sec']:.1f})")
+    growth = result["peak_kb"] - baseline["peak_kb"]
+    if growth > baseline["peak_kb"] * tolerance and growth > MEMORY_FLOOR_KB:
+        failures.append(f"{name}: peak {result['peak_kb']:.0f} KB > baseline {baseline['peak_kb']:.0f} KB")
+    return failures
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="BaconAlgo benchmark suite")
+    parser.add_argument("--save", action="store_true", help="write results as the new baselines")
+    parser.add_argument("--quick", action="store_true", help="skip the largest scan")
+    parser.add_argument("--only", default="", help="run benchmarks whose name contains this")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    results, failures = {}, []
+
+    # Scans materialize ML features: keep them out of backend/data/features
+    store = tempfile.TemporaryDirectory(prefix="bacon_bench_features_")
+    os.environ["BACON_FEATURE_STORE"] = store.name
+
+    print(f"{'benchmark':40} {'ops/s':>12} {'mean ms':>10} {'peak KB':>10}  baseline")
+    for bench in build_benchmarks(args.quick, args.only):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = bench.run()
+        results[bench.name] = result
+
+        baseline = baselines.get("results", {}).get(bench.name)
+        delta = ""
+        if baseline:
+            delta = f"{(result['ops_per_sec'] / expected_ops(result, baseline) - 1) * 100:+.1f}%"
+            failures += check_regression(bench.name, result, baseline, args.tolerance)
+        print(f"{bench.name:40} {result['ops_per_sec']:12.1f} {result['mean_ms']:10.3f} "
+              f"{result['peak_kb']:10.0f}  {delta}")
+
+    if args.save:
+        merged = dict(baselines.get("results", {}), **results)
+        BASELINE_FILE.write_text(json.dumps({
+            "machine": machine_fingerprint(),
+            "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": merged,
+        }, indent=2))
+        print(f"\n💾 Baselines saved to {BASELINE_FILE}")
+        return 0
+
+    if not baselines:
+        print("\nℹ️  No baselines yet - run with --save to record them")
+    elif baselines.get("machine") != machine_fingerprint():
+        # Timings from another machine are a hint, not a gate
+        print(f"\n⚠️  Baselines were recorded on {baselines.get('machine')}")
+        print(f"   this machine is {machine_fingerprint()} - not failing on:")
+        for failure in failures:
+            print(f"  ⚠️  {failure}")
+        return 0
+
+    if failures:
+        print("\n" + "❌" * 30)
+        print("PERFORMANCE REGRESSION")
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        print("❌" * 30)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
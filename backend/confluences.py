@@ -0,0 +1,253 @@
+"""
+🥓 Confluence Codes
+Confluences are one bit each in an integer mask, plus the numeric params of
+the parameterized ones (in ascending bit order). Labels are only rendered
+when a result leaves the API - or by the client, from GET /api/confluences.
+Filtering is bitwise: (mask & wanted) == wanted.
+"""
+
+from enum import IntFlag
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class Code(IntFlag):
+    # Bit order = detection order in main.analyze, so labels keep their order
+    RSI_OVERSOLD = 1 << 0
+    RSI_BUY_ZONE = 1 << 1
+    VOLUME_EXPLOSION = 1 << 2
+    HIGH_VOLUME = 1 << 3
+    ABOVE_AVWAP_5D = 1 << 4
+    ABOVE_AVWAP_13D = 1 << 5
+    ABOVE_AVWAP_21D = 1 << 6
+    STRONG_MOMENTUM = 1 << 7
+    POSITIVE_MOMENTUM = 1 << 8
+    BREAKOUT = 1 << 9
+    ML_STRONG_BUY = 1 << 10
+    ML_BUY = 1 << 11
+    # Volume profile (volume_profile.py)
+    ABOVE_VALUE_AREA = 1 << 12
+    ABOVE_POC = 1 << 13
+    HVN_SUPPORT = 1 << 14
+    # main1.py
+    AVWAP_BULLISH = 1 << 16
+    AVWAP_BEARISH = 1 << 17
+    RSI_OVERBOUGHT = 1 << 18
+    VOLUME_SPIKE = 1 << 19
+    STRONG_VOLUME = 1 << 20
+    STRONG_UPTREND = 1 << 21
+    STRONG_DOWNTREND = 1 << 22
+
+
+# Plain ints for the scan loop (IntFlag arithmetic is much slower)
+RSI_OVERSOLD = int(Code.RSI_OVERSOLD)
+RSI_BUY_ZONE = int(Code.RSI_BUY_ZONE)
+VOLUME_EXPLOSION = int(Code.VOLUME_EXPLOSION)
+HIGH_VOLUME = int(Code.HIGH_VOLUME)
+ABOVE_AVWAP_5D = int(Code.ABOVE_AVWAP_5D)
+ABOVE_AVWAP_13D = int(Code.ABOVE_AVWAP_13D)
+ABOVE_AVWAP_21D = int(Code.ABOVE_AVWAP_21D)
+STRONG_MOMENTUM = int(Code.STRONG_MOMENTUM)
+POSITIVE_MOMENTUM = int(Code.POSITIVE_MOMENTUM)
+BREAKOUT = int(Code.BREAKOUT)
+ML_STRONG_BUY = int(Code.ML_STRONG_BUY)
+ML_BUY = int(Code.ML_BUY)
+ABOVE_VALUE_AREA = int(Code.ABOVE_VALUE_AREA)
+ABOVE_POC = int(Code.ABOVE_POC)
+HVN_SUPPORT = int(Code.HVN_SUPPORT)
+AVWAP_BULLISH = int(Code.AVWAP_BULLISH)
+AVWAP_BEARISH = int(Code.AVWAP_BEARISH)
+RSI_OVERBOUGHT = int(Code.RSI_OVERBOUGHT)
+VOLUME_SPIKE = int(Code.VOLUME_SPIKE)
+STRONG_VOLUME = int(Code.STRONG_VOLUME)
+STRONG_UPTREND = int(Code.STRONG_UPTREND)
+STRONG_DOWNTREND = int(Code.STRONG_DOWNTREND)
+
+# Label templates; {} is filled with the code's param
+LABELS: Dict[int, str] = {
+    RSI_OVERSOLD: "RSI Oversold (<30)",
+    RSI_BUY_ZONE: "RSI Buy Zone (30-40)",
+    VOLUME_EXPLOSION: "Volume Explosion ({:.1f}x)",
+    HIGH_VOLUME: "High Volume ({:.1f}x)",
+    ABOVE_AVWAP_5D: "Price > AVWAP 5D",
+    ABOVE_AVWAP_13D: "Price > AVWAP 13D",
+    ABOVE_AVWAP_21D: "Price > AVWAP 21D",
+    STRONG_MOMENTUM: "Strong 5D Momentum (+{:.1f}%)",
+    POSITIVE_MOMENTUM: "Positive 5D Momentum (+{:.1f}%)",
+    BREAKOUT: "Today's Breakout (+{:.1f}%)",
+    ML_STRONG_BUY: "ML: STRONG BUY ({:.0f}%)",
+    ML_BUY: "ML: BUY ({:.0f}%)",
+    ABOVE_VALUE_AREA: "Price > Value Area High",
+    ABOVE_POC: "Price > Volume POC",
+    HVN_SUPPORT: "High Volume Node Support",
+    AVWAP_BULLISH: "AVWAP Bullish",
+    AVWAP_BEARISH: "AVWAP Bearish",
+    RSI_OVERBOUGHT: "RSI Overbought",
+    VOLUME_SPIKE: "Volume Spike 2x+",
+    STRONG_VOLUME: "Strong Volume",
+    STRONG_UPTREND: "Strong Uptrend",
+    STRONG_DOWNTREND: "Strong Downtrend",
+}
+PARAMETERIZED = sum(bit for bit, template in LABELS.items() if "{" in template)
+# Volume profile codes are shown but not scored: the 2 / 4 / 6 grade
+# thresholds were calibrated on the daily codes without them
+PROFILE = ABOVE_VALUE_AREA | ABOVE_POC | HVN_SUPPORT
+# Most scored daily codes one symbol can carry: one per exclusive pair (oversold /
+# buy zone, explosion / high volume, strong / positive momentum, ML) + 3 AVWAPs + breakout
+MAX_DAILY = 8
+
+ML_CODES = {"STRONG BUY": ML_STRONG_BUY, "BUY": ML_BUY}
+
+
+# ============================================
+# DETECTION
+# ============================================
+
+def detect_daily(price: float, rsi: float, volume_ratio: float, change_1d: float, change_5d: float,
+                 avwap_5d: float, avwap_13d: float, avwap_21d: float) -> Tuple[int, List[float]]:
+    """Daily confluences of main.py (ML is added after the batch predict)"""
+    mask = 0
+    params = []
+    
+    # RSI signals
+    if rsi < 30:
+        mask |= RSI_OVERSOLD
+    elif rsi < 40:
+        mask |= RSI_BUY_ZONE
+    
+    # Volume spike
+    if volume_ratio > 2.0:
+        mask |= VOLUME_EXPLOSION
+        params.append(volume_ratio)
+    elif volume_ratio > 1.5:
+        mask |= HIGH_VOLUME
+        params.append(volume_ratio)
+    
+    # AVWAP signals
+    if price > avwap_5d:
+        mask |= ABOVE_AVWAP_5D
+    if price > avwap_13d:
+        mask |= ABOVE_AVWAP_13D
+    if price > avwap_21d:
+        mask |= ABOVE_AVWAP_21D
+    
+    # Momentum
+    if change_5d > 5:
+        mask |= STRONG_MOMENTUM
+        params.append(change_5d)
+    elif change_5d > 2:
+        mask |= POSITIVE_MOMENTUM
+        params.append(change_5d)
+    
+    # Price action
+    if change_1d > 3:
+        mask |= BREAKOUT
+        params.append(change_1d)
+    
+    return mask, params
+
+
+def detect_profile(price: float, poc: float, vah: float, hvn: Sequence[float],
+                   hvn_distance: float = 0.02) -> int:
+    """Volume profile confluences of main.py (no params, so ML's stays last)"""
+    mask = 0
+    
+    # Accepted above the value area, else at least above the point of control
+    if price > vah:
+        mask |= ABOVE_VALUE_AREA
+    elif price > poc:
+        mask |= ABOVE_POC
+    
+    # Heavy-volume shelf just below price
+    below = [node for node in hvn if node <= price]
+    if below and price - max(below) <= hvn_distance * price:
+        mask |= HVN_SUPPORT
+    
+    return mask
+
+
+def detect_avwap_stack(price: float, rsi: float, volume_ratio: float, change_5d: float,
+                       avwap_5d: Optional[float], avwap_13d: Optional[float],
+                       avwap_21d: Optional[float]) -> int:
+    """AVWAP-stack confluences of main1.py"""
+    mask = 0
+    
+    if avwap_5d and avwap_13d and avwap_21d:
+        if price > avwap_5d > avwap_13d > avwap_21d:
+            mask |= AVWAP_BULLISH
+        elif price < avwap_5d < avwap_13d < avwap_21d:
+            mask |= AVWAP_BEARISH
+    
+    if rsi < 30:
+        mask |= RSI_OVERSOLD
+    elif rsi > 70:
+        mask |= RSI_OVERBOUGHT
+    
+    if volume_ratio > 2:
+        mask |= VOLUME_SPIKE
+    elif volume_ratio > 1.5:
+        mask |= STRONG_VOLUME
+    
+    if change_5d > 5:
+        mask |= STRONG_UPTREND
+    elif change_5d < -5:
+        mask |= STRONG_DOWNTREND
+    
+    return mask
+
+
+# ============================================
+# DECODING
+# ============================================
+
+def bits(mask: int) -> List[int]:
+    """Set bits, lowest first"""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low)
+        mask ^= low
+    return out
+
+
+def count(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def score(mask: int) -> int:
+    """Confluences that count toward the signal grade (profile codes excluded)"""
+    return count(mask & ~PROFILE)
+
+
+def decode(mask: int, params: Sequence[float] = ()) -> List[Tuple[int, float]]:
+    """[(bit, param or None)] in label order"""
+    it = iter(params)
+    return [(bit, next(it, None) if bit & PARAMETERIZED else None) for bit in bits(mask)]
+
+
+def labels(mask: int, params: Sequence[float] = ()) -> List[str]:
+    return [LABELS[bit].format(param) if param is not None else LABELS[bit]
+            for bit, param in decode(mask, params)]
+
+
+def parse(names: Iterable[str]) -> int:
+    """Code names ("VOLUME_EXPLOSION,ML_BUY" split) -> mask; ValueError if unknown"""
+    mask = 0
+    for name in names:
+        name = name.strip().upper()
+        if not name:
+            continue
+        if name not in Code.__members__:
+            raise ValueError(f"Unknown confluence '{name}'")
+        mask |= int(Code[name])
+    return mask
+
+
+def matches(mask: int, required: int = 0, excluded: int = 0) -> bool:
+    return (mask & required) == required and not (mask & excluded)
+
+
+def code_table() -> List[Dict]:
+    """What clients need to decode masks themselves"""
+    return [{'name': code.name, 'bit': int(code), 'label': LABELS[int(code)],
+             'param': bool(int(code) & PARAMETERIZED),
+             'scored': not int(code) & PROFILE} for code in Code]
@@ -3,8 +3,27 @@
 """
 
 from supabase import create_client, Client
+import base64
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from metrics import StageTimer
+
+HISTORY_MAX_LIMIT = 200
+
+def encode_cursor(created_at: str, signal_id: int) -> str:
+    """Opaque keyset cursor for the row (created_at, id)"""
+    return base64.urlsafe_b64encode(f"{created_at}|{signal_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, signal_id = raw.rsplit("|", 1)
+        datetime.fromisoformat(created_at)
+        return created_at, int(signal_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
 
 class Database:
     def __init__(self):
@@ -12,8 +31,8 @@ class Database:
         key = os.getenv("SUPABASE_KEY")
         self.client: Client = create_client(url, key)
     
-    async def save_signal(self, signal):
-        """Save signal to database"""
+    async def save_signal(self, signal, scanner: str = 'bacon15m'):
+        """Save signal to database (scanner labels the persistence timing)"""
         try:
             data = {
                 "symbol": signal['symbol'],
@@ -29,7 +48,9 @@ class Database:
                 "created_at": signal['timestamp']
             }
             
+            timer = StageTimer(scanner)
             result = self.client.table('signals').insert(data).execute()
+            timer.lap('persistence')
             return result
         except Exception as e:
             print(f"Error saving signal: {e}")
@@ -51,33 +72,185 @@ class Database:
             print(f"Error getting signals: {e}")
             return []
     
+    async def get_signal_history(self, symbol: Optional[str] = None, direction: Optional[str] = None,
+                                 min_score: Optional[int] = None, max_score: Optional[int] = None,
+                                 cursor: Optional[str] = None, limit: int = 50):
+        """
+        Newest first, keyset-paginated on (created_at, id): each page seeks
+        past the cursor row through idx_signals_*_created_id instead of
+        OFFSET, so page 1000 costs the same as page 1.
+        Returns {"signals": [...], "next_cursor": str | None}.
+        """
+        limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+        query = self.client.table('signals').select("*")
+        if symbol:
+            query = query.eq('symbol', symbol.upper())
+        if direction:
+            query = query.eq('direction', direction.upper())
+        if min_score is not None:
+            query = query.gte('total_score', min_score)
+        if max_score is not None:
+            query = query.lte('total_score', max_score)
+        if cursor:
+            created_at, signal_id = decode_cursor(cursor)
+            # (created_at, id) < (cursor created_at, cursor id)
+            query = query.or_(f'created_at.lt."{created_at}",'
+                              f'and(created_at.eq."{created_at}",id.lt.{signal_id})')
+        
+        # One extra row tells whether another page exists
+        result = query.order('created_at', desc=True)\
+            .order('id', desc=True)\
+            .limit(limit + 1)\
+            .execute()
+        
+        rows = result.data or []
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return {"signals": rows, "next_cursor": next_cursor}
+    
+    async def get_active_watchlists(self, page_size: int = 1000):
+        """[(id, user_id, symbols)] of every active watchlist, paged by id"""
+        watchlists, after = [], 0
+        while True:
+            rows = self.client.table('watchlists')\
+                .select("id,user_id,symbols")\
+                .eq('active', True)\
+                .gt('id', after)\
+                .order('id')\
+                .limit(page_size)\
+                .execute().data or []
+            watchlists += [(r['id'], r['user_id'], r['symbols'] or []) for r in rows]
+            if len(rows) < page_size:
+                return watchlists
+            after = rows[-1]['id']
+    
+    async def get_watchlists(self, user_id: str):
+        result = self.client.table('watchlists')\
+            .select("*")\
+            .eq('user_id', user_id)\
+            .order('id')\
+            .execute()
+        return result.data or []
+    
+    async def save_watchlist(self, user_id: str, name: str, symbols: List[str], active: bool = True):
+        """Create or replace the user's list called `name`"""
+        result = self.client.table('watchlists')\
+            .upsert({
+                "user_id": user_id,
+                "name": name,
+                "symbols": symbols,
+                "active": active,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }, on_conflict="user_id,name")\
+            .execute()
+        return result.data[0] if result.data else None
+    
+    async def delete_watchlist(self, user_id: str, watchlist_id: int) -> bool:
+        result = self.client.table('watchlists')\
+            .delete()\
+            .eq('user_id', user_id)\
+            .eq('id', watchlist_id)\
+            .execute()
+        return bool(result.data)
+    
+    async def get_active_alert_rules(self, page_size: int = 1000):
+        """Every active alert rule, paged by id"""
+        rules, after = [], 0
+        while True:
+            rows = self.client.table('alert_rules')\
+                .select("id,user_id,name,conditions,symbols,watchlist,cooldown_seconds")\
+                .eq('active', True)\
+                .gt('id', after)\
+                .order('id')\
+                .limit(page_size)\
+                .execute().data or []
+            rules += rows
+            if len(rows) < page_size:
+                return rules
+            after = rows[-1]['id']
+    
+    async def get_alert_rules(self, user_id: str):
+        result = self.client.table('alert_rules')\
+            .select("*")\
+            .eq('user_id', user_id)\
+            .order('id')\
+            .execute()
+        return result.data or []
+    
+    async def save_alert_rule(self, user_id: str, name: str, conditions: Dict[str, float],
+                              symbols: Optional[List[str]] = None, watchlist: bool = False,
+                              cooldown_seconds: int = 3600, active: bool = True):
+        """Create or replace the user's rule called `name`"""
+        result = self.client.table('alert_rules')\
+            .upsert({
+                "user_id": user_id,
+                "name": name,
+                "conditions": conditions,
+                "symbols": symbols or None,
+                "watchlist": watchlist,
+                "cooldown_seconds": cooldown_seconds,
+                "active": active,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }, on_conflict="user_id,name")\
+            .execute()
+        return result.data[0] if result.data else None
+    
+    async def delete_alert_rule(self, user_id: str, rule_id: int) -> bool:
+        result = self.client.table('alert_rules')\
+            .delete()\
+            .eq('user_id', user_id)\
+            .eq('id', rule_id)\
+            .execute()
+        return bool(result.data)
+    
     async def get_stats(self):
-        """Get trading stats"""
+        """
+        Get trading stats for today (UTC): closed hours come from the
+        hourly rollups (retention.py), only the open hour reads raw rows.
+        """
         try:
-            # Get today's signals
-            today = datetime.now().date().isoformat()
+            today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
             
-            result = self.client.table('signals')\
-                .select("*")\
-                .gte('created_at', today)\
-                .execute()
+            rollups = self.client.table('signal_rollups')\
+                .select("bucket_start,signal_count,score_sum")\
+                .eq('granularity', 'hour')\
+                .gte('bucket_start', today.isoformat())\
+                .execute().data or []
+            
+            total = sum(r['signal_count'] for r in rollups)
+            score_sum = sum(r['score_sum'] for r in rollups)
+            tail_start = today
+            if rollups:
+                latest = max(datetime.fromisoformat(r['bucket_start']) for r in rollups)
+                tail_start = latest + timedelta(hours=1)
             
-            signals = result.data
+            tail = self.client.table('signals')\
+                .select("total_score")\
+                .gte('created_at', tail_start.isoformat())\
+                .execute().data or []
+            total += len(tail)
+            score_sum += sum(s['total_score'] for s in tail)
             
-            if not signals:
+            if not total:
                 return {
                     "total_signals": 0,
                     "avg_score": 0,
                     "best_signal": None
                 }
             
-            avg_score = sum(s['total_score'] for s in signals) / len(signals)
-            best = max(signals, key=lambda x: x['total_score'])
+            best = self.client.table('signals')\
+                .select("*")\
+                .gte('created_at', today.isoformat())\
+                .order('total_score', desc=True)\
+                .limit(1)\
+                .execute().data
             
             return {
-                "total_signals": len(signals),
-                "avg_score": round(avg_score, 1),
-                "best_signal": best
+                "total_signals": total,
+                "avg_score": round(score_sum / total, 1),
+                "best_signal": best[0] if best else None
             }
         except Exception as e:
             print(f"Error getting stats: {e}")
@@ -0,0 +1,249 @@
+"""
+🥓 Feature Store
+ML features materialized once per (symbol, bar) in append-only columnar
+files and read back through memory maps (zero-copy slices).
+
+Layout:
+    <root>/<symbol>/ts.i64        bar timestamps (UTC, epoch ns)
+    <root>/<symbol>/<column>.f64  one float64 file per column
+
+Backfill:  python feature_store.py backfill --period 10y [SYMBOLS...]
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ml_engine import (build_feature_frame, to_model_inputs, HORIZON, TARGET_RETURN,
+                       VOLATILITY_WINDOW)
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.getenv("BACON_FEATURE_STORE", str(Path(__file__).resolve().parent / "data" / "features"))
+
+RAW_COLUMNS = ['close', 'volume']
+FEATURE_COLUMNS = ['rsi', 'sma_5', 'sma_20', 'vol_ratio', 'price_change_5d', 'volatility']
+COLUMNS = RAW_COLUMNS + FEATURE_COLUMNS
+
+# Bars of history needed to compute the first new row exactly
+LOOKBACK = VOLATILITY_WINDOW + 1
+
+
+def _timestamps(index) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    return index.as_unit('ns').asi8
+
+
+class FeatureStore:
+    """Append-only per-symbol column files"""
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = Path(root)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _map(self, path: Path, dtype, rows: int) -> np.ndarray:
+        if rows == 0 or not path.exists():
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+    def rows(self, symbol: str) -> int:
+        """Committed rows (ts.i64 is written last, so it defines the row count)"""
+        path = self._dir(symbol) / "ts.i64"
+        return path.stat().st_size // 8 if path.exists() else 0
+
+    def symbols(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "ts.i64").exists())
+
+    # ---------- write ----------
+
+    def update(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Append features for bars newer than the stored ones. The last stored
+        bar is rewritten when it changed (in-progress daily bar). Only rows
+        with LOOKBACK bars of context (stored or fetched) are written, and a
+        frame that starts after the stored tail is rejected: the bars in
+        between are unknown, so appending would leave a silent gap. Returns
+        the number of rows written; 0 when nothing moved.
+        """
+        if df is None or df.empty:
+            return 0
+
+        with self._lock(symbol):
+            folder = self._dir(symbol)
+            folder.mkdir(parents=True, exist_ok=True)
+            n = self.rows(symbol)
+            ts = _timestamps(df.index)
+            close = df['Close'].to_numpy(float)
+            volume = df['Volume'].to_numpy(float)
+
+            start = 0
+            prior = np.empty((0, 2))   # stored (close, volume) bars just before the frame
+            if n:
+                stored_ts = self._map(folder / "ts.i64", np.int64, n)
+                last_ts = int(stored_ts[-1])
+                if ts[0] > last_ts:
+                    logger.warning("%s: frame starts after the stored tail, not appended "
+                                   "(backfill with feature_store.py to close the gap)", symbol)
+                    return 0
+                start = int(np.searchsorted(ts, last_ts))
+                if start < len(ts) and ts[start] == last_ts:
+                    unchanged = (self._map(folder / "close.f64", np.float64, n)[-1] == close[start] and
+                                 self._map(folder / "volume.f64", np.float64, n)[-1] == volume[start])
+                    if unchanged and start == len(ts) - 1:
+                        return 0
+                    if not unchanged:
+                        n -= 1  # rewrite the last stored row
+                    else:
+                        start += 1
+                before = int(np.searchsorted(stored_ts[:n], ts[0]))
+                prior = np.column_stack([self._map(folder / f"{c}.f64", np.float64, n)
+                                         [max(0, before - (LOOKBACK - 1)):before]
+                                         for c in RAW_COLUMNS])
+                del stored_ts
+            if start >= len(ts):
+                return 0
+
+            # Row i of the frame has len(prior) + i earlier bars to look back on
+            first = max(start, LOOKBACK - 1 - len(prior))
+            if first >= len(ts) or (n and first > start):
+                return 0
+            lo = len(prior) + first - (LOOKBACK - 1)
+            context = pd.DataFrame({
+                'Close': np.concatenate([prior[:, 0], close])[lo:],
+                'Volume': np.concatenate([prior[:, 1], volume])[lo:],
+            })
+            features = build_feature_frame(context).iloc[LOOKBACK - 1:]
+            values = {'close': close[first:], 'volume': volume[first:]}
+            for column in FEATURE_COLUMNS:
+                values[column] = features[column].to_numpy(float)
+
+            # Drop uncommitted/rewritten tails, then append; ts last = commit
+            for column in COLUMNS:
+                self._append(folder / f"{column}.f64", values[column], n, 8)
+            self._append(folder / "ts.i64", ts[first:].astype(np.int64), n, 8)
+            return len(ts) - first
+
+    def _append(self, path: Path, values: np.ndarray, keep_rows: int, itemsize: int):
+        with open(path, 'ab') as f:
+            if f.tell() != keep_rows * itemsize:
+                f.truncate(keep_rows * itemsize)
+            f.seek(keep_rows * itemsize)
+            values.tofile(f)
+
+    # ---------- read ----------
+
+    def read(self, symbol: str, columns: Sequence[str] = COLUMNS,
+             start: Optional[pd.Timestamp] = None,
+             end: Optional[pd.Timestamp] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """(timestamps, {column: values}) as memory-mapped slices (no copy)"""
+        folder = self._dir(symbol)
+        n = self.rows(symbol)
+        ts = self._map(folder / "ts.i64", np.int64, n)
+        lo, hi = 0, n
+        if start is not None:
+            lo = int(np.searchsorted(ts, pd.Timestamp(start).value, side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(ts, pd.Timestamp(end).value, side='right'))
+        return ts[lo:hi], {c: self._map(folder / f"{c}.f64", np.float64, n)[lo:hi] for c in columns}
+
+    def latest(self, symbol: str, at: Optional[pd.Timestamp] = None,
+               close: Optional[float] = None) -> Optional[Dict]:
+        """
+        Feature dict of the last stored bar, same keys as calculate_ml_features.
+        With at (and close): the bar stamped at (with that close), None when
+        it is not stored, e.g. a fetched frame ending before the stored tail.
+        """
+        n = self.rows(symbol)
+        if n == 0:
+            return None
+        row = n - 1
+        if at is not None:
+            ts = self._map(self._dir(symbol) / "ts.i64", np.int64, n)
+            stamp = _timestamps([at])[0]
+            row = int(np.searchsorted(ts, stamp))
+            if row == n or ts[row] != stamp:
+                return None
+        _, cols = self.read(symbol, COLUMNS)
+        if close is not None and cols['close'][row] != close:
+            return None
+        return {c: float(cols[c][row]) for c in FEATURE_COLUMNS}
+
+    def model_inputs(self, symbol: str, start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, X) in ml_engine.FEATURE_NAMES order"""
+        ts, cols = self.read(symbol, FEATURE_COLUMNS, start, end)
+        return ts, to_model_inputs(cols)
+
+    def training_set(self, symbols: Sequence[str], horizon: int = HORIZON,
+                     target: float = TARGET_RETURN, start=None,
+                     end=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Stacked (X, y, timestamps) with forward-return labels from stored closes"""
+        xs, ys, tss = [], [], []
+        for symbol in symbols:
+            ts, cols = self.read(symbol, COLUMNS, start, end)
+            if len(ts) <= horizon:
+                continue
+            close = cols['close']
+            y = np.full(len(close), np.nan)
+            y[:-horizon] = ((close[horizon:] / close[:-horizon] - 1) * 100 > target)
+            X = to_model_inputs(cols)
+            valid = np.isfinite(X).all(axis=1) & np.isfinite(y)
+            xs.append(X[valid])
+            ys.append(y[valid].astype(np.int8))
+            tss.append(ts[valid].astype('datetime64[ns]'))
+
+        if not xs:
+            raise ValueError("Feature store has no labelled rows for these symbols")
+        return np.vstack(xs), np.concatenate(ys), np.concatenate(tss)
+
+
+_store: Optional[FeatureStore] = None
+
+
+def get_store() -> Optional[FeatureStore]:
+    """Process-wide store (None when BACON_FEATURE_STORE=off)"""
+    global _store
+    if STORE_DIR.lower() == "off":
+        return None
+    if _store is None:
+        _store = FeatureStore(STORE_DIR)
+    return _store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from market_data import get_provider
+
+    parser = argparse.ArgumentParser(description="Backfill the feature store")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("symbols", nargs="*", help="defaults to every market in markets.py")
+    parser.add_argument("--period", default="10y")
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if not symbols:
+        from markets import all_symbols
+        symbols = all_symbols()
+
+    store = FeatureStore(STORE_DIR)
+    provider = get_provider()
+    for symbol in symbols:
+        df = provider.history(symbol, period=args.period, interval="1d")
+        print(f"  {symbol}: +{store.update(symbol, df)} rows")
+    print(f"✅ Feature store at {store.root}")
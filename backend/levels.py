@@ -0,0 +1,259 @@
+"""
+🥓 Levels
+Support / resistance zones and tiered targets for a whole universe at once.
+
+Zones: swing pivots (a high or low that is the extreme of the
+2 * pivot_bars + 1 bars around it) found with one sliding-window max/min
+over a (symbols x bars) array. Pivot prices are sorted per symbol and
+split wherever two neighbours are more than cluster_atr * ATR apart; each
+run is one zone (mean price, touch count). A zone's role depends on where
+price is: resistance above it, support below it.
+
+Targets for a long (mirrored for a short):
+    resistance = first zone above the entry, support = first zone below
+    stop_loss  = support - stop_buffer_atr * ATR, at most max_stop_atr * ATR
+                 away (default_stop_atr * ATR when there is no support)
+    tp1..tp3   = the next three zones above, or entry + k * risk past the
+                 last zone (always increasing)
+    rr         = (tp2 - entry) / (entry - stop_loss)
+
+Zones are cached per symbol until its last bar changes; targets are
+recomputed per call (they depend on the entry) in one vectorized pass.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+LEVEL_FIELDS = ('support', 'resistance', 'tp1', 'tp2', 'tp3', 'stop_loss', 'rr')
+TARGETS = 3
+
+
+def bar_key(df: "pd.DataFrame") -> Optional[tuple]:
+    """Last bar timestamp + bar count: changes when a new bar prints"""
+    if df is None or df.empty:
+        return None
+    return (df.index[-1], len(df))
+
+
+@dataclass(slots=True)
+class Zones:
+    prices: np.ndarray    # zone centres, ascending
+    touches: np.ndarray   # pivots per zone
+    atr: float
+    close: float          # last close when the zones were computed
+
+
+# ============================================
+# ZONES (one pass over the stacked universe)
+# ============================================
+
+def stack(frames: List["pd.DataFrame"], lookback: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """High / Low / Close of the last `lookback` bars, right-aligned, NaN-padded"""
+    shape = (len(frames), lookback)
+    high, low, close = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    for i, df in enumerate(frames):
+        n = min(len(df), lookback)
+        if n:
+            high[i, -n:] = df['High'].to_numpy()[-n:]
+            low[i, -n:] = df['Low'].to_numpy()[-n:]
+            close[i, -n:] = df['Close'].to_numpy()[-n:]
+    return high, low, close
+
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    prev_close = np.roll(close, 1, axis=1)
+    prev_close[:, 0] = np.nan
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    recent = true_range[:, -period:]
+    counts = (~np.isnan(recent)).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, np.nansum(recent, axis=1) / counts, np.nan)
+
+
+def pivots(high: np.ndarray, low: np.ndarray, bars: int) -> np.ndarray:
+    """Pivot-high and pivot-low prices (NaN elsewhere), side by side per symbol"""
+    width = 2 * bars + 1
+    if high.shape[1] < width:
+        return np.full((high.shape[0], 0), np.nan)
+    middle = slice(bars, high.shape[1] - bars)
+    # NaN anywhere in a window makes its max / min NaN, so padding never pivots
+    is_high = high[:, middle] == sliding_window_view(high, width, axis=1).max(axis=2)
+    is_low = low[:, middle] == sliding_window_view(low, width, axis=1).min(axis=2)
+    return np.concatenate([np.where(is_high, high[:, middle], np.nan),
+                           np.where(is_low, low[:, middle], np.nan)], axis=1)
+
+
+def cluster(prices: np.ndarray, tolerance: np.ndarray, min_touches: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pivot prices (symbols x pivots, NaN = none) -> zone centres and touch
+    counts (symbols x zones, ascending, NaN / 0 padded)
+    """
+    count, width = prices.shape
+    if not width:
+        return np.full((count, 0), np.nan), np.zeros((count, 0), dtype=np.int64)
+    ordered = np.sort(prices, axis=1)  # NaN last
+    valid = ~np.isnan(ordered)
+    with np.errstate(invalid='ignore'):
+        breaks = np.diff(ordered, axis=1) > tolerance[:, None]
+    zone = np.concatenate([np.zeros((count, 1), dtype=np.int64), np.cumsum(breaks, axis=1)], axis=1)
+    flat = (np.arange(count)[:, None] * width + zone)[valid]
+    touches = np.bincount(flat, minlength=count * width).reshape(count, width)
+    sums = np.bincount(flat, weights=ordered[valid], minlength=count * width).reshape(count, width)
+    keep = touches >= min_touches
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centres = np.where(keep, sums / touches, np.nan)
+    touches = np.where(keep, touches, 0)
+    if min_touches > 1:
+        order = np.argsort(centres, axis=1)  # dropped zones (NaN) last
+        centres = np.take_along_axis(centres, order, axis=1)
+        touches = np.take_along_axis(touches, order, axis=1)
+    used = int(keep.sum(axis=1).max()) if count else 0
+    return centres[:, :used], touches[:, :used]
+
+
+# ============================================
+# TARGETS (one pass per call)
+# ============================================
+
+def targets(zones: np.ndarray, atr: np.ndarray, entry: np.ndarray, direction: np.ndarray,
+            min_gap_atr: float = 0.2, stop_buffer_atr: float = 0.25, max_stop_atr: float = 2.0,
+            default_stop_atr: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    zones: symbols x zones (NaN padded), atr / entry / direction (+1 long,
+    -1 short) per symbol -> {field: array} for LEVEL_FIELDS
+    """
+    sign = np.where(direction < 0, -1.0, 1.0)
+    # Mirror shorts so that "above the entry" always means "in the trade's favour"
+    z, e = np.sort(zones * sign[:, None], axis=1), entry * sign
+    gap = (min_gap_atr * atr)[:, None]
+    with np.errstate(invalid='ignore'):
+        ahead = np.sort(np.where(z > e[:, None] + gap, z, np.inf), axis=1)
+        behind = np.where(z < e[:, None] - gap, z, -np.inf).max(axis=1, initial=-np.inf)
+
+    has_support = np.isfinite(behind)
+    stop = np.where(has_support,
+                    np.maximum(behind - stop_buffer_atr * atr, e - max_stop_atr * atr),
+                    e - default_stop_atr * atr)
+    risk = e - stop
+    tps, previous = [], e
+    for k in range(TARGETS):
+        zone = ahead[:, k] if ahead.shape[1] > k else np.full(len(e), np.inf)
+        tp = np.where(np.isfinite(zone), zone, np.maximum(e + (k + 1) * risk, previous + risk))
+        tps.append(tp)
+        previous = tp
+    first = ahead[:, 0] if ahead.shape[1] else np.full(len(e), np.inf)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rr = (tps[1] - e) / risk
+
+    resistance = np.where(np.isfinite(first), first, np.nan)
+    support = np.where(has_support, behind, np.nan)
+    return {
+        # Mirrored back: a short's "resistance" side is the real support
+        'support': np.where(sign > 0, support, -resistance),
+        'resistance': np.where(sign > 0, resistance, -support),
+        'tp1': tps[0] * sign,
+        'tp2': tps[1] * sign,
+        'tp3': tps[2] * sign,
+        'stop_loss': stop * sign,
+        'rr': rr,
+    }
+
+
+# ============================================
+# ENGINE
+# ============================================
+
+class LevelEngine:
+    """Zones cached per (symbol, interval) until a new bar; targets per call"""
+
+    def __init__(self, lookback: int = 120, pivot_bars: int = 2, atr_period: int = 14,
+                 cluster_atr: float = 0.5, min_touches: int = 1):
+        self.lookback = lookback
+        self.pivot_bars = pivot_bars
+        self.atr_period = atr_period
+        self.cluster_atr = cluster_atr
+        self.min_touches = min_touches
+        self._cache: Dict[Hashable, Tuple[tuple, Zones]] = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.reused = 0
+
+    def compute(self, frames: List["pd.DataFrame"]) -> List[Zones]:
+        """Zones of every frame in one pass (no cache)"""
+        if not frames:
+            return []
+        high, low, close = stack(frames, self.lookback)
+        atr = average_true_range(high, low, close, self.atr_period)
+        centres, touches = cluster(pivots(high, low, self.pivot_bars), self.cluster_atr * atr, self.min_touches)
+        last = close[:, -1]
+        out = []
+        for i in range(len(frames)):
+            used = touches[i] > 0
+            out.append(Zones(prices=centres[i][used], touches=touches[i][used], atr=float(atr[i]),
+                             close=float(last[i])))
+        return out
+
+    def zones(self, frames: Dict[str, "pd.DataFrame"], interval: str = '1d') -> Dict[str, Zones]:
+        """Cached zones; every symbol with a new bar is recomputed in one batch"""
+        out, stale = {}, []
+        with self._lock:
+            for symbol, df in frames.items():
+                key = bar_key(df)
+                if key is None:
+                    continue
+                cached = self._cache.get((symbol, interval))
+                if cached is not None and cached[0] == key:
+                    out[symbol] = cached[1]
+                    self.reused += 1
+                else:
+                    stale.append((symbol, key, df))
+        fresh = self.compute([df for _, _, df in stale])
+        with self._lock:
+            for (symbol, key, _), zones in zip(stale, fresh):
+                self._cache[(symbol, interval)] = (key, zones)
+                out[symbol] = zones
+            self.computed += len(stale)
+        return out
+
+    def levels(self, frames: Dict[str, "pd.DataFrame"], entries: Optional[Dict[str, float]] = None,
+               directions: Optional[Dict[str, int]] = None, interval: str = '1d') -> Dict[str, Dict]:
+        """
+        {symbol: {support, resistance, tp1, tp2, tp3, stop_loss, rr}} (None
+        where undefined). Entry defaults to the last close, direction to long.
+        """
+        zones = self.zones(frames, interval)
+        symbols = list(zones)
+        if not symbols:
+            return {}
+        width = max(len(zones[s].prices) for s in symbols)
+        grid = np.full((len(symbols), width), np.nan)
+        for i, symbol in enumerate(symbols):
+            grid[i, :len(zones[symbol].prices)] = zones[symbol].prices
+        entries, directions = entries or {}, directions or {}
+        columns = targets(
+            grid,
+            np.array([zones[s].atr for s in symbols]),
+            np.array([entries.get(s, zones[s].close) for s in symbols], dtype=np.float64),
+            np.array([directions.get(s, 1) for s in symbols]),
+        )
+        rows = {name: np.where(np.isfinite(values), values, np.nan).tolist() for name, values in columns.items()}
+        return {symbol: {name: None if rows[name][i] != rows[name][i] else rows[name][i] for name in LEVEL_FIELDS}
+                for i, symbol in enumerate(symbols)}
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == symbol]:
+                    del self._cache[key]
+
+
+LEVELS = LevelEngine()
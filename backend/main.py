@@ -1,18 +1,188 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
-import yfinance as yf
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import requests
+from typing import List, Optional, Dict, TYPE_CHECKING
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import os
+import asyncio
 import json
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-import uvicorn
+import threading
+import time
 
-app = FastAPI(title="🥓 BaconAlgo API", version="3.0.0")
+from market_data import get_provider
+import markets
+from markets import MARKETS, market_of
+from priority_scheduler import PriorityScheduler
+from sessions import SessionScheduler, calendar_for
+from topk import TopKBoard
+from watchlists import WATCHLISTS, normalize_symbols
+from auth import AuthError, current_user, verify_token
+from bacon_signal_pusher import BaconSignalPusher, WebSocketSink
+import confluences as confluence_codes
+import strategies
+import metrics
+from metrics import (StageTimer, SCAN_QUEUE_DEPTH, SYMBOLS_SCANNED, SYMBOLS_SIGNALLED, SYMBOLS_ERRORED,
+                     SYMBOLS_REUSED)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ============================================
+# STARTUP
+# ============================================
+# pandas / numpy / yfinance (and the ML model) are NOT imported at module
+# load: the server binds and answers /health first, then a background
+# thread warms everything up. The first scan imports whatever is missing.
+WARM = threading.Event()
+
+def warm_up():
+    """Import heavy modules off the request path"""
+    start = time.perf_counter()
+    try:
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+        get_provider().warm_up()
+        import ml_engine
+        import feature_store  # noqa: F401
+        ml_engine.get_engine()
+    except Exception as e:
+        print(f"⚠️  Warm-up error: {e}")
+    finally:
+        WARM.set()
+    print(f"🔥 Warm-up done in {time.perf_counter() - start:.2f}s")
+
+# Background scans per market, only while a market can print new bars
+# (BACON_SCHEDULER=on; cadence via BACON_SCAN_CADENCE, see sessions.py)
+SCHEDULER = SessionScheduler(list(MARKETS))
+_scheduler_stop = threading.Event()
+
+def scheduled_scan(market: str):
+    refresh_watchlists()
+    symbols = with_watchlists(MARKETS[market], market)
+    print(f"⏰ Scheduled scan: {market} ({len(symbols)} symbols)")
+    run_scan(symbols)
+
+# User watchlists join the scan universe once per symbol, however many users
+# watch it; results are fanned out to subscribers after each scan
+# (reloaded from Supabase every BACON_WATCHLIST_REFRESH seconds)
+WATCHLIST_REFRESH = float(os.getenv("BACON_WATCHLIST_REFRESH", "300"))
+
+def refresh_watchlists(force: bool = False):
+    if not os.getenv("SUPABASE_URL"):
+        return
+    if not force and WATCHLISTS.loaded_at and time.time() - WATCHLISTS.loaded_at < WATCHLIST_REFRESH:
+        return
+    try:
+        WATCHLISTS.replace(asyncio.run(get_database().get_active_watchlists()), loaded_at=time.time())
+        print(f"👀 Watchlists: {WATCHLISTS.stats()}")
+        retire_symbols()
+    except Exception as e:
+        print(f"⚠️  Watchlist refresh failed: {e}")
+
+# New signals and matched alerts leave through one non-blocking pusher:
+# /ws/signals clients, plus BACON_PUSH_URL / BACON_PUSH_FILE when set
+SIGNAL_SOCKETS = WebSocketSink()
+PUSHER = BaconSignalPusher()
+PUSHER.add_sink(SIGNAL_SOCKETS)
+
+# Alert rules (alerts.py) are re-checked on every recomputed row; reloaded
+# from Supabase every BACON_ALERT_REFRESH seconds
+ALERT_REFRESH = float(os.getenv("BACON_ALERT_REFRESH", "300"))
+
+def alert_engine():
+    import alerts
+    if not alerts.ALERTS.sinks:
+        alerts.ALERTS.add_sink(alerts.DiscordSink(send_discord_alert))
+        alerts.ALERTS.add_sink(alerts.PusherSink(PUSHER))
+    return alerts.ALERTS
+
+def refresh_alert_rules(force: bool = False):
+    if not os.getenv("SUPABASE_URL"):
+        return
+    import alerts
+    engine = alert_engine()
+    if not force and engine.loaded_at and time.time() - engine.loaded_at < ALERT_REFRESH:
+        return
+    try:
+        rules = []
+        for record in asyncio.run(get_database().get_active_alert_rules()):
+            try:
+                rules.append(alerts.rule_from_record(record))
+            except (KeyError, ValueError) as e:
+                print(f"⚠️  Skipping alert rule {record.get('id')}: {e}")
+        engine.index.replace(rules)
+        engine.loaded_at = time.time()
+        print(f"🔔 Alert rules: {engine.stats()['rules']}")
+    except Exception as e:
+        print(f"⚠️  Alert rule refresh failed: {e}")
+
+def with_watchlists(symbols: List[str], market: Optional[str] = None) -> List[str]:
+    """symbols plus every watched symbol (of market), each once"""
+    watched = [s for s in WATCHLISTS.union() if market is None or market_of(s) == market]
+    return list(dict.fromkeys(symbols + watched))
+
+def retire_symbols():
+    """Unwatched symbols outside the built-in universe leave the snapshot and top-K board"""
+    import snapshot
+    universe = with_watchlists(markets.all_symbols())
+    snapshot.STORE.retain(universe)
+    TOP.retain(universe)
+
+def sync_adaptive():
+    """Keep the adaptive queue on the built-in universe + watched symbols"""
+    wanted = set(with_watchlists(markets.all_symbols()))
+    for symbol in wanted - set(ADAPTIVE.states):
+        ADAPTIVE.add(symbol)
+    for symbol in set(ADAPTIVE.states) - wanted:
+        ADAPTIVE.remove(symbol)
+
+# BACON_SCHEDULER=adaptive: per-symbol refresh from a priority queue instead,
+# within BACON_FETCH_BUDGET fetches per minute (see priority_scheduler.py)
+ADAPTIVE = PriorityScheduler(markets.all_symbols(), budget_per_minute=float(os.getenv("BACON_FETCH_BUDGET", "60")))
+
+def adaptive_scan(symbols: List[str]):
+    analyze_symbols(symbols)
+    for symbol in symbols:
+        stats = SYMBOL_STATS.get(symbol)
+        if stats:
+            ADAPTIVE.observe(symbol, *stats)
+    publish_snapshot(symbols)
+    metrics.mark_snapshot()
+    refresh_watchlists()
+    sync_adaptive()
+
+def defer_closed(symbol: str, now: float) -> Optional[float]:
+    """Closed market: hold the symbol until its next session opens"""
+    calendar = calendar_for(market_of(symbol))
+    state = ADAPTIVE.states.get(symbol)
+    since = datetime.fromtimestamp(state.last_run, timezone.utc) if state and state.last_run else None
+    moment = datetime.fromtimestamp(now, timezone.utc)
+    if calendar.has_new_bars(since, moment):
+        return None
+    next_open = calendar.next_open(moment)
+    return next_open.timestamp() if next_open else now + 3600
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=warm_up, name="bacon-warm-up", daemon=True).start()
+    mode = os.getenv("BACON_SCHEDULER", "off").lower()
+    if mode == "on":
+        _scheduler_stop.clear()
+        threading.Thread(target=SCHEDULER.run, args=(scheduled_scan, _scheduler_stop),
+                         name="bacon-scheduler", daemon=True).start()
+    elif mode == "adaptive":
+        _scheduler_stop.clear()
+        refresh_watchlists()
+        sync_adaptive()
+        threading.Thread(target=ADAPTIVE.run, args=(adaptive_scan, _scheduler_stop, defer_closed),
+                         name="bacon-adaptive-scheduler", daemon=True).start()
+    yield
+    _scheduler_stop.set()
+
+app = FastAPI(title="🥓 BaconAlgo API", version="3.0.0", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -42,7 +212,12 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "BaconAlgo API"}
+    return {"status": "healthy", "service": "BaconAlgo API", "warm": WARM.is_set()}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 # ============================================
 # DISCORD WEBHOOK CONFIGURATION
 # ============================================
@@ -51,29 +226,9 @@ DISCORD_WEBHOOK_URL = "https://discord.gg/cDyupY2G"  # Ton lien Discord
 # ============================================
 # MARKET LISTS
 # ============================================
-US_STOCKS = [
-    'AAPL', 'TSLA', 'NVDA', 'MSFT', 'GOOGL', 'AMZN', 'META', 'AMD', 
-    'SPY', 'QQQ', 'PLTR', 'SOFI', 'RIVN', 'LCID', 'NIO', 'BABA',
-    'COIN', 'MARA', 'RIOT', 'SHOP', 'SQ', 'PYPL', 'V', 'MA',
-    'DIS', 'NFLX', 'BA', 'JPM', 'BAC', 'WMT', 'PFE', 'MRNA'
-]
-
-CANADIAN_STOCKS = [
-    'TD.TO', 'RY.TO', 'ENB.TO', 'CNQ.TO', 'CNR.TO', 'BMO.TO',
-    'BNS.TO', 'CM.TO', 'TRP.TO', 'SU.TO', 'BCE.TO', 'T.TO',
-    'SHOP.TO', 'WCN.TO', 'CP.TO', 'MFC.TO'
-]
-
-FUTURES = [
-    'ES=F', 'NQ=F', 'YM=F', 'RTY=F',  # Indices
-    'GC=F', 'SI=F',  # Métaux
-    'CL=F', 'NG=F',  # Énergie
-]
-
-CRYPTO = [
-    'BTC-USD', 'ETH-USD', 'BNB-USD', 'SOL-USD', 'ADA-USD',
-    'XRP-USD', 'DOGE-USD', 'AVAX-USD', 'MATIC-USD', 'LINK-USD'
-]
+from markets import US_STOCKS, CANADIAN_STOCKS, FUTURES, CRYPTO
+
+SCANNER_NAME = "daily"  # label for metrics
 
 # ============================================
 # MODELS & SCHEMAS
@@ -90,22 +245,130 @@ class SignalResult(BaseModel):
     avwap_5d: Optional[float]
     avwap_13d: Optional[float]
     avwap_21d: Optional[float]
-    confluences: List[str]
+    confluences: Optional[List[str]]
+    profile_confluences: Optional[List[str]] = None
     confluence_count: int
+    confluence_mask: int = 0
+    confluence_params: List[float] = []
     ml_prediction: Optional[str] = None
     ml_confidence: Optional[float] = None
 
+SIGNAL_RATINGS = {
+    "🔥 ULTRA STRONG SIGNAL": "strong-buy",
+    "⭐ HIGH QUALITY SIGNAL": "buy",
+    "✅ MEDIUM SIGNAL": "hold",
+}
+
+@dataclass(slots=True)
+class ScanRow:
+    """
+    Internal scan result: no validation, no per-field dict, confluences as
+    a bitmask + params. Converted to JSON (or SignalResult) only at the
+    response boundary.
+    """
+    symbol: str
+    price: float
+    signal: str
+    rsi: float
+    volume: int
+    volume_ratio: float
+    change_1d: float
+    change_5d: float
+    avwap_5d: Optional[float]
+    avwap_13d: Optional[float]
+    avwap_21d: Optional[float]
+    confluence_mask: int
+    confluence_params: tuple
+    confluence_count: int
+    ml_prediction: Optional[str] = None
+    ml_confidence: Optional[float] = None
+
+    def labels(self) -> List[str]:
+        """Scored confluences (confluence_count of them)"""
+        return confluence_codes.labels(self.confluence_mask & ~confluence_codes.PROFILE,
+                                       self.confluence_params)
+
+    def profile_labels(self) -> List[str]:
+        """Volume profile confluences: shown, not scored"""
+        return confluence_codes.labels(self.confluence_mask & confluence_codes.PROFILE)
+
+    def to_dict(self, labels: bool = True) -> Dict:
+        """SignalResult shape; labels=False leaves decoding to the client"""
+        return {
+            "symbol": self.symbol,
+            "price": float(self.price),
+            "signal": self.signal,
+            "rsi": float(self.rsi),
+            "volume": int(self.volume),
+            "volume_ratio": float(self.volume_ratio),
+            "change_1d": float(self.change_1d),
+            "change_5d": float(self.change_5d),
+            "avwap_5d": self.avwap_5d,
+            "avwap_13d": self.avwap_13d,
+            "avwap_21d": self.avwap_21d,
+            "confluences": self.labels() if labels else None,
+            "profile_confluences": self.profile_labels() if labels else None,
+            "confluence_mask": self.confluence_mask,
+            "confluence_params": list(self.confluence_params),
+            "confluence_count": self.confluence_count,
+            "ml_prediction": self.ml_prediction,
+            "ml_confidence": self.ml_confidence,
+        }
+
+    def to_model(self) -> SignalResult:
+        return SignalResult(**self.to_dict())
+
+    def to_signal(self, levels: Optional[Dict] = None) -> Dict:
+        """BaconSignalPusher payload (targets / stop / zones from levels.py)"""
+        return {
+            **(levels or {}),
+            "symbol": self.symbol,
+            "timeframe": "1d",
+            "style": "swing",
+            "rating": SIGNAL_RATINGS.get(self.signal, "hold"),
+            "score": self.confluence_count,
+            "entry": float(self.price),
+            "setup": ", ".join(self.labels()),
+            "confluence": min(100, round(100 * self.confluence_count / confluence_codes.MAX_DAILY)),
+            "description": f"{self.signal} | RSI {self.rsi:.1f} | Volume {self.volume_ratio:.1f}x"
+                           f" | ML {self.ml_prediction} ({self.ml_confidence or 0:.0f}%)",
+        }
+
+def json_response(payload) -> Response:
+    """Serialize with orjson when installed (handles numpy floats too)"""
+    try:
+        import orjson
+    except ImportError:
+        return JSONResponse(payload)
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+                    media_type="application/json")
+
+class WatchlistRequest(BaseModel):
+    name: str = "Default"
+    symbols: List[str]
+    active: bool = True
+
+class AlertRuleRequest(BaseModel):
+    name: str
+    conditions: Dict[str, float]  # same keys as /api/screen, e.g. {"rsi_lt": 30}
+    symbols: Optional[List[str]] = None
+    watchlist: bool = False
+    cooldown_seconds: int = 3600
+    active: bool = True
+
 class ScanResponse(BaseModel):
     total_scanned: int
     signals_found: int
     results: List[SignalResult]
     scan_time: str
+    reused: int = 0
+    reuse_ratio: float = 0.0
 
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
 
-def calculate_rsi(data: pd.Series, period: int = 14) -> float:
+def calculate_rsi(data: "pd.Series", period: int = 14) -> float:
     """Calculate RSI"""
     try:
         delta = data.diff()
@@ -117,7 +380,7 @@ def calculate_rsi(data: pd.Series, period: int = 14) -> float:
     except:
         return 50.0
 
-def calculate_avwap(df: pd.DataFrame, days: int) -> float:
+def calculate_avwap(df: "pd.DataFrame", days: int) -> float:
     """Calculate Anchored VWAP"""
     try:
         df_period = df.tail(days)
@@ -127,8 +390,24 @@ def calculate_avwap(df: pd.DataFrame, days: int) -> float:
     except:
         return 0.0
 
-def calculate_ml_features(df: pd.DataFrame) -> Dict:
-    """Calculate ML features"""
+def calculate_atr_pct(df: "pd.DataFrame", period: int = 14) -> Optional[float]:
+    """Average True Range as % of the last close"""
+    try:
+        recent = df.tail(period + 1)
+        prev_close = recent['Close'].shift()
+        high_low = recent['High'] - recent['Low']
+        high_close = (recent['High'] - prev_close).abs()
+        low_close = (recent['Low'] - prev_close).abs()
+        true_range = high_low.where(high_low >= high_close, high_close)
+        true_range = true_range.where(true_range >= low_close, low_close).iloc[1:]
+        return float(true_range.mean() / recent['Close'].iloc[-1] * 100)
+    except:
+        return None
+
+def calculate_ml_features(df: "pd.DataFrame") -> Dict:
+    """Calculate ML features (volatility over the same window as ml_engine and the feature store)"""
+    from ml_engine import VOLATILITY_WINDOW
+    
     try:
         close = df['Close']
         volume = df['Volume']
@@ -139,24 +418,31 @@ def calculate_ml_features(df: pd.DataFrame) -> Dict:
             'sma_20': close.rolling(20).mean().iloc[-1],
             'vol_ratio': volume.iloc[-1] / volume.rolling(20).mean().iloc[-1],
             'price_change_5d': ((close.iloc[-1] - close.iloc[-5]) / close.iloc[-5]) * 100,
-            'volatility': close.pct_change().std() * 100
+            'volatility': close.pct_change().rolling(VOLATILITY_WINDOW, min_periods=20).std().iloc[-1] * 100
         }
         return features
     except:
         return None
 
+def stored_ml_features(symbol: str, df: "pd.DataFrame") -> Optional[Dict]:
+    """ML features from the feature store (only new bars get computed)"""
+    from feature_store import get_store
+    
+    store = get_store()
+    if store is not None:
+        try:
+            store.update(symbol, df)
+            # The stored tail may be newer than a stale or short fetch
+            features = store.latest(symbol, at=df.index[-1], close=float(df['Close'].iloc[-1]))
+            if features:
+                return features
+        except Exception as e:
+            print(f"⚠️  Feature store error for {symbol}: {e}")
+    return calculate_ml_features(df)
+
 def ml_predict(features: Dict) -> tuple:
-    """Simple ML prediction using Random Forest"""
+    """Rule-based prediction, used when no trained model is available"""
     try:
-        # Créer des features pour le modèle
-        X = np.array([[
-            features['rsi'],
-            features['sma_5'] / features['sma_20'],
-            features['vol_ratio'],
-            features['price_change_5d'],
-            features['volatility']
-        ]])
-        
         # Prédiction simple basée sur les règles
         score = 0
         
@@ -192,7 +478,32 @@ def ml_predict(features: Dict) -> tuple:
     except:
         return "NEUTRAL", 50.0
 
-def send_discord_webhook(signal: SignalResult):
+def ml_predict_batch(features_list: List[Optional[Dict]]) -> List[tuple]:
+    """Predict for a whole batch with ONE predict_proba call (rules if no model)"""
+    import ml_engine
+    
+    engine = ml_engine.get_engine()
+    predictions = [("NEUTRAL", 50.0)] * len(features_list)
+    rows = [i for i, f in enumerate(features_list) if f]
+    if not rows:
+        return predictions
+    
+    if engine is None:
+        for i in rows:
+            predictions[i] = ml_predict(features_list[i])
+        return predictions
+    
+    try:
+        X = ml_engine.to_model_inputs([features_list[i] for i in rows])
+        for i, prediction in zip(rows, engine.predict(X)):
+            predictions[i] = prediction
+    except Exception as e:
+        print(f"❌ ML batch error: {e}")
+        for i in rows:
+            predictions[i] = ml_predict(features_list[i])
+    return predictions
+
+def send_discord_webhook(signal: ScanRow):
     """Send signal to Discord webhook"""
     try:
         # Créer l'embed Discord
@@ -223,7 +534,7 @@ def send_discord_webhook(signal: SignalResult):
                 },
                 {
                     "name": "✅ Signaux Détectés",
-                    "value": "\n".join([f"• {c}" for c in signal.confluences[:5]]),
+                    "value": "\n".join([f"• {c}" for c in signal.labels()[:5]]),
                     "inline": False
                 }
             ],
@@ -247,6 +558,7 @@ def send_discord_webhook(signal: SignalResult):
         print(f"📢 Discord Signal: {signal.symbol} - {signal.signal}")
         
         # Si tu as un vrai webhook URL:
+        # import requests
         # response = requests.post(DISCORD_WEBHOOK_URL, json=payload)
         # if response.status_code == 204:
         #     print(f"✅ Discord webhook sent for {signal.symbol}")
@@ -254,71 +566,150 @@ def send_discord_webhook(signal: SignalResult):
     except Exception as e:
         print(f"❌ Discord webhook error: {e}")
 
-def analyze_symbol(symbol: str) -> Optional[SignalResult]:
-    """Analyze a single symbol"""
+def send_discord_alert(alert):
+    """Send a matched alert rule (alerts.Alert) to Discord"""
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period="3mo", interval="1d")
+        embed = {
+            "title": f"🔔 {alert.name or 'Alert'} - {alert.symbol}",
+            "description": " | ".join(f"{name}: {value:.2f}" for name, value in alert.values.items()),
+            "color": 0x4D96FF,
+            "footer": {
+                "text": "🥓 BaconAlgo Alerts"
+            },
+            "timestamp": datetime.fromtimestamp(alert.triggered_at, timezone.utc).isoformat()
+        }
+        
+        payload = {
+            "embeds": [embed],
+            "username": "BaconAlgo Bot"
+        }
+        
+        # Même chose que send_discord_webhook: print tant qu'il n'y a pas de webhook URL
+        print(f"📢 Discord Alert: {alert.symbol} - {alert.name} (user {alert.user_id})")
         
-        if df.empty or len(df) < 30:
+    except Exception as e:
+        print(f"❌ Discord alert error: {e}")
+
+# ============================================
+# DELTA SCANNING
+# ============================================
+# Daily bars only move when a new bar prints (or today's bar updates), so a
+# symbol whose last bar is identical to the previous scan gets its previous
+# result back without recomputing indicators, confluences or ML.
+# Symbols of a closed market are not even fetched (see sessions.py).
+_delta_cache: Dict[str, tuple] = {}   # symbol -> (fingerprint, ScanRow or None, fetched_at)
+_delta_lock = threading.Lock()
+
+def bar_fingerprint(df: "pd.DataFrame") -> Optional[tuple]:
+    """Last bar timestamp + OHLCV (None when there are no bars)"""
+    if df is None or df.empty:
+        return None
+    last = df.iloc[-1]
+    return (str(df.index[-1]), len(df)) + tuple(
+        float(last[c]) for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in df.columns)
+
+# Last computed (atr_pct, volume_ratio, grade distance) per symbol, for the
+# adaptive scheduler
+SYMBOL_STATS: Dict[str, tuple] = {}
+
+GRADE_THRESHOLDS = (2, 4, 6)  # confluences for MEDIUM / HIGH / ULTRA
+
+def grade_distance(confluence_count: int) -> int:
+    """Confluences to gain or lose before the signal grade changes (>= 1)"""
+    return min(confluence_count - t + 1 if confluence_count >= t else t - confluence_count
+               for t in GRADE_THRESHOLDS)
+
+def reset_delta_cache():
+    """Forget every fingerprint (e.g. after loading a new ML model)"""
+    with _delta_lock:
+        _delta_cache.clear()
+
+def fetch_bars(symbol: str) -> Optional["pd.DataFrame"]:
+    """Daily bars for the scan (timed as the 'fetch' stage)"""
+    SYMBOLS_SCANNED.inc(scanner=SCANNER_NAME)
+    timer = StageTimer(SCANNER_NAME)
+    try:
+        df = get_provider().history(symbol, period="3mo", interval="1d")
+        timer.lap("fetch")
+        return df
+    except Exception as e:
+        SYMBOLS_ERRORED.inc(scanner=SCANNER_NAME)
+        print(f"Error fetching {symbol}: {e}")
+        return None
+
+def prepare_symbol(symbol: str, df: Optional["pd.DataFrame"] = None,
+                   bars: Optional[strategies.SymbolBars] = None) -> Optional[Dict]:
+    """
+    Compute indicators and non-ML confluences (fetches when neither df nor
+    bars is given). Indicators come from the shared SymbolBars, so other
+    strategies on the data plane reuse them.
+    """
+    if bars is None:
+        if df is None:
+            df = fetch_bars(symbol)
+            if df is None:
+                return None
+        bars = strategies.SymbolBars(symbol, {'1d': df})
+    df = bars.frames.get('1d')
+    timer = StageTimer(SCANNER_NAME)
+    try:
+        if df is None or df.empty or len(df) < 30:
             return None
         
-        info = ticker.info
-        current_price = float(df['Close'].iloc[-1])
+        current_price = bars.indicator('close', '1d')
         volume = int(df['Volume'].iloc[-1])
-        avg_volume = float(df['Volume'].rolling(20).mean().iloc[-1])
-        volume_ratio = volume / avg_volume if avg_volume > 0 else 0
+        volume_ratio = bars.indicator('volume_ratio', '1d', 20)
         
         # Calculate indicators
-        rsi = calculate_rsi(df['Close'])
-        change_1d = ((df['Close'].iloc[-1] - df['Close'].iloc[-2]) / df['Close'].iloc[-2]) * 100
-        change_5d = ((df['Close'].iloc[-1] - df['Close'].iloc[-6]) / df['Close'].iloc[-6]) * 100
-        
-        avwap_5d = calculate_avwap(df, 5)
-        avwap_13d = calculate_avwap(df, 13)
-        avwap_21d = calculate_avwap(df, 21)
-        
-        # Detect confluences
-        confluences = []
+        rsi = bars.indicator('rsi', '1d', 14)
+        change_1d = bars.indicator('change', '1d', 1)
+        change_5d = bars.indicator('change', '1d', 5)
         
-        # RSI signals
-        if rsi < 30:
-            confluences.append("RSI Oversold (<30)")
-        elif rsi < 40:
-            confluences.append("RSI Buy Zone (30-40)")
+        avwap_5d = bars.indicator('avwap', '1d', 5)
+        avwap_13d = bars.indicator('avwap', '1d', 13)
+        avwap_21d = bars.indicator('avwap', '1d', 21)
+        atr_pct = bars.indicator('atr_pct', '1d', 14)
+        ml_features = stored_ml_features(symbol, df)
+        timer.lap("indicators")
         
-        # Volume spike
-        if volume_ratio > 2.0:
-            confluences.append(f"Volume Explosion ({volume_ratio:.1f}x)")
-        elif volume_ratio > 1.5:
-            confluences.append(f"High Volume ({volume_ratio:.1f}x)")
+        # Detect confluences: one bit each, params in bit order (see confluences.py)
+        mask, params = confluence_codes.detect_daily(current_price, rsi, volume_ratio, change_1d, change_5d,
+                                                     avwap_5d, avwap_13d, avwap_21d)
+        timer.lap("scoring")
         
-        # AVWAP signals
-        if current_price > avwap_5d:
-            confluences.append("Price > AVWAP 5D")
-        if current_price > avwap_13d:
-            confluences.append("Price > AVWAP 13D")
-        if current_price > avwap_21d:
-            confluences.append("Price > AVWAP 21D")
-        
-        # Momentum
-        if change_5d > 5:
-            confluences.append(f"Strong 5D Momentum (+{change_5d:.1f}%)")
-        elif change_5d > 2:
-            confluences.append(f"Positive 5D Momentum (+{change_5d:.1f}%)")
-        
-        # Price action
-        if change_1d > 3:
-            confluences.append(f"Today's Breakout (+{change_1d:.1f}%)")
-        
-        # ML Prediction
-        ml_features = calculate_ml_features(df)
-        ml_prediction, ml_confidence = ml_predict(ml_features) if ml_features else ("NEUTRAL", 50.0)
+        return {
+            'symbol': symbol,
+            'price': current_price,
+            'rsi': rsi,
+            'volume': volume,
+            'volume_ratio': volume_ratio,
+            'change_1d': change_1d,
+            'change_5d': change_5d,
+            'avwap_5d': avwap_5d,
+            'avwap_13d': avwap_13d,
+            'avwap_21d': avwap_21d,
+            'atr_pct': atr_pct,
+            'confluence_mask': mask,
+            'confluence_params': params,
+            'ml_features': ml_features,
+        }
         
-        if ml_prediction in ["STRONG BUY", "BUY"]:
-            confluences.append(f"ML: {ml_prediction} ({ml_confidence:.0f}%)")
+    except Exception as e:
+        SYMBOLS_ERRORED.inc(scanner=SCANNER_NAME)
+        print(f"Error analyzing {symbol}: {e}")
+        return None
+
+def finalize_symbol(prepared: Dict, ml_prediction: str, ml_confidence: float,
+                    publish: bool = True) -> Optional[ScanRow]:
+    """Add the ML confluence, grade the signal and alert (publish=False: no Discord)"""
+    symbol = prepared['symbol']
+    timer = StageTimer(SCANNER_NAME)
+    try:
+        if ml_prediction in confluence_codes.ML_CODES:
+            prepared['confluence_mask'] |= confluence_codes.ML_CODES[ml_prediction]
+            prepared['confluence_params'].append(ml_confidence)
         
-        confluence_count = len(confluences)
+        confluence_count = confluence_codes.score(prepared['confluence_mask'])
         
         # Determine signal strength
         if confluence_count >= 6:
@@ -328,36 +719,219 @@ def analyze_symbol(symbol: str) -> Optional[SignalResult]:
         elif confluence_count >= 2:
             signal = "✅ MEDIUM SIGNAL"
         else:
+            timer.lap("scoring")
             return None
         
-        result = SignalResult(
+        result = ScanRow(
             symbol=symbol,
-            price=current_price,
+            price=prepared['price'],
             signal=signal,
-            rsi=rsi,
-            volume=volume,
-            volume_ratio=volume_ratio,
-            change_1d=change_1d,
-            change_5d=change_5d,
-            avwap_5d=avwap_5d,
-            avwap_13d=avwap_13d,
-            avwap_21d=avwap_21d,
-            confluences=confluences,
+            rsi=prepared['rsi'],
+            volume=prepared['volume'],
+            volume_ratio=prepared['volume_ratio'],
+            change_1d=prepared['change_1d'],
+            change_5d=prepared['change_5d'],
+            avwap_5d=prepared['avwap_5d'],
+            avwap_13d=prepared['avwap_13d'],
+            avwap_21d=prepared['avwap_21d'],
+            confluence_mask=prepared['confluence_mask'],
+            confluence_params=tuple(prepared['confluence_params']),
             confluence_count=confluence_count,
             ml_prediction=ml_prediction,
             ml_confidence=ml_confidence
         )
+        timer.lap("scoring")
+        SYMBOLS_SIGNALLED.inc(scanner=SCANNER_NAME)
         
         # Send to Discord if ULTRA or HIGH signal
-        if "ULTRA" in signal or "HIGH" in signal:
+        if publish and ("ULTRA" in signal or "HIGH" in signal):
             send_discord_webhook(result)
+            timer.lap("alerting")
         
         return result
         
     except Exception as e:
+        SYMBOLS_ERRORED.inc(scanner=SCANNER_NAME)
         print(f"Error analyzing {symbol}: {e}")
         return None
 
+def predict_prepared(prepared: List[Dict]) -> List[tuple]:
+    """Batched ML over prepared symbols (timed as the 'ml' stage)"""
+    timer = StageTimer(SCANNER_NAME)
+    predictions = ml_predict_batch([p['ml_features'] for p in prepared])
+    timer.lap("ml")
+    return predictions
+
+def add_profile_confluences(prepared: List[Dict], frames: Dict[str, "pd.DataFrame"]):
+    """Volume profile confluences of every prepared symbol in one pass"""
+    import volume_profile
+    
+    if not prepared:
+        return
+    timer = StageTimer(SCANNER_NAME)
+    profiles = volume_profile.PROFILES.profiles({p['symbol']: frames[p['symbol']] for p in prepared})
+    for item in prepared:
+        profile = profiles.get(item['symbol'])
+        if profile is not None:
+            item['confluence_mask'] |= confluence_codes.detect_profile(item['price'], profile.poc,
+                                                                       profile.vah, profile.hvn)
+    timer.lap("scoring")
+
+def snapshot_row(prepared: Dict, result: Optional[ScanRow], ml_prediction: str,
+                 ml_confidence: float) -> Dict:
+    """Screenable row for every analyzed symbol, signal or not"""
+    row = {k: v for k, v in prepared.items() if k not in ('confluence_params', 'ml_features')}
+    row.update(
+        market=market_of(prepared['symbol']),
+        signal=result.signal if result else None,
+        confluence_count=confluence_codes.score(prepared['confluence_mask']),
+        ml_prediction=ml_prediction,
+        ml_confidence=ml_confidence,
+    )
+    return row
+
+def analyze_symbols(symbols: List[str], publish: bool = True) -> tuple:
+    """
+    Fetch every symbol, recompute only those whose last bar changed since
+    the previous scan (one ML batch for all of them) and reuse the cached
+    result for the rest. Returns (results, reused_count).
+    publish=False is a read-only look: no Discord, signal push, watchlist
+    fan-out or alert rules, and the delta cache, snapshot, top-K board and
+    scheduler stats are left alone so the next scan still publishes
+    whatever changed.
+    """
+    import snapshot
+    import levels
+    
+    results, prepared, fingerprints, rows = [], [], {}, []
+    frames, signalled = {}, []
+    reused = 0
+    remaining = len(symbols)
+    SCAN_QUEUE_DEPTH.inc(remaining)
+    try:
+        for symbol in symbols:
+            with _delta_lock:
+                cached = _delta_cache.get(symbol)
+            if cached is not None and not calendar_for(market_of(symbol)).has_new_bars(cached[2]):
+                # Market shut since the last fetch: nothing can have changed
+                remaining -= 1
+                SCAN_QUEUE_DEPTH.dec()
+                reused += 1
+                if cached[1] is not None:
+                    results.append(cached[1])
+                continue
+            fetched_at = datetime.now(timezone.utc)
+            df = fetch_bars(symbol)
+            remaining -= 1
+            SCAN_QUEUE_DEPTH.dec()
+            if df is None:
+                continue
+            fingerprint = bar_fingerprint(df)
+            if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+                with _delta_lock:
+                    _delta_cache[symbol] = (fingerprint, cached[1], fetched_at)
+                reused += 1
+                if cached[1] is not None:
+                    results.append(cached[1])
+                continue
+            fingerprints[symbol] = (fingerprint, fetched_at)
+            item = prepare_symbol(symbol, df)
+            if item:
+                prepared.append(item)
+                frames[symbol] = df
+            elif fingerprint is not None:
+                with _delta_lock:
+                    _delta_cache[symbol] = (fingerprint, None, fetched_at)
+    finally:
+        SCAN_QUEUE_DEPTH.dec(remaining)
+    
+    add_profile_confluences(prepared, frames)
+    for item, (ml_prediction, ml_confidence) in zip(prepared, predict_prepared(prepared)):
+        result = finalize_symbol(item, ml_prediction, ml_confidence, publish)
+        if publish:
+            SYMBOL_STATS[item['symbol']] = (item['atr_pct'], item['volume_ratio'],
+                                            grade_distance(confluence_codes.score(item['confluence_mask'])))
+            row = snapshot_row(item, result, ml_prediction, ml_confidence)
+            snapshot.STORE.upsert(row)
+            rows.append(row)
+            TOP.offer(item['symbol'], result)
+            fingerprint, fetched_at = fingerprints[item['symbol']]
+            if fingerprint is not None:
+                with _delta_lock:
+                    _delta_cache[item['symbol']] = (fingerprint, result, fetched_at)
+        if result:
+            results.append(result)
+            signalled.append(result)
+            print(f"✅ {result.symbol}: {result.signal} ({result.confluence_count} confluences)")
+    
+    if signalled and publish:
+        # Zones / targets of every new signal in one pass (zones cached per bar)
+        targets = levels.LEVELS.levels({r.symbol: frames[r.symbol] for r in signalled},
+                                       entries={r.symbol: r.price for r in signalled})
+        for result in signalled:
+            PUSHER.push_signal(result.to_signal(targets.get(result.symbol)))
+    
+    SYMBOLS_REUSED.inc(reused, scanner=SCANNER_NAME)
+    if not publish:
+        return results, reused
+    WATCHLISTS.fan_out(symbols, results)
+    # Reused symbols did not move, so only recomputed rows can flip a rule
+    if rows:
+        refresh_alert_rules()
+        alert_engine().evaluate(rows, WATCHLISTS.subscribers)
+    return results, reused
+
+def analyze_symbol(symbol: str) -> Optional[ScanRow]:
+    """Analyze a single symbol (read-only: nothing is pushed or alerted)"""
+    results, _ = analyze_symbols([symbol], publish=False)
+    return results[0] if results else None
+
+class DailyConfluenceStrategy(strategies.Strategy):
+    """This scanner (batched ML included) as a data plane strategy"""
+    
+    name = SCANNER_NAME
+    timeframes = {'1d': '3mo'}
+    
+    def evaluate(self, bars: strategies.SymbolBars) -> Optional[Dict]:
+        item = prepare_symbol(bars.symbol, bars=bars)
+        if item:
+            add_profile_confluences([item], {bars.symbol: bars.frame('1d')})
+        return item
+    
+    def finish(self, prepared: List[Dict]) -> List[Dict]:
+        # On-demand strategy scans are read-only, like GET /api/symbol
+        results = []
+        for item, (ml_prediction, ml_confidence) in zip(prepared, predict_prepared(prepared)):
+            result = finalize_symbol(item, ml_prediction, ml_confidence, publish=False)
+            if result:
+                results.append(result)
+        results.sort(key=lambda x: x.confluence_count, reverse=True)
+        return [r.to_dict() for r in results]
+
+strategies.register(DailyConfluenceStrategy())
+
+# Best signals overall and per market, kept in bounded heaps as results
+# arrive; /api/top reads a pre-sorted slice
+TOP_K = 200
+TOP = TopKBoard(TOP_K, key=lambda r: r.confluence_count, market_of=market_of)
+MARKET_ALIASES = {"canadian": "ca"}
+
+def publish_snapshot(scanned: List[str] = ()):
+    import snapshot
+    snapshot.STORE.publish()
+    TOP.publish(scanned)
+
+def run_scan(symbols: List[str]) -> tuple:
+    """Delta scan sorted by confluence count -> (results, reused_count)"""
+    results, reused = analyze_symbols(symbols)
+    results.sort(key=lambda x: x.confluence_count, reverse=True)
+    ratio = reused / len(symbols) if symbols else 0.0
+    metrics.SCAN_REUSE_RATIO.set(ratio, scanner=SCANNER_NAME)
+    publish_snapshot(symbols)
+    print(f"♻️  Reused {reused}/{len(symbols)} unchanged symbols ({ratio:.0%})")
+    metrics.mark_snapshot()
+    return results, reused
+
 # ============================================
 # API ENDPOINTS
 # ============================================
@@ -378,35 +952,30 @@ def root():
     }
 
 @app.get("/api/scan", response_model=ScanResponse)
-def scan_all_markets(background_tasks: BackgroundTasks):
-    """Scan all markets"""
+def scan_all_markets(background_tasks: BackgroundTasks, labels: bool = True):
+    """Scan all markets (labels=false: masks only, decode via /api/confluences)"""
     start_time = datetime.now()
     
     all_symbols = US_STOCKS + CANADIAN_STOCKS + FUTURES + CRYPTO
-    results = []
     
     print(f"🔍 Scanning {len(all_symbols)} symbols...")
     
-    for symbol in all_symbols:
-        result = analyze_symbol(symbol)
-        if result:
-            results.append(result)
-            print(f"✅ {symbol}: {result.signal} ({result.confluence_count} confluences)")
-    
-    # Sort by confluence count
-    results.sort(key=lambda x: x.confluence_count, reverse=True)
+    # Sorted by confluence count
+    results, reused = run_scan(all_symbols)
     
     scan_time = (datetime.now() - start_time).total_seconds()
     
-    return ScanResponse(
-        total_scanned=len(all_symbols),
-        signals_found=len(results),
-        results=results,
-        scan_time=f"{scan_time:.2f}s"
-    )
+    return json_response({
+        "total_scanned": len(all_symbols),
+        "signals_found": len(results),
+        "results": [r.to_dict(labels) for r in results],
+        "scan_time": f"{scan_time:.2f}s",
+        "reused": reused,
+        "reuse_ratio": round(reused / len(all_symbols), 4)
+    })
 
 @app.get("/api/scan/{market}", response_model=ScanResponse)
-def scan_market(market: str):
+def scan_market(market: str, labels: bool = True):
     """Scan specific market"""
     start_time = datetime.now()
     
@@ -422,45 +991,318 @@ def scan_market(market: str):
     if not symbols:
         raise HTTPException(status_code=400, detail=f"Market '{market}' not found. Use: us, ca, futures, crypto")
     
-    results = []
     print(f"🔍 Scanning {market.upper()} market ({len(symbols)} symbols)...")
     
-    for symbol in symbols:
-        result = analyze_symbol(symbol)
-        if result:
-            results.append(result)
-    
-    results.sort(key=lambda x: x.confluence_count, reverse=True)
+    results, reused = run_scan(symbols)
     scan_time = (datetime.now() - start_time).total_seconds()
     
-    return ScanResponse(
-        total_scanned=len(symbols),
-        signals_found=len(results),
-        results=results,
-        scan_time=f"{scan_time:.2f}s"
-    )
+    return json_response({
+        "total_scanned": len(symbols),
+        "signals_found": len(results),
+        "results": [r.to_dict(labels) for r in results],
+        "scan_time": f"{scan_time:.2f}s",
+        "reused": reused,
+        "reuse_ratio": round(reused / len(symbols), 4)
+    })
 
 @app.get("/api/symbol/{symbol}", response_model=SignalResult)
-def analyze_single_symbol(symbol: str):
+def analyze_single_symbol(symbol: str, labels: bool = True):
     """Analyze a single symbol"""
     result = analyze_symbol(symbol.upper())
     if not result:
         raise HTTPException(status_code=404, detail=f"No signal found for {symbol}")
-    return result
+    return json_response(result.to_dict(labels))
 
 @app.get("/api/top/{count}")
-def get_top_signals(count: int = 10):
-    """Get top signals across all markets"""
-    all_symbols = US_STOCKS + CANADIAN_STOCKS + FUTURES + CRYPTO
-    results = []
-    
-    for symbol in all_symbols:
-        result = analyze_symbol(symbol)
-        if result:
-            results.append(result)
+def get_top_signals(count: int = 10, market: Optional[str] = None, refresh: bool = False,
+                    confluences: Optional[str] = None, labels: bool = True):
+    """
+    Top signals across all markets (or one), from the last scan's top-K:
+    at most TOP_K (200), larger counts are clamped. Markets never scanned,
+    or scanned longer ago than their cadence (BACON_SCAN_CADENCE), are
+    rescanned first, so the boards stay fresh without BACON_SCHEDULER.
+    confluences=VOLUME_EXPLOSION,ML_BUY keeps signals having all of those codes.
+    """
+    try:
+        required = confluence_codes.parse(confluences.split(",")) if confluences else 0
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if market:
+        market = MARKET_ALIASES.get(market.lower(), market.lower())
+        if market not in MARKETS:
+            raise HTTPException(status_code=400, detail=f"Market '{market}' not found. Use: us, ca, futures, crypto")
+    wanted = [market] if market else list(MARKETS)
+    now = time.time()
+    stale = wanted if refresh else \
+        [m for m in wanted if (TOP.scanned_at(m) or 0) < now - SCHEDULER.cadence.get(m, 300)]
+    if stale:
+        run_scan(list(dict.fromkeys(symbol for m in stale for symbol in MARKETS[m])))
+    top = TOP.top(TOP_K, market)
+    if required:
+        top = [r for r in top if confluence_codes.matches(r.confluence_mask, required)]
+    count = min(max(count, 0), TOP_K)
+    return json_response({"top_signals": [r.to_dict(labels) for r in top[:count]]})
+
+@app.get("/api/confluences")
+def confluence_table():
+    """Bit -> name/label table for decoding confluence_mask on the client"""
+    return {"codes": confluence_codes.code_table()}
+
+@app.get("/api/strategies")
+def list_strategies():
+    """Registered data plane strategies and the last plane scan"""
+    latest = strategies.PLANE.latest
+    return {
+        "strategies": [{"name": s.name, "timeframes": s.timeframes} for s in strategies.STRATEGIES.values()],
+        "last_scan": datetime.fromtimestamp(latest.created_at, timezone.utc).isoformat() if latest else None,
+    }
+
+@app.get("/api/strategies/scan")
+def scan_strategies(market: Optional[str] = None, names: Optional[str] = None, refresh: bool = True):
+    """
+    One fetch per symbol, every strategy (or names=daily,bacon15m) over it.
+    refresh=false returns the last plane snapshot.
+    """
+    selected = [n.strip() for n in names.split(",") if n.strip()] if names else None
+    unknown = [n for n in selected or [] if n not in strategies.STRATEGIES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown strategies: {', '.join(unknown)}")
+    if market:
+        market = MARKET_ALIASES.get(market.lower(), market.lower())
+        if market not in MARKETS:
+            raise HTTPException(status_code=400, detail=f"Market '{market}' not found. Use: us, ca, futures, crypto")
+    if refresh or strategies.PLANE.latest is None:
+        snapshot = strategies.PLANE.scan(MARKETS[market] if market else markets.all_symbols(), selected)
+    else:
+        snapshot = strategies.PLANE.latest
+    return json_response(snapshot.to_dict())
+
+@app.get("/api/sessions")
+def market_sessions():
+    """Session state and scan schedule per market"""
+    return SCHEDULER.status()
+
+@app.get("/api/schedule")
+def symbol_schedule(limit: int = 20):
+    """Next symbols due in the adaptive scheduler"""
+    return {"budget_per_minute": ADAPTIVE.budget, "symbols": len(ADAPTIVE), "next": ADAPTIVE.status(limit)}
+
+@app.get("/api/screen")
+def screen(request: Request, sort: Optional[str] = None, limit: int = 20):
+    """
+    Screen the latest snapshot, e.g.
+    /api/screen?rsi_lt=30&volume_ratio_gt=2&market=crypto&sort=-confluence_count&limit=20
+    /api/screen?confluences=VOLUME_EXPLOSION,ABOVE_AVWAP_21D&confluences_none=RSI_OVERSOLD
+    """
+    import snapshot
     
-    results.sort(key=lambda x: x.confluence_count, reverse=True)
-    return {"top_signals": results[:count]}
+    current = snapshot.STORE.current
+    filters = {k: v for k, v in request.query_params.items() if k not in ('sort', 'limit')}
+    try:
+        result = current.screen(filters, sort, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result['symbols'] = len(current)
+    result['as_of'] = datetime.fromtimestamp(current.created_at, timezone.utc).isoformat()
+    return result
+
+_database = None
+
+def get_database():
+    """Supabase client, created on first use (supabase is optional for scanning)"""
+    global _database
+    if _database is None:
+        from database import Database
+        _database = Database()
+    return _database
+
+@app.get("/api/signals/history")
+async def signal_history(symbol: Optional[str] = None, direction: Optional[str] = None,
+                         min_score: Optional[int] = None, max_score: Optional[int] = None,
+                         cursor: Optional[str] = None, limit: int = 50):
+    """Stored signals, newest first; pass next_cursor back to get the next page"""
+    try:
+        db = get_database()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Signal history unavailable: {e}")
+    try:
+        return await db.get_signal_history(symbol, direction, min_score, max_score, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Signal history query failed: {e}")
+
+@app.get("/api/watchlists/stats")
+def watchlist_stats():
+    """Index size: subscriptions vs the unique symbols actually scanned"""
+    return WATCHLISTS.stats()
+
+@app.get("/api/watchlists")
+async def get_watchlists(user_id: str = Depends(current_user)):
+    try:
+        return {"watchlists": await get_database().get_watchlists(user_id)}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Watchlists unavailable: {e}")
+
+@app.put("/api/watchlists")
+async def save_watchlist(request: WatchlistRequest, user_id: str = Depends(current_user)):
+    """Create or replace a list; its symbols join the next scan cycle"""
+    try:
+        symbols = normalize_symbols(request.symbols)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    name = request.name.strip()[:50] or "Default"
+    try:
+        saved = await get_database().save_watchlist(user_id, name, symbols, request.active)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Watchlists unavailable: {e}")
+    if saved:
+        if saved.get('active', True):
+            WATCHLISTS.set_list(saved['id'], user_id, symbols)
+        else:
+            WATCHLISTS.remove_list(saved['id'])
+    return {"watchlist": saved}
+
+@app.delete("/api/watchlists/{watchlist_id}")
+async def delete_watchlist(watchlist_id: int, user_id: str = Depends(current_user)):
+    try:
+        deleted = await get_database().delete_watchlist(user_id, watchlist_id)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Watchlists unavailable: {e}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Watchlist {watchlist_id} not found")
+    WATCHLISTS.remove_list(watchlist_id)
+    return {"deleted": watchlist_id}
+
+@app.get("/api/watchlists/signals")
+def watchlist_signals(labels: bool = True, user_id: str = Depends(current_user)):
+    """Latest signals on the user's lists, from the shared scan"""
+    feed = sorted(WATCHLISTS.feed(user_id), key=lambda r: r.confluence_count, reverse=True)
+    return json_response({"signals": [r.to_dict(labels) for r in feed],
+                          "symbols": len(WATCHLISTS.symbols_of(user_id))})
+
+@app.get("/api/alerts/stats")
+def alert_stats():
+    return alert_engine().stats()
+
+@app.get("/api/alerts")
+async def get_alert_rules(user_id: str = Depends(current_user)):
+    try:
+        return {"rules": await get_database().get_alert_rules(user_id)}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Alert rules unavailable: {e}")
+
+@app.put("/api/alerts")
+async def save_alert_rule(request: AlertRuleRequest, user_id: str = Depends(current_user)):
+    """
+    Create or replace a rule, e.g. {"name": "oversold", "conditions":
+    {"rsi_lt": 30, "volume_ratio_gt": 2}, "watchlist": true}. Without
+    symbols or watchlist it watches every scanned symbol.
+    """
+    import alerts
+    try:
+        alerts.parse_conditions(request.conditions)
+        symbols = normalize_symbols(request.symbols) if request.symbols else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    name = request.name.strip()[:50]
+    if not name:
+        raise HTTPException(status_code=400, detail="A rule needs a name")
+    cooldown = max(0, request.cooldown_seconds)
+    try:
+        saved = await get_database().save_alert_rule(user_id, name, request.conditions, symbols,
+                                                     request.watchlist, cooldown, request.active)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Alert rules unavailable: {e}")
+    if saved:
+        engine = alert_engine()
+        if saved.get('active', True):
+            engine.index.add(alerts.rule_from_record(saved))
+        else:
+            engine.index.remove(saved['id'])
+    return {"rule": saved}
+
+@app.delete("/api/alerts/{rule_id}")
+async def delete_alert_rule(rule_id: int, user_id: str = Depends(current_user)):
+    try:
+        deleted = await get_database().delete_alert_rule(user_id, rule_id)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Alert rules unavailable: {e}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Alert rule {rule_id} not found")
+    alert_engine().index.remove(rule_id)
+    return {"deleted": rule_id}
+
+@app.get("/api/levels/{symbol}")
+def symbol_levels(symbol: str, direction: str = "long"):
+    """Support / resistance zones and tiered targets from daily pivots"""
+    import levels
+    if direction not in ("long", "short"):
+        raise HTTPException(status_code=400, detail="direction must be 'long' or 'short'")
+    symbol = symbol.upper()
+    df = fetch_bars(symbol)
+    if df is None or df.empty:
+        raise HTTPException(status_code=404, detail=f"No bars for {symbol}")
+    frames = {symbol: df}
+    zones = levels.LEVELS.zones(frames)[symbol]
+    targets = levels.LEVELS.levels(frames, directions={symbol: 1 if direction == "long" else -1})[symbol]
+    return {
+        "symbol": symbol,
+        "direction": direction,
+        "entry": zones.close,
+        "atr": zones.atr,
+        **targets,
+        "zones": [{"price": float(p), "touches": int(t)} for p, t in zip(zones.prices, zones.touches)],
+    }
+
+@app.get("/api/profile/{symbol}")
+def symbol_profile(symbol: str):
+    """Volume profile (POC, value area, high / low volume nodes) of the daily scan bars"""
+    import volume_profile
+    symbol = symbol.upper()
+    df = fetch_bars(symbol)
+    if df is None or df.empty:
+        raise HTTPException(status_code=404, detail=f"No bars for {symbol}")
+    profile = volume_profile.PROFILES.profiles({symbol: df}).get(symbol)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No volume for {symbol}")
+    price = float(df['Close'].iloc[-1])
+    mask = confluence_codes.detect_profile(price, profile.poc, profile.vah, profile.hvn)
+    return {
+        "symbol": symbol,
+        "price": price,
+        **profile.to_dict(),
+        "confluences": confluence_codes.labels(mask),
+    }
+
+@app.get("/api/push/stats")
+def push_stats():
+    """Signal pusher queue, coalescing and delivery counters"""
+    return {**PUSHER.stats(), "websocket_clients": len(SIGNAL_SOCKETS)}
+
+@app.websocket("/ws/signals")
+async def signal_stream(websocket: WebSocket, token: Optional[str] = None):
+    """
+    New signals as they are found, plus the user's own alerts when
+    ?token= carries a valid Supabase access token (browsers cannot set
+    headers on a WebSocket). A bad token is refused before the handshake.
+    """
+    user_id = None
+    if token:
+        try:
+            user_id = verify_token(token)
+        except AuthError:
+            await websocket.close(code=1008)
+            return
+    await websocket.accept()
+    SIGNAL_SOCKETS.register(websocket, user_id)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        SIGNAL_SOCKETS.unregister(websocket)
 
 @app.get("/api/markets")
 def list_markets():
@@ -478,7 +1320,7 @@ def test_discord_webhook():
     """Test Discord webhook"""
     try:
         # Create a test signal
-        test_signal = SignalResult(
+        test_signal = ScanRow(
             symbol="TEST",
             price=100.00,
             signal="🔥 ULTRA STRONG SIGNAL",
@@ -490,7 +1332,9 @@ def test_discord_webhook():
             avwap_5d=98.5,
             avwap_13d=97.0,
             avwap_21d=95.5,
-            confluences=["RSI Oversold", "Volume Explosion", "ML: STRONG BUY"],
+            confluence_mask=(confluence_codes.RSI_OVERSOLD | confluence_codes.VOLUME_EXPLOSION |
+                             confluence_codes.ML_STRONG_BUY),
+            confluence_params=(2.5, 85.0),
             confluence_count=3,
             ml_prediction="STRONG BUY",
             ml_confidence=85.0
@@ -520,4 +1364,5 @@ if __name__ == "__main__":
     print("📚 Docs: http://localhost:8000/docs")
     print("\n" + "🥓" * 30 + "\n")
     
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -7,13 +7,16 @@ Complete Trading Platform - Simplified & Working
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Optional
 
+import confluences as cc
+from market_data import get_provider
+from topk import TopK
+
 # Setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,8 +49,7 @@ WATCHLIST_CRYPTO = ['BTC-USD', 'ETH-USD', 'SOL-USD', 'BNB-USD']
 
 def get_stock_data(symbol: str, period: str = "30d") -> Optional[pd.DataFrame]:
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period)
+        df = get_provider().history(symbol, period=period)
         return df if not df.empty else None
     except Exception as e:
         logger.error(f"Error fetching {symbol}: {e}")
@@ -89,30 +91,10 @@ def analyze_symbol(symbol: str) -> Optional[Dict]:
         price_change_1d = ((current_price - df['Close'].iloc[-2]) / df['Close'].iloc[-2] * 100)
         price_change_5d = ((current_price - df['Close'].iloc[-6]) / df['Close'].iloc[-6] * 100) if len(df) >= 6 else 0
         
-        confluences = []
-        
-        if avwap_5 and avwap_13 and avwap_21:
-            if current_price > avwap_5 > avwap_13 > avwap_21:
-                confluences.append("AVWAP Bullish")
-            elif current_price < avwap_5 < avwap_13 < avwap_21:
-                confluences.append("AVWAP Bearish")
-        
-        if rsi < 30:
-            confluences.append("RSI Oversold")
-        elif rsi > 70:
-            confluences.append("RSI Overbought")
-        
-        if volume_ratio > 2:
-            confluences.append("Volume Spike 2x+")
-        elif volume_ratio > 1.5:
-            confluences.append("Strong Volume")
-        
-        if price_change_5d > 5:
-            confluences.append("Strong Uptrend")
-        elif price_change_5d < -5:
-            confluences.append("Strong Downtrend")
+        mask = cc.detect_avwap_stack(current_price, rsi, volume_ratio, price_change_5d,
+                                     avwap_5, avwap_13, avwap_21)
         
-        conf_count = len(confluences)
+        conf_count = cc.count(mask)
         signal = "?? ULTRA" if conf_count >= 4 else "? HIGH" if conf_count >= 3 else "? MEDIUM" if conf_count >= 2 else "? LOW"
         
         return {
@@ -126,7 +108,8 @@ def analyze_symbol(symbol: str) -> Optional[Dict]:
             "avwap_21d": round(avwap_21, 2) if avwap_21 else None,
             "change_1d": round(price_change_1d, 2),
             "change_5d": round(price_change_5d, 2),
-            "confluences": confluences,
+            "confluences": cc.labels(mask),
+            "confluence_mask": mask,
             "confluence_count": conf_count,
             "signal": signal,
             "timestamp": datetime.now().isoformat()
@@ -157,7 +140,8 @@ async def health():
 
 @app.get("/api/scan")
 async def scan_all():
-    results = []
+    top = TopK(20, key=lambda x: x['confluence_count'])
+    signals_found = 0
     all_symbols = WATCHLIST_US + WATCHLIST_CA + WATCHLIST_FUTURES + WATCHLIST_CRYPTO
     
     logger.info(f"?? Scanning {len(all_symbols)} symbols...")
@@ -165,14 +149,13 @@ async def scan_all():
     for symbol in all_symbols:
         analysis = analyze_symbol(symbol)
         if analysis and analysis['confluence_count'] >= 2:
-            results.append(analysis)
-    
-    results.sort(key=lambda x: x['confluence_count'], reverse=True)
+            signals_found += 1
+            top.push(analysis)
     
     return {
         "total_scanned": len(all_symbols),
-        "signals_found": len(results),
-        "results": results[:20],
+        "signals_found": signals_found,
+        "results": top.sorted(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -0,0 +1,236 @@
+"""
+🥓 Market Data Providers
+Pluggable OHLCV sources: live yfinance or deterministic local replay
+"""
+
+import os
+import random
+import threading
+import time
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# yfinance period suffixes -> days (checked in this order)
+PERIOD_UNITS = [('wk', 7), ('mo', 30), ('y', 365), ('d', 1)]
+
+
+def period_to_timedelta(period: str) -> Optional[timedelta]:
+    """Convert a yfinance period ('5d', '3mo', '1y') to a timedelta. 'max' -> None"""
+    period = period.strip().lower()
+    for suffix, days in PERIOD_UNITS:
+        if period.endswith(suffix):
+            try:
+                return timedelta(days=int(period[:-len(suffix)]) * days)
+            except ValueError:
+                return None
+    return None
+
+
+class MarketDataProvider:
+    """Base interface for OHLCV sources"""
+
+    name = "base"
+
+    def history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> "pd.DataFrame":
+        """Return OHLCV bars indexed by timestamp (empty DataFrame if unavailable)"""
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Import client libraries ahead of the first request"""
+        import pandas  # noqa: F401
+
+    def info(self, symbol: str) -> Dict:
+        """Return static metadata for a symbol"""
+        return {}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance"""
+
+    name = "yfinance"
+
+    def _ticker(self, symbol: str):
+        import yfinance as yf
+        return yf.Ticker(symbol)
+
+    def history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> "pd.DataFrame":
+        return self._ticker(symbol).history(period=period, interval=interval)
+
+    def warm_up(self):
+        import yfinance  # noqa: F401
+
+    def info(self, symbol: str) -> Dict:
+        return self._ticker(symbol).info
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serve OHLCV from local fixtures with optional injected latency.
+
+    Fixtures live in `<root>/<interval>/<symbol>.parquet` (or `.csv`), or can be
+    passed in memory via `frames={(symbol, interval): df}`. Periods are sliced
+    relative to the last bar of the fixture, so results do not depend on the
+    wall clock. Latency is `latency + U(0, jitter)` seconds per call, drawn from
+    a seeded RNG so runs are reproducible.
+    """
+
+    name = "replay"
+
+    def __init__(self, root: Optional[str] = None,
+                 frames: Optional[Dict[Tuple[str, str], "pd.DataFrame"]] = None,
+                 latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.root = Path(root) if root else None
+        self.frames: Dict[Tuple[str, str], "pd.DataFrame"] = dict(frames or {})
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sleep(self):
+        if self.latency <= 0 and self.jitter <= 0:
+            return
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        time.sleep(delay)
+
+    def _load(self, symbol: str, interval: str) -> Optional["pd.DataFrame"]:
+        import pandas as pd
+
+        key = (symbol, interval)
+        df = self.frames.get(key)
+        if df is not None or self.root is None:
+            return df
+
+        base = self.root / interval / symbol
+        parquet, csv = base.with_suffix('.parquet'), base.with_suffix('.csv')
+        if parquet.exists():
+            df = pd.read_parquet(parquet)
+        elif csv.exists():
+            df = pd.read_csv(csv, index_col=0)
+        else:
+            return None
+
+        df.index = pd.to_datetime(df.index, utc=True)
+        df = df.sort_index()
+        self.frames[key] = df
+        return df
+
+    def history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> "pd.DataFrame":
+        import pandas as pd
+
+        self._sleep()
+        df = self._load(symbol, interval)
+        if df is None:
+            logger.warning(f"No replay fixture for {symbol} ({interval})")
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        window = period_to_timedelta(period)
+        if window is not None and not df.empty:
+            df = df[df.index > df.index[-1] - window]
+        return df.copy()
+
+    def info(self, symbol: str) -> Dict:
+        self._sleep()
+        return {"symbol": symbol}
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+def save_fixture(df: "pd.DataFrame", root: str, symbol: str, interval: str, fmt: str = "parquet") -> Path:
+    """Write bars to `<root>/<interval>/<symbol>.<fmt>`"""
+    path = Path(root) / interval / f"{symbol}.{fmt}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+    if fmt == "parquet":
+        df.to_parquet(path)
+    else:
+        df.to_csv(path)
+    return path
+
+
+def record_fixtures(symbols: Iterable[str], root: str, period: str = "1y",
+                    interval: str = "1d", fmt: str = "parquet") -> int:
+    """Download bars from yfinance and store them as replay fixtures"""
+    live = YFinanceProvider()
+    saved = 0
+    for symbol in symbols:
+        try:
+            df = live.history(symbol, period=period, interval=interval)
+            if df.empty:
+                continue
+            save_fixture(df, root, symbol, interval, fmt)
+            saved += 1
+        except Exception as e:
+            logger.error(f"Error recording {symbol}: {e}")
+    return saved
+
+
+# ============================================
+# ACTIVE PROVIDER
+# ============================================
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def provider_from_env() -> MarketDataProvider:
+    """
+    BACON_DATA_PROVIDER=yfinance|replay
+    BACON_REPLAY_DIR, BACON_REPLAY_LATENCY_MS, BACON_REPLAY_JITTER_MS
+    BACON_RESAMPLE_BASE=15m derives coarser intervals from one base fetch
+    (BACON_RESAMPLE_PERIOD, BACON_RESAMPLE_TTL; see resample.py)
+    """
+    kind = os.getenv("BACON_DATA_PROVIDER", "yfinance").lower()
+    if kind == "replay":
+        provider = ReplayProvider(
+            root=os.getenv("BACON_REPLAY_DIR", "fixtures"),
+            latency=float(os.getenv("BACON_REPLAY_LATENCY_MS", "0")) / 1000,
+            jitter=float(os.getenv("BACON_REPLAY_JITTER_MS", "0")) / 1000,
+        )
+    else:
+        provider = YFinanceProvider()
+
+    base = os.getenv("BACON_RESAMPLE_BASE")
+    if base:
+        from resample import ResamplingProvider
+        provider = ResamplingProvider(provider, base,
+                                      base_period=os.getenv("BACON_RESAMPLE_PERIOD", "60d"),
+                                      ttl=float(os.getenv("BACON_RESAMPLE_TTL", "60")))
+    return provider
+
+
+def get_provider() -> MarketDataProvider:
+    global _provider
+    if _provider is None:
+        _provider = provider_from_env()
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    global _provider
+    _provider = provider
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record replay fixtures from yfinance")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--root", default="fixtures")
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--format", default="parquet", choices=["parquet", "csv"])
+    args = parser.parse_args()
+
+    count = record_fixtures(args.symbols, args.root, args.period, args.interval, args.format)
+    print(f"✅ Recorded {count}/{len(args.symbols)} symbols into {args.root}/{args.interval}")
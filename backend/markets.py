@@ -0,0 +1,57 @@
+"""
+🥓 Markets
+Symbol universe per market
+"""
+
+from typing import Dict, List
+
+US_STOCKS = [
+    'AAPL', 'TSLA', 'NVDA', 'MSFT', 'GOOGL', 'AMZN', 'META', 'AMD', 
+    'SPY', 'QQQ', 'PLTR', 'SOFI', 'RIVN', 'LCID', 'NIO', 'BABA',
+    'COIN', 'MARA', 'RIOT', 'SHOP', 'SQ', 'PYPL', 'V', 'MA',
+    'DIS', 'NFLX', 'BA', 'JPM', 'BAC', 'WMT', 'PFE', 'MRNA'
+]
+
+CANADIAN_STOCKS = [
+    'TD.TO', 'RY.TO', 'ENB.TO', 'CNQ.TO', 'CNR.TO', 'BMO.TO',
+    'BNS.TO', 'CM.TO', 'TRP.TO', 'SU.TO', 'BCE.TO', 'T.TO',
+    'SHOP.TO', 'WCN.TO', 'CP.TO', 'MFC.TO'
+]
+
+FUTURES = [
+    'ES=F', 'NQ=F', 'YM=F', 'RTY=F',  # Indices
+    'GC=F', 'SI=F',  # Métaux
+    'CL=F', 'NG=F',  # Énergie
+]
+
+CRYPTO = [
+    'BTC-USD', 'ETH-USD', 'BNB-USD', 'SOL-USD', 'ADA-USD',
+    'XRP-USD', 'DOGE-USD', 'AVAX-USD', 'MATIC-USD', 'LINK-USD'
+]
+
+MARKETS: Dict[str, List[str]] = {
+    'us': US_STOCKS,
+    'ca': CANADIAN_STOCKS,
+    'futures': FUTURES,
+    'crypto': CRYPTO,
+}
+
+_SYMBOL_MARKET = {symbol: market for market, symbols in MARKETS.items() for symbol in symbols}
+
+
+def market_of(symbol: str) -> str:
+    """Market key for a symbol (Yahoo suffix rules for symbols outside the lists)"""
+    market = _SYMBOL_MARKET.get(symbol)
+    if market:
+        return market
+    if symbol.endswith('.TO') or symbol.endswith('.V'):
+        return 'ca'
+    if symbol.endswith('=F'):
+        return 'futures'
+    if symbol.endswith('-USD') or symbol.endswith('-USDT'):
+        return 'crypto'
+    return 'us'
+
+
+def all_symbols() -> List[str]:
+    return US_STOCKS + CANADIAN_STOCKS + FUTURES + CRYPTO
@@ -0,0 +1,212 @@
+"""
+🥓 Metrics
+Lightweight counters, gauges and histograms rendered in Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stage latencies are mostly sub-millisecond (kernels) up to seconds (network)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY: List["Metric"] = []
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(n, "") for n in self.labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, doc, labels=()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, doc, labels=()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[Tuple, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the (unlabelled) value at scrape time"""
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(k, list(s[0]), s[1], s[2]) for k, s in self._series.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+def render() -> str:
+    """Full registry in Prometheus exposition format"""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# ============================================
+# SCANNER METRICS
+# ============================================
+
+STAGE_SECONDS = Histogram(
+    "bacon_stage_seconds",
+    "Time spent per scan stage (fetch, indicators, scoring, social, persistence, alerting)",
+    labels=("scanner", "stage"),
+)
+SYMBOLS_SCANNED = Counter("bacon_symbols_scanned_total", "Symbols analyzed", labels=("scanner",))
+SYMBOLS_SIGNALLED = Counter("bacon_symbols_signalled_total", "Symbols that produced a signal", labels=("scanner",))
+SYMBOLS_ERRORED = Counter("bacon_symbols_errored_total", "Symbols that raised during analysis", labels=("scanner",))
+SYMBOLS_REUSED = Counter("bacon_symbols_reused_total", "Symbols served from the delta cache (bars unchanged)", labels=("scanner",))
+SCAN_REUSE_RATIO = Gauge("bacon_scan_reuse_ratio", "Share of symbols reused in the last scan", labels=("scanner",))
+SCAN_QUEUE_DEPTH = Gauge("bacon_scan_queue_depth", "Symbols waiting in running scans")
+SNAPSHOT_AGE = Gauge("bacon_snapshot_age_seconds", "Seconds since the last completed scan (-1 = never)")
+
+_last_snapshot: Optional[float] = None
+
+
+def mark_snapshot():
+    """Record that a scan just completed"""
+    global _last_snapshot
+    _last_snapshot = time.monotonic()
+
+
+def _snapshot_age() -> float:
+    if _last_snapshot is None:
+        return -1
+    return round(time.monotonic() - _last_snapshot, 3)
+
+
+SNAPSHOT_AGE.set_function(_snapshot_age)
+
+
+class StageTimer:
+    """
+    Sequential stage timing without re-indenting the instrumented code:
+
+        timer = StageTimer('daily')
+        fetch()
+        timer.lap('fetch')
+        compute()
+        timer.lap('indicators')
+    """
+
+    __slots__ = ("scanner", "_last")
+
+    def __init__(self, scanner: str):
+        self.scanner = scanner
+        self._last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self._last, scanner=self.scanner, stage=name)
+        self._last = now
@@ -0,0 +1,308 @@
+"""
+🥓 ML Engine
+RandomForest trained on historical daily bars, persisted as a versioned
+artifact and queried for the whole universe in one predict_proba call.
+
+Train:  python ml_engine.py train --period 5y
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1  # bump when features or artifact layout change
+ARTIFACT_PREFIX = "bacon_rf"
+MODEL_DIR = Path(os.getenv("BACON_MODEL_DIR", Path(__file__).resolve().parent / "models"))
+
+# Same inputs as ml_predict in main.py (sma_5 / sma_20 as a ratio)
+FEATURE_NAMES = ['rsi', 'sma_ratio', 'vol_ratio', 'price_change_5d', 'volatility']
+
+HORIZON = 5             # bars ahead
+TARGET_RETURN = 2.0     # % move that counts as a win
+VOLATILITY_WINDOW = 63  # ~3 months of daily bars, like the live 3mo fetch
+
+
+# ============================================
+# FEATURES
+# ============================================
+
+def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-bar version of calculate_ml_features (main.py).
+    Row i only uses bars <= i, so it is safe for training.
+    """
+    close = df['Close'].astype(float)
+    volume = df['Volume'].astype(float)
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+
+    sma_5 = close.rolling(5).mean()
+    sma_20 = close.rolling(20).mean()
+
+    return pd.DataFrame({
+        'rsi': rsi,
+        'sma_5': sma_5,
+        'sma_20': sma_20,
+        'vol_ratio': volume / volume.rolling(20).mean(),
+        'price_change_5d': close.pct_change(4) * 100,  # iloc[-1] vs iloc[-5]
+        'volatility': close.pct_change().rolling(VOLATILITY_WINDOW, min_periods=20).std() * 100,
+    }, index=df.index)
+
+
+def to_model_inputs(features) -> np.ndarray:
+    """
+    Feature frame, dict of column arrays or list of feature dicts
+    -> model matrix in FEATURE_NAMES order
+    """
+    if isinstance(features, (list, tuple)):
+        features = pd.DataFrame(list(features))
+
+    def column(name):
+        return np.asarray(features[name], dtype=float)
+
+    return np.column_stack([
+        column('rsi'),
+        column('sma_5') / column('sma_20'),
+        column('vol_ratio'),
+        column('price_change_5d'),
+        column('volatility'),
+    ])
+
+
+def build_labels(df: pd.DataFrame, horizon: int = HORIZON, target: float = TARGET_RETURN) -> pd.Series:
+    """1 if the close `horizon` bars ahead is `target`% higher, NaN when unknown"""
+    close = df['Close'].astype(float)
+    forward = (close.shift(-horizon) / close - 1) * 100
+    return (forward > target).astype(float).where(forward.notna())
+
+
+def build_training_set(frames: Dict[str, pd.DataFrame], horizon: int = HORIZON,
+                       target: float = TARGET_RETURN) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stack every symbol's labelled bars -> (X, y, timestamps)"""
+    xs, ys, ts = [], [], []
+    for symbol, df in frames.items():
+        if len(df) < VOLATILITY_WINDOW:
+            continue
+        X = to_model_inputs(build_feature_frame(df))
+        y = build_labels(df, horizon, target).to_numpy()
+        valid = np.isfinite(X).all(axis=1) & np.isfinite(y)
+        xs.append(X[valid])
+        ys.append(y[valid].astype(np.int8))
+        ts.append(df.index.to_numpy()[valid])
+
+    if not xs:
+        raise ValueError("No symbol has enough history to train")
+    return np.vstack(xs), np.concatenate(ys), np.concatenate(ts)
+
+
+# ============================================
+# MODEL
+# ============================================
+
+def label_from_proba(proba: float) -> Tuple[str, float]:
+    """Map P(up) to the labels used by the rule-based ml_predict"""
+    confidence = min(proba * 100, 95)
+    if proba >= 0.70:
+        return "STRONG BUY", confidence
+    elif proba >= 0.55:
+        return "BUY", confidence
+    elif proba >= 0.45:
+        return "HOLD", confidence
+    return "NEUTRAL", confidence
+
+
+class MLEngine:
+    """Fitted scaler + RandomForest with their training metadata"""
+
+    def __init__(self, model, scaler, meta: Dict):
+        self.model = model
+        self.scaler = scaler
+        self.meta = meta
+
+    @classmethod
+    def train(cls, frames: Dict[str, pd.DataFrame], horizon: int = HORIZON,
+              target: float = TARGET_RETURN, **kwargs) -> "MLEngine":
+        """Train from raw bars"""
+        X, y, ts = build_training_set(frames, horizon, target)
+        return cls.fit(X, y, ts, horizon=horizon, target=target, symbols=len(frames), **kwargs)
+
+    @classmethod
+    def train_from_store(cls, store, symbols: Sequence[str], horizon: int = HORIZON,
+                         target: float = TARGET_RETURN, **kwargs) -> "MLEngine":
+        """Train from precomputed features (see feature_store.py)"""
+        X, y, ts = store.training_set(symbols, horizon, target)
+        return cls.fit(X, y, ts, horizon=horizon, target=target, symbols=len(symbols), **kwargs)
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, ts: np.ndarray, horizon: int = HORIZON,
+            target: float = TARGET_RETURN, symbols: int = 0, n_estimators: int = 200,
+            holdout: float = 0.2, random_state: int = 42, n_jobs: int = -1) -> "MLEngine":
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score, precision_score
+        from sklearn.preprocessing import StandardScaler
+
+        # Time-ordered holdout: the most recent bars are never trained on
+        order = np.argsort(ts, kind='stable')
+        X, y, ts = X[order], y[order], ts[order]
+        split = int(len(X) * (1 - holdout))
+        train = split
+        if split < len(X) and horizon > 0:
+            # Purge gap: a label looks `horizon` bars ahead, so the last
+            # `horizon` bars before the holdout are labelled from inside it
+            split = int(np.searchsorted(ts, ts[split]))
+            before = np.unique(ts[:split])
+            train = int(np.searchsorted(ts, before[-horizon])) if len(before) > horizon else 0
+        if train == 0:
+            raise ValueError(f"No training rows left before the holdout ({len(X)} rows)")
+
+        scaler = StandardScaler().fit(X[:train])
+        model = RandomForestClassifier(
+            n_estimators=n_estimators,
+            max_depth=8,
+            min_samples_leaf=20,
+            class_weight='balanced_subsample',
+            n_jobs=n_jobs,
+            random_state=random_state,
+        ).fit(scaler.transform(X[:train]), y[:train])
+
+        metrics = {}
+        if split < len(X):
+            pred = model.predict(scaler.transform(X[split:]))
+            metrics = {
+                'holdout_rows': int(len(X) - split),
+                'purged_rows': int(split - train),
+                'accuracy': round(float(accuracy_score(y[split:], pred)), 4),
+                'precision': round(float(precision_score(y[split:], pred, zero_division=0)), 4),
+                'base_rate': round(float(y[split:].mean()), 4),
+            }
+
+        meta = {
+            'version': ARTIFACT_VERSION,
+            'trained_at': datetime.utcnow().isoformat(),
+            'feature_names': FEATURE_NAMES,
+            'horizon': horizon,
+            'target_return': target,
+            'symbols': symbols,
+            'train_rows': int(train),
+            'train_end': str(ts[train - 1]),
+            'metrics': metrics,
+        }
+        return cls(model, scaler, meta)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """P(up) for every row; rows with missing features get 0.5"""
+        X = np.asarray(X, dtype=float)
+        proba = np.full(len(X), 0.5)
+        valid = np.isfinite(X).all(axis=1)
+        if valid.any():
+            proba[valid] = self.model.predict_proba(self.scaler.transform(X[valid]))[:, 1]
+        return proba
+
+    def predict(self, X: np.ndarray) -> List[Tuple[str, float]]:
+        return [label_from_proba(p) for p in self.predict_proba(X)]
+
+    # ---------- persistence ----------
+
+    def save(self, model_dir: Path = MODEL_DIR) -> Path:
+        import joblib
+
+        model_dir = Path(model_dir)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        path = model_dir / f"{ARTIFACT_PREFIX}_v{ARTIFACT_VERSION}_{stamp}.joblib"
+        joblib.dump({'model': self.model, 'scaler': self.scaler, 'meta': self.meta}, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "MLEngine":
+        import joblib
+
+        artifact = joblib.load(path)
+        meta = artifact['meta']
+        if meta.get('version') != ARTIFACT_VERSION or meta.get('feature_names') != FEATURE_NAMES:
+            raise ValueError(f"Incompatible model artifact {path} (version {meta.get('version')})")
+        return cls(artifact['model'], artifact['scaler'], meta)
+
+
+def latest_artifact(model_dir: Path = MODEL_DIR) -> Optional[Path]:
+    """Newest artifact for the current ARTIFACT_VERSION"""
+    paths = sorted(Path(model_dir).glob(f"{ARTIFACT_PREFIX}_v{ARTIFACT_VERSION}_*.joblib"))
+    return paths[-1] if paths else None
+
+
+_engine: Optional[MLEngine] = None
+_engine_loaded = False
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Optional[MLEngine]:
+    """Load the latest artifact once per process (None if no model is trained)"""
+    global _engine, _engine_loaded
+    if _engine_loaded:
+        return _engine
+    with _engine_lock:
+        if not _engine_loaded:
+            path = latest_artifact()
+            if path is not None:
+                try:
+                    _engine = MLEngine.load(path)
+                    logger.info(f"🤖 Loaded ML model {path.name}")
+                except Exception as e:
+                    logger.error(f"Error loading ML model {path}: {e}")
+            _engine_loaded = True
+    return _engine
+
+
+def set_engine(engine: Optional[MLEngine]):
+    global _engine, _engine_loaded
+    with _engine_lock:
+        _engine, _engine_loaded = engine, True
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from market_data import get_provider
+
+    parser = argparse.ArgumentParser(description="Train the BaconAlgo RandomForest")
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--symbols", nargs="*", help="defaults to every market in markets.py")
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--target", type=float, default=TARGET_RETURN)
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--from-store", action="store_true", help="train on the feature store (no fetch)")
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if not symbols:
+        from markets import all_symbols
+        symbols = all_symbols()
+
+    if args.from_store:
+        from feature_store import get_store
+        engine = MLEngine.train_from_store(get_store(), symbols, horizon=args.horizon, target=args.target)
+    else:
+        provider = get_provider()
+        frames = {}
+        for symbol in symbols:
+            df = provider.history(symbol, period=args.period, interval="1d")
+            if not df.empty:
+                frames[symbol] = df
+        print(f"📥 Loaded {len(frames)}/{len(symbols)} symbols")
+        engine = MLEngine.train(frames, horizon=args.horizon, target=args.target)
+    path = engine.save(args.model_dir)
+    print(f"💾 Saved {path}")
+    print(json.dumps(engine.meta['metrics'], indent=2))
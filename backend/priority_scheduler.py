@@ -0,0 +1,190 @@
+"""
+🥓 Priority Scheduler
+Per-symbol refresh intervals driven by how likely the symbol is to change
+grade: high ATR%, a volume spike or a score sitting next to a grade
+threshold all shorten the interval.
+
+Symbols sit in a heap keyed by next-due time; a token bucket caps fetches
+per minute, so the budget always goes to the most overdue symbols first.
+"""
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUDGET = 60         # fetches per minute
+BASE_INTERVAL = 300         # seconds, for an average symbol
+MIN_INTERVAL = 30
+MAX_INTERVAL = 3600
+ATR_REFERENCE = 2.0         # ATR% treated as "average" volatility
+
+
+@dataclass
+class SymbolState:
+    interval: float = BASE_INTERVAL
+    next_due: float = 0.0
+    atr_pct: Optional[float] = None
+    volume_ratio: Optional[float] = None
+    distance: Optional[float] = None
+    last_run: Optional[float] = None
+    version: int = 0
+
+
+def refresh_interval(atr_pct: Optional[float], volume_ratio: Optional[float],
+                     distance: Optional[float], base: float = BASE_INTERVAL,
+                     low: float = MIN_INTERVAL, high: float = MAX_INTERVAL) -> float:
+    """
+    base x volatility factor x volume factor x threshold factor, clamped.
+    distance = confluences (or score steps) to the nearest grade change, >= 1.
+    """
+    interval = base
+    if atr_pct is not None and atr_pct > 0:
+        interval *= min(max(ATR_REFERENCE / atr_pct, 0.25), 4.0)
+    if volume_ratio is not None and volume_ratio > 1:
+        interval /= min(volume_ratio, 4.0)
+    if distance is not None:
+        interval *= min(max(distance, 1), 4) / 2
+    return min(max(interval, low), high)
+
+
+class PriorityScheduler:
+    """Heap of (next_due, symbol) with a fetches-per-minute budget"""
+
+    def __init__(self, symbols: Iterable[str] = (), budget_per_minute: float = DEFAULT_BUDGET,
+                 base_interval: float = BASE_INTERVAL, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, clock: Callable[[], float] = time.time):
+        self.budget = budget_per_minute
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        self.states: Dict[str, SymbolState] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._tokens = float(budget_per_minute)
+        self._refilled = clock()
+        self._lock = threading.Lock()
+        for symbol in symbols:
+            self.add(symbol)
+
+    def __len__(self):
+        return len(self.states)
+
+    # ---------- queue ----------
+
+    def _push(self, symbol: str, due: float):
+        state = self.states[symbol]
+        state.version += 1
+        state.next_due = due
+        # Stale heap entries are skipped on pop (version mismatch)
+        heapq.heappush(self._heap, (due, state.version, symbol))
+
+    def add(self, symbol: str, due: Optional[float] = None):
+        """New symbols are due immediately"""
+        with self._lock:
+            if symbol not in self.states:
+                self.states[symbol] = SymbolState(interval=self.base_interval)
+                self._push(symbol, self.clock() if due is None else due)
+
+    def remove(self, symbol: str):
+        with self._lock:
+            self.states.pop(symbol, None)
+
+    def defer(self, symbol: str, until: float):
+        with self._lock:
+            if symbol in self.states:
+                self._push(symbol, until)
+
+    def observe(self, symbol: str, atr_pct: Optional[float] = None,
+                volume_ratio: Optional[float] = None, distance: Optional[float] = None,
+                now: Optional[float] = None) -> float:
+        """Record a fresh scan of symbol and schedule its next refresh"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self.states.setdefault(symbol, SymbolState())
+            state.atr_pct, state.volume_ratio, state.distance = atr_pct, volume_ratio, distance
+            state.interval = refresh_interval(atr_pct, volume_ratio, distance, self.base_interval,
+                                              self.min_interval, self.max_interval)
+            state.last_run = now
+            self._push(symbol, now + state.interval)
+            return state.interval
+
+    # ---------- budget ----------
+
+    def _refill(self, now: float):
+        rate = self.budget / 60.0
+        self._tokens = min(self.budget, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+
+    def take(self, now: Optional[float] = None,
+             defer_until: Optional[Callable[[str, float], Optional[float]]] = None) -> List[str]:
+        """
+        Pop due symbols, most overdue first, while the budget lasts.
+        defer_until(symbol, now) may return a later due time (e.g. market
+        closed) - such symbols are re-queued without spending budget.
+        """
+        now = self.clock() if now is None else now
+        out = []
+        with self._lock:
+            self._refill(now)
+            while self._heap and self._heap[0][0] <= now and self._tokens >= 1:
+                due, version, symbol = heapq.heappop(self._heap)
+                state = self.states.get(symbol)
+                if state is None or state.version != version:
+                    continue
+                if defer_until is not None:
+                    later = defer_until(symbol, now)
+                    if later is not None and later > now:
+                        self._push(symbol, later)
+                        continue
+                self._tokens -= 1
+                # Re-queued at base interval in case the scan never reports back
+                self._push(symbol, now + state.interval)
+                out.append(symbol)
+        return out
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            while self._heap:
+                due, version, symbol = self._heap[0]
+                state = self.states.get(symbol)
+                if state is not None and state.version == version:
+                    return due
+                heapq.heappop(self._heap)
+        return None
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = self.clock() if now is None else now
+        due = self.next_due()
+        wait = max(due - now, 0) if due is not None else 60
+        with self._lock:
+            if self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) * 60.0 / self.budget)
+        return wait
+
+    def status(self, limit: int = 20) -> List[Dict]:
+        """Next symbols in due order"""
+        with self._lock:
+            live = sorted((s.next_due, symbol) for symbol, s in self.states.items())
+            return [{
+                'symbol': symbol,
+                'next_due_in': round(due - self.clock(), 1),
+                'interval': round(self.states[symbol].interval, 1),
+                'atr_pct': self.states[symbol].atr_pct,
+                'volume_ratio': self.states[symbol].volume_ratio,
+                'distance': self.states[symbol].distance,
+            } for due, symbol in live[:limit]]
+
+    def run(self, scan: Callable[[List[str]], None], stop: threading.Event,
+            defer_until: Optional[Callable[[str, float], Optional[float]]] = None,
+            max_sleep: float = 30):
+        """Scan due batches until stop is set (scan is expected to call observe)"""
+        while not stop.is_set():
+            batch = self.take(defer_until=defer_until)
+            if batch:
+                try:
+                    scan(batch)
+                except Exception as e:
+                    print(f"❌ Adaptive scan of {len(batch)} symbols failed: {e}")
+            stop.wait(min(max(self.seconds_until_next(), 0.5), max_sleep))
@@ -0,0 +1,251 @@
+"""
+🥓 Multi-Timeframe Bars
+Fetch the finest interval once per symbol and derive 30m / 1h / 4h / 1d
+OHLCV from it, so strategies on different timeframes share one fetch.
+
+Buckets are anchored to the session open of the symbol's market (NYSE 1h
+bars are 9:30-10:30, ..., 15:30-16:00; 4h are 9:30-13:30 and 13:30-16:00),
+and never straddle a session boundary. Daily bars are keyed by trading day,
+so a Globex session opening 18:00 Sunday belongs to Monday.
+
+Enable for every caller of get_provider() with:
+    BACON_RESAMPLE_BASE=15m BACON_RESAMPLE_PERIOD=60d BACON_RESAMPLE_TTL=60
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from market_data import OHLCV_COLUMNS, MarketDataProvider, period_to_timedelta
+from markets import market_of
+from sessions import Calendar, calendar_for
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INTERVAL_MINUTES = {
+    '1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30,
+    '60m': 60, '1h': 60, '90m': 90, '4h': 240, '1d': 1440,
+}
+DAY = 1440
+
+
+def interval_minutes(interval: str) -> int:
+    try:
+        return INTERVAL_MINUTES[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval '{interval}'")
+
+
+def session_minutes(calendar: Calendar) -> int:
+    """Regular session length (early closes simply have no bars after)"""
+    if calendar.always_open:
+        return DAY
+    open_min = calendar.open.hour * 60 + calendar.open.minute
+    close_min = calendar.close.hour * 60 + calendar.close.minute
+    return (close_min - open_min) % DAY or DAY
+
+
+# ============================================
+# RESAMPLING
+# ============================================
+
+def _session_clock(df: "pd.DataFrame", calendar: Calendar):
+    """
+    Per-bar arrays shared by every target interval: UTC minute, trading day
+    and minutes since the session opened, with out-of-session bars dropped.
+    """
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    index = df.index if df.index.tz is not None else df.index.tz_localize('UTC')
+
+    # One local-time conversion; everything else is datetime64 arithmetic
+    wall = index.tz_convert(calendar.tz).tz_localize(None).to_numpy().astype('datetime64[m]')
+    day = wall.astype('datetime64[D]')
+    minutes = (wall - day).astype(np.int64)
+    open_min = calendar.open.hour * 60 + calendar.open.minute
+    offset = (minutes - open_min) % DAY  # minutes since the session opened
+    if calendar.open_previous_day:
+        day = day + (minutes >= open_min).astype(np.int64).astype('timedelta64[D]')
+
+    keep = offset < session_minutes(calendar)
+    utc = index.tz_convert('UTC').tz_localize(None).to_numpy().astype('datetime64[m]')
+    if not keep.all():
+        df, utc, day, offset = df[keep], utc[keep], day[keep], offset[keep]
+    return df, index.tz, utc, day, offset
+
+
+def _aggregate(columns: Dict[str, np.ndarray], keys: np.ndarray) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """OHLCV of runs of equal keys (bars are sorted, so buckets are contiguous)"""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    return {
+        'Open': columns['Open'][starts],
+        'High': np.maximum.reduceat(columns['High'], starts),
+        'Low': np.minimum.reduceat(columns['Low'], starts),
+        'Close': columns['Close'][ends],
+        'Volume': np.add.reduceat(columns['Volume'], starts),
+    }, starts
+
+
+def resample_all(df: "pd.DataFrame", intervals: Iterable[str], calendar: Calendar) -> Dict[str, "pd.DataFrame"]:
+    """
+    Aggregate OHLCV bars into each of `intervals` within calendar's sessions.
+    Bars outside the regular session (pre/post market, Globex maintenance
+    break) are dropped. Labels are bucket starts; daily bars are labelled
+    with the trading day at local midnight, like yfinance.
+    """
+    import pandas as pd
+
+    targets = {interval: interval_minutes(interval) for interval in intervals}
+    if df.empty:
+        return {interval: df.iloc[:0][OHLCV_COLUMNS] for interval in targets}
+
+    df, tz, utc, day, offset = _session_clock(df, calendar)
+    columns = {c: df[c].to_numpy() for c in OHLCV_COLUMNS}
+    out = {}
+    for interval, target in targets.items():
+        if df.empty:
+            out[interval] = df[OHLCV_COLUMNS]
+            continue
+        if target >= DAY:
+            keys = day.astype(np.int64)
+        else:
+            # Bucket start = bar time minus its position within the bucket
+            keys = (utc - (offset % target).astype('timedelta64[m]')).astype(np.int64)
+        bars, starts = _aggregate(columns, keys)
+        if target >= DAY:
+            index = pd.DatetimeIndex(day[starts]).tz_localize(calendar.tz)
+        else:
+            index = pd.DatetimeIndex(keys[starts].astype('datetime64[m]')).tz_localize('UTC').tz_convert(tz)
+        out[interval] = pd.DataFrame(bars, index=index)
+    return out
+
+
+def resample(df: "pd.DataFrame", interval: str, calendar: Calendar) -> "pd.DataFrame":
+    return resample_all(df, [interval], calendar)[interval]
+
+
+# ============================================
+# PROVIDER
+# ============================================
+
+class _Entry:
+    __slots__ = ('df', 'fetched_at', 'derived')
+
+    def __init__(self, df: "pd.DataFrame", fetched_at: float):
+        self.df = df
+        self.fetched_at = fetched_at
+        self.derived: Dict[str, "pd.DataFrame"] = {}
+
+
+class ResamplingProvider(MarketDataProvider):
+    """
+    Wraps a provider: one base-interval fetch per symbol, every coarser
+    interval derived and cached until the base is refetched. A base is
+    refetched after `ttl` seconds, and only if the symbol's market could
+    have printed bars since. Requests the base cannot serve (finer interval,
+    or a period longer than base_period) go to the source, cached the same way.
+    """
+
+    name = "resample"
+
+    def __init__(self, source: MarketDataProvider, base_interval: str = "15m",
+                 base_period: str = "60d", ttl: float = 60.0,
+                 calendar_of: Callable[[str], Calendar] = lambda symbol: calendar_for(market_of(symbol))):
+        self.source = source
+        self.base_interval = base_interval
+        self.base_period = base_period
+        self.base_minutes = interval_minutes(base_interval)
+        self.base_window = period_to_timedelta(base_period)
+        self.ttl = ttl
+        self.calendar_of = calendar_of
+        self._bases: Dict[str, _Entry] = {}
+        self._native: Dict[Tuple[str, str, str], _Entry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _fresh(self, symbol: str, entry: Optional[_Entry], now: float) -> bool:
+        if entry is None:
+            return False
+        if now - entry.fetched_at < self.ttl:
+            return True
+        since = datetime.fromtimestamp(entry.fetched_at, timezone.utc)
+        return not self.calendar_of(symbol).has_new_bars(since)
+
+    def _fetch(self, symbol: str, period: str, interval: str) -> _Entry:
+        self.fetches += 1
+        return _Entry(self.source.history(symbol, period=period, interval=interval), time.time())
+
+    def derivable(self, period: str, interval: str) -> bool:
+        minutes = INTERVAL_MINUTES.get(interval)
+        if minutes is None or minutes < self.base_minutes:
+            return False
+        if minutes < DAY and minutes % self.base_minutes:
+            return False
+        window = period_to_timedelta(period)
+        return self.base_window is None or (window is not None and window <= self.base_window)
+
+    def base(self, symbol: str) -> _Entry:
+        """The shared base bars of a symbol, refetched when stale"""
+        with self._symbol_lock(symbol):
+            entry = self._bases.get(symbol)
+            if not self._fresh(symbol, entry, time.time()):
+                entry = self._fetch(symbol, self.base_period, self.base_interval)
+                self._bases[symbol] = entry
+            return entry
+
+    def bars(self, symbol: str, interval: str) -> "pd.DataFrame":
+        """Full derived history (base_period long) of one interval, cached"""
+        return self.derive(symbol, [interval])[interval]
+
+    def derive(self, symbol: str, intervals: Iterable[str]) -> Dict[str, "pd.DataFrame"]:
+        """Cached derived bars; missing intervals are resampled in one pass"""
+        entry = self.base(symbol)
+        missing = [i for i in intervals if i != self.base_interval and i not in entry.derived]
+        if missing:
+            entry.derived.update(resample_all(entry.df, missing, self.calendar_of(symbol)))
+        return {i: entry.df if i == self.base_interval else entry.derived[i] for i in intervals}
+
+    def multi_timeframe(self, symbol: str, intervals: Iterable[str] = ('30m', '1h', '4h', '1d')) -> Dict[str, "pd.DataFrame"]:
+        return {interval: df.copy() for interval, df in self.derive(symbol, intervals).items()}
+
+    def history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> "pd.DataFrame":
+        if self.derivable(period, interval):
+            df = self.bars(symbol, interval)
+        else:
+            key = (symbol, period, interval)
+            with self._symbol_lock(symbol):
+                entry = self._native.get(key)
+                if not self._fresh(symbol, entry, time.time()):
+                    entry = self._fetch(symbol, period, interval)
+                    self._native[key] = entry
+            df = entry.df
+        window = period_to_timedelta(period)
+        if window is not None and not df.empty:
+            df = df[df.index > df.index[-1] - window]
+        return df.copy()
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._bases.clear()
+                self._native.clear()
+            else:
+                self._bases.pop(symbol, None)
+                for key in [k for k in self._native if k[0] == symbol]:
+                    del self._native[key]
+
+    def warm_up(self):
+        self.source.warm_up()
+
+    def info(self, symbol: str) -> Dict:
+        return self.source.info(symbol)
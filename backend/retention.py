@@ -0,0 +1,364 @@
+"""
+🥓 Signals Retention
+Rolls raw signals up into hourly/daily aggregates (signal_rollups), then
+compacts raw rows older than the retention window. On Postgres whole
+monthly partitions are dropped; SQLite (local stand-in) deletes rows.
+
+Run:        python retention.py run --db postgresql://... [--raw-days 90] [--grace-hours 48]
+Partitions: python retention.py partitions --db postgresql://...   (also part of run)
+Self-check: python retention.py selfcheck   (in-memory SQLite)
+"""
+
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RAW_RETENTION_DAYS = 90      # raw signals kept this long
+HOURLY_RETENTION_DAYS = 400  # hourly rollups kept this long; daily forever
+ROLLUP_GRACE_HOURS = 48      # closed hours recomputed again on the next run
+
+ROLLUP_COLUMNS = ['signal_count', 'score_sum', 'score_max', 'tech_sum', 'social_sum']
+
+# Same tables as supabase/schema.sql, minus partitioning and RLS
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    entry REAL NOT NULL,
+    stop REAL NOT NULL,
+    target REAL NOT NULL,
+    tech_score INTEGER NOT NULL,
+    social_score INTEGER NOT NULL,
+    total_score INTEGER NOT NULL,
+    rsi REAL,
+    volume_ratio REAL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_created_id ON signals(created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS signal_rollups (
+    granularity TEXT NOT NULL,
+    bucket_start TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    signal_count INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    score_max INTEGER NOT NULL,
+    tech_sum INTEGER NOT NULL,
+    social_sum INTEGER NOT NULL,
+    PRIMARY KEY (granularity, bucket_start, symbol, direction)
+);
+CREATE TABLE IF NOT EXISTS signal_rollup_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    rolled_until TEXT NOT NULL,
+    last_signal_id INTEGER NOT NULL
+);
+"""
+
+
+# ============================================
+# DIALECTS
+# ============================================
+
+@dataclass(frozen=True)
+class Dialect:
+    name: str
+    placeholder: str
+    greatest: str
+    hour_bucket: Callable[[str], str]
+    day_bucket: Callable[[str], str]
+    to_db: Callable[[datetime], object]
+    from_db: Callable[[object], datetime]
+
+
+def _iso(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _parse(value) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(str(value))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+# SQLite stores UTC ISO-8601 text, so buckets are string prefixes
+SQLITE = Dialect(
+    name="sqlite",
+    placeholder="?",
+    greatest="MAX",
+    hour_bucket=lambda col: f"substr({col}, 1, 13) || ':00:00+00:00'",
+    day_bucket=lambda col: f"substr({col}, 1, 10) || 'T00:00:00+00:00'",
+    to_db=_iso,
+    from_db=_parse,
+)
+
+POSTGRES = Dialect(
+    name="postgres",
+    placeholder="%s",
+    greatest="GREATEST",
+    hour_bucket=lambda col: f"(date_trunc('hour', {col} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')",
+    day_bucket=lambda col: f"(date_trunc('day', {col} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')",
+    to_db=lambda value: value,
+    from_db=_parse,
+)
+
+
+def connect(url: str):
+    """(connection, dialect) for sqlite:///path, sqlite:// (memory) or a Postgres DSN"""
+    if url.startswith("sqlite://"):
+        conn = sqlite3.connect(url[len("sqlite://"):].lstrip("/") or ":memory:")
+        conn.executescript(SQLITE_SCHEMA)
+        return conn, SQLITE
+    import psycopg  # optional: only the Postgres job needs it
+    return psycopg.connect(url), POSTGRES
+
+
+# ============================================
+# JOB
+# ============================================
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(table_sql: str, dialect: Dialect, add: bool = False) -> str:
+    """Insert rollup rows; add=True adds to existing buckets instead of replacing them"""
+    if add:
+        updates = ", ".join(
+            f"{c} = {dialect.greatest}(signal_rollups.{c}, excluded.{c})" if c == 'score_max'
+            else f"{c} = signal_rollups.{c} + excluded.{c}" for c in ROLLUP_COLUMNS)
+    else:
+        updates = ", ".join(f"{c} = excluded.{c}" for c in ROLLUP_COLUMNS)
+    return (f"INSERT INTO signal_rollups (granularity, bucket_start, symbol, direction, "
+            f"{', '.join(ROLLUP_COLUMNS)}) {table_sql} "
+            f"ON CONFLICT (granularity, bucket_start, symbol, direction) DO UPDATE SET {updates}")
+
+
+def _from_signals(granularity: str, bucket: str, where: str) -> str:
+    return (f"SELECT '{granularity}', {bucket}, symbol, direction, COUNT(*), SUM(total_score), MAX(total_score), "
+            f"SUM(tech_score), SUM(social_score) FROM signals WHERE {where} "
+            f"GROUP BY {bucket}, symbol, direction")
+
+
+def rollup_watermark(conn, dialect: Dialect) -> Optional[datetime]:
+    """Start of the newest rolled-up hour"""
+    row = conn.execute("SELECT MAX(bucket_start) FROM signal_rollups WHERE granularity = 'hour'").fetchone()
+    return dialect.from_db(row[0]) if row and row[0] else None
+
+
+def rollup_state(conn, dialect: Dialect) -> Optional[Tuple[datetime, int]]:
+    """(rolled_until, last_signal_id) of the last run, None before the first"""
+    row = conn.execute("SELECT rolled_until, last_signal_id FROM signal_rollup_state WHERE id = 1").fetchone()
+    return (dialect.from_db(row[0]), int(row[1])) if row else None
+
+
+def rollup(conn, dialect: Dialect, now: datetime,
+           grace: timedelta = timedelta(hours=ROLLUP_GRACE_HOURS)) -> Dict:
+    """
+    Recompute hourly buckets from grace before the last run's end up to the
+    last closed hour, then the daily buckets they touch. Rows inserted since
+    the last run (by id) that are older than that window are added to their
+    buckets instead, since their neighbours may already be compacted.
+    Upserts make reruns idempotent.
+    """
+    p = dialect.placeholder
+    end = _floor_hour(now)
+    state = rollup_state(conn, dialect)
+    last_id = state[1] if state else None
+    if state:
+        start = state[0] - grace
+    else:
+        # First run, or rollups made before the state table existed
+        start = rollup_watermark(conn, dialect)
+        if start is not None:
+            start -= grace
+        else:
+            row = conn.execute("SELECT MIN(created_at) FROM signals").fetchone()
+            if not row or row[0] is None:
+                return {'hours_from': None, 'rolled_until': None, 'late_rows': 0}
+            start = _floor_hour(dialect.from_db(row[0]))
+    start = min(start, end)
+    # Rows inserted while this runs are left to the next run, either way
+    max_id = conn.execute("SELECT MAX(id) FROM signals").fetchone()[0] or 0
+
+    hour = dialect.hour_bucket("created_at")
+    day = dialect.day_bucket("created_at")
+    day_start = start.replace(hour=0)
+    late_rows = 0
+    if last_id is not None:
+        late = f"id > {p} AND id <= {p} AND created_at < {p}"
+        late_rows = conn.execute(f"SELECT COUNT(*) FROM signals WHERE {late}",
+                                 (last_id, max_id, dialect.to_db(start))).fetchone()[0]
+        if late_rows:
+            conn.execute(_upsert(_from_signals('hour', hour, late), dialect, add=True),
+                         (last_id, max_id, dialect.to_db(start)))
+            # Daily buckets from day_start on are rebuilt from the hours below
+            conn.execute(_upsert(_from_signals('day', day, late), dialect, add=True),
+                         (last_id, max_id, dialect.to_db(day_start)))
+
+    window = f"created_at >= {p} AND created_at < {p} AND id <= {p}"
+    conn.execute(_upsert(_from_signals('hour', hour, window), dialect),
+                 (dialect.to_db(start), dialect.to_db(end), max_id))
+    bucket = dialect.day_bucket("bucket_start")
+    conn.execute(_upsert(
+        f"SELECT 'day', {bucket}, symbol, direction, SUM(signal_count), SUM(score_sum), MAX(score_max), "
+        f"SUM(tech_sum), SUM(social_sum) FROM signal_rollups "
+        f"WHERE granularity = 'hour' AND bucket_start >= {p} AND bucket_start < {p} "
+        f"GROUP BY {bucket}, symbol, direction", dialect),
+        (dialect.to_db(day_start), dialect.to_db(end)))
+
+    conn.execute(f"INSERT INTO signal_rollup_state (id, rolled_until, last_signal_id) VALUES (1, {p}, {p}) "
+                 f"ON CONFLICT (id) DO UPDATE SET rolled_until = excluded.rolled_until, "
+                 f"last_signal_id = excluded.last_signal_id", (dialect.to_db(end), max_id))
+    conn.commit()
+    return {'hours_from': start.isoformat(), 'rolled_until': end.isoformat(), 'late_rows': late_rows,
+            'last_signal_id': max_id}
+
+
+def _drop_partitions(conn, cutoff: datetime, max_id: int) -> int:
+    """Drop monthly partitions that end before cutoff and hold no row past max_id (Postgres)"""
+    names = [row[0] for row in conn.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'signals'").fetchall()]
+    dropped = 0
+    for name in names:
+        match = re.fullmatch(r"signals_p(\d{4})_(\d{2})", name)
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        month_end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+        if month_end <= cutoff:
+            # A row landed after the rollup: keep it for the next run's late pass
+            if conn.execute(f'SELECT 1 FROM "{name}" WHERE id > %s LIMIT 1', (max_id,)).fetchone():
+                continue
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            dropped += 1
+    return dropped
+
+
+def ensure_partitions(conn, dialect: Dialect, months_ahead: int = 2):
+    """Create this and the next months' partitions (Postgres), moving their rows out of signals_default"""
+    if dialect is POSTGRES:
+        conn.execute("SELECT ensure_signals_partitions(%s)", (months_ahead,))
+        conn.commit()
+
+
+def compact(conn, dialect: Dialect, cutoff: datetime, hourly_cutoff: datetime, max_id: int) -> Dict:
+    """
+    Remove raw rows before cutoff that the rollup saw (id <= max_id) and
+    stale hourly rollups. Rows inserted since are left to the next run.
+    """
+    p = dialect.placeholder
+    dropped = 0
+    if dialect is POSTGRES:
+        dropped = _drop_partitions(conn, cutoff, max_id)
+    deleted = conn.execute(f"DELETE FROM signals WHERE created_at < {p} AND id <= {p}",
+                           (dialect.to_db(cutoff), max_id)).rowcount
+    pruned = conn.execute(f"DELETE FROM signal_rollups WHERE granularity = 'hour' AND bucket_start < {p}",
+                          (dialect.to_db(hourly_cutoff),)).rowcount
+    conn.commit()
+    return {'partitions_dropped': dropped, 'rows_deleted': deleted, 'hourly_rollups_pruned': pruned}
+
+
+def run_retention(conn, dialect: Dialect, raw_days: int = RAW_RETENTION_DAYS,
+                  hourly_days: int = HOURLY_RETENTION_DAYS, now: Optional[datetime] = None,
+                  grace_hours: int = ROLLUP_GRACE_HOURS) -> Dict:
+    now = now or datetime.now(timezone.utc)
+    grace = timedelta(hours=grace_hours)
+    ensure_partitions(conn, dialect)
+    report = rollup(conn, dialect, now, grace)
+    rolled = _parse(report['rolled_until']) if report['rolled_until'] else None
+    cutoff = now - timedelta(days=raw_days)
+    if rolled is None:
+        report.update(partitions_dropped=0, rows_deleted=0, hourly_rollups_pruned=0)
+        return report
+    # Keep every raw row the next run recomputes from
+    cutoff = min(cutoff, rolled - grace)
+    report.update(compact(conn, dialect, cutoff, now - timedelta(days=hourly_days), report['last_signal_id']))
+    report['raw_cutoff'] = cutoff.isoformat()
+    return report
+
+
+# ============================================
+# SELF-CHECK (SQLite stand-in)
+# ============================================
+
+def selfcheck(rows: int = 20000, days: int = 180, seed: int = 7) -> Dict:
+    """Seed random signals, run the job twice, verify nothing was lost"""
+    import random
+
+    rng = random.Random(seed)
+    conn, dialect = connect("sqlite://")
+    now = datetime(2026, 6, 15, 12, 30, tzinfo=timezone.utc)
+    data = []
+    for _ in range(rows):
+        created = now - timedelta(seconds=rng.randint(0, days * 86400))
+        tech, social = rng.randint(50, 160), rng.randint(0, 40)
+        data.append((rng.choice(['AAPL', 'TSLA', 'NVDA', 'SPY']), rng.choice(['BUY', 'SELL']),
+                     100, 99, 102, tech, social, tech + social, 50, 1.5, _iso(created)))
+    conn.executemany("INSERT INTO signals (symbol, direction, entry, stop, target, tech_score, "
+                     "social_score, total_score, rsi, volume_ratio, created_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", data)
+    conn.commit()
+
+    def raw_totals(before):
+        return conn.execute("SELECT COUNT(*), SUM(total_score) FROM signals WHERE created_at < ?",
+                            (_iso(before),)).fetchone()
+
+    closed = _floor_hour(now)
+    expected = raw_totals(closed)
+    first = run_retention(conn, dialect, raw_days=RAW_RETENTION_DAYS, now=now)
+    second = run_retention(conn, dialect, raw_days=RAW_RETENTION_DAYS, now=now)
+
+    for granularity in ('hour', 'day'):
+        got = conn.execute("SELECT SUM(signal_count), SUM(score_sum) FROM signal_rollups "
+                           "WHERE granularity = ?", (granularity,)).fetchone()
+        assert got == expected, f"{granularity} rollups {got} != raw {expected}"
+    oldest = conn.execute("SELECT MIN(created_at) FROM signals").fetchone()[0]
+    assert _parse(oldest) >= now - timedelta(days=RAW_RETENTION_DAYS), "raw rows past retention remain"
+    assert second['rows_deleted'] == 0, "second run should be a no-op"
+
+    # A late row in an already rolled hour is picked up by the next run
+    conn.execute("INSERT INTO signals (symbol, direction, entry, stop, target, tech_score, social_score, "
+                 "total_score, created_at) VALUES ('SPY', 'BUY', 1, 1, 1, 100, 10, 110, ?)",
+                 (_iso(closed - timedelta(minutes=1)),))
+    run_retention(conn, dialect, now=now)
+    got = conn.execute("SELECT SUM(signal_count) FROM signal_rollups WHERE granularity = 'day'").fetchone()[0]
+    assert got == expected[0] + 1, "late row was not rolled up"
+    return {'rows': rows, 'first_run': first, 'second_run': second}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+
+    parser = argparse.ArgumentParser(description="Roll up and compact the signals table")
+    parser.add_argument("command", choices=["run", "partitions", "selfcheck"])
+    parser.add_argument("--db", default=os.getenv("BACON_SIGNALS_DB"),
+                        help="Postgres DSN or sqlite:///path (env BACON_SIGNALS_DB)")
+    parser.add_argument("--raw-days", type=int, default=RAW_RETENTION_DAYS)
+    parser.add_argument("--hourly-days", type=int, default=HOURLY_RETENTION_DAYS)
+    parser.add_argument("--grace-hours", type=int, default=ROLLUP_GRACE_HOURS,
+                        help="closed hours recomputed again on the next run")
+    args = parser.parse_args()
+
+    if args.command == "selfcheck":
+        print(json.dumps(selfcheck(), indent=2))
+        print("✅ Retention self-check passed")
+    else:
+        if not args.db:
+            raise SystemExit("❌ --db (or BACON_SIGNALS_DB) is required")
+        conn, dialect = connect(args.db)
+        if args.command == "partitions":
+            ensure_partitions(conn, dialect)
+            print("✅ Partitions ensured")
+        else:
+            print(json.dumps(run_retention(conn, dialect, args.raw_days, args.hourly_days,
+                                           grace_hours=args.grace_hours), indent=2))
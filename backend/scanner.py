@@ -3,22 +3,27 @@
 Core scanning logic
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import requests
 from datetime import datetime
 import logging
 
+from market_data import get_provider
+import metrics
+from metrics import StageTimer, SYMBOLS_SCANNED, SYMBOLS_SIGNALLED, SYMBOLS_ERRORED
+
 logger = logging.getLogger(__name__)
 
 class BaconScanner:
-    def __init__(self):
+    def __init__(self, provider=None):
         self.min_score = 150
+        self.provider = provider
     
     async def scan(self, symbols):
         """Scan multiple symbols"""
         signals = []
+        metrics.SCAN_QUEUE_DEPTH.inc(len(symbols))
         
         for symbol in symbols:
             try:
@@ -26,32 +31,41 @@ class BaconScanner:
                 if signal:
                     signals.append(signal)
             except Exception as e:
+                SYMBOLS_ERRORED.inc(scanner='bacon15m')
                 logger.error(f"Error scanning {symbol}: {e}")
+            finally:
+                metrics.SCAN_QUEUE_DEPTH.dec()
         
         # Sort by score
         signals.sort(key=lambda x: x['total_score'], reverse=True)
+        metrics.mark_snapshot()
         
         return signals
     
     async def scan_symbol(self, symbol):
         """Scan single symbol"""
         logger.info(f"📊 Scanning {symbol}...")
+        SYMBOLS_SCANNED.inc(scanner='bacon15m')
+        timer = StageTimer('bacon15m')
         
         # Get data
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period='5d', interval='15m')
+        data = (self.provider or get_provider()).history(symbol, period='5d', interval='15m')
+        timer.lap('fetch')
         
         if len(data) < 50:
             return None
         
         # Calculate indicators
         indicators = self.calculate_indicators(data)
+        timer.lap('indicators')
         
         # Calculate technical score
         tech_score = self.calculate_score(data, indicators)
+        timer.lap('scoring')
         
         # Get social sentiment
         social_score = await self.get_social_sentiment(symbol)
+        timer.lap('social')
         
         # Total score
         total_score = tech_score + social_score
@@ -88,6 +102,8 @@ class BaconScanner:
             'timestamp': datetime.now().isoformat()
         }
         
+        timer.lap('scoring')
+        SYMBOLS_SIGNALLED.inc(scanner='bacon15m')
         logger.info(f"✅ {symbol}: {total_score}/230 - SIGNAL!")
         return signal
     
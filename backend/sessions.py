@@ -0,0 +1,340 @@
+"""
+🥓 Market Sessions
+Trading calendars (NYSE, TSX, CME Globex, 24/7 crypto) with holidays and
+early closes, and a scheduler that only scans a market when it can print
+new bars.
+
+Cadence per market (seconds), e.g.:
+    BACON_SCAN_CADENCE="us=300,ca=300,futures=600,crypto=900"
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+ET = ZoneInfo("America/New_York")
+TORONTO = ZoneInfo("America/Toronto")
+
+DEFAULT_CADENCE = {'us': 300, 'ca': 300, 'futures': 300, 'crypto': 600}
+
+
+# ============================================
+# HOLIDAY RULES
+# ============================================
+
+def easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th weekday of the month (Mon=0); n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def us_observed(day: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def ca_observed(days: List[date]) -> List[date]:
+    """Weekend holidays move to the next free weekday (Christmas + Boxing Day)"""
+    taken, out = set(), []
+    for day in days:
+        while day.weekday() >= 5 or day in taken:
+            day += timedelta(days=1)
+        taken.add(day)
+        out.append(day)
+    return out
+
+
+def _us_federal_market_days(year: int) -> Dict[str, date]:
+    days = {
+        'mlk': nth_weekday(year, 1, 0, 3),
+        'presidents': nth_weekday(year, 2, 0, 3),
+        'memorial': nth_weekday(year, 5, 0, -1),
+        'independence': us_observed(date(year, 7, 4)),
+        'labor': nth_weekday(year, 9, 0, 1),
+        'thanksgiving': nth_weekday(year, 11, 3, 4),
+        'christmas': us_observed(date(year, 12, 25)),
+    }
+    if year >= 2022:
+        days['juneteenth'] = us_observed(date(year, 6, 19))
+    # New Year on a Saturday is not observed on Dec 31 by the exchanges
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days['new_year'] = us_observed(new_year)
+    return days
+
+
+# Each rule returns {date: None (closed) | time (early close)}
+
+@lru_cache(maxsize=64)
+def nyse_exceptions(year: int) -> Dict[date, Optional[dtime]]:
+    out: Dict[date, Optional[dtime]] = {d: None for d in _us_federal_market_days(year).values()}
+    out[easter(year) - timedelta(days=2)] = None  # Good Friday
+
+    early = dtime(13, 0)
+    july_3 = date(year, 7, 3)
+    if july_3.weekday() < 5 and july_3 not in out:
+        out[july_3] = early
+    out.setdefault(nth_weekday(year, 11, 3, 4) + timedelta(days=1), early)
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5:
+        out.setdefault(christmas_eve, early)
+    return out
+
+
+@lru_cache(maxsize=64)
+def tsx_exceptions(year: int) -> Dict[date, Optional[dtime]]:
+    may_25 = date(year, 5, 25)
+    closed = ca_observed([date(year, 1, 1)]) + ca_observed([date(year, 7, 1)]) + \
+        ca_observed([date(year, 12, 25), date(year, 12, 26)]) + [
+            nth_weekday(year, 2, 0, 3),                              # Family Day
+            easter(year) - timedelta(days=2),                        # Good Friday
+            may_25 - timedelta(days=may_25.weekday() or 7),         # Victoria Day
+            nth_weekday(year, 8, 0, 1),                              # Civic Holiday
+            nth_weekday(year, 9, 0, 1),                              # Labour Day
+            nth_weekday(year, 10, 0, 2),                             # Thanksgiving
+        ]
+    out: Dict[date, Optional[dtime]] = {d: None for d in closed}
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5:
+        out.setdefault(christmas_eve, dtime(13, 0))
+    return out
+
+
+@lru_cache(maxsize=64)
+def cme_exceptions(year: int) -> Dict[date, Optional[dtime]]:
+    """Equity/energy/metals Globex: closed on the big three, halted early otherwise"""
+    us = _us_federal_market_days(year)
+    out: Dict[date, Optional[dtime]] = {easter(year) - timedelta(days=2): None}
+    for name in ('new_year', 'christmas'):
+        if name in us:
+            out[us[name]] = None
+    for name, day in us.items():
+        out.setdefault(day, dtime(13, 0))            # 12:00 CT
+    out.setdefault(us['thanksgiving'] + timedelta(days=1), dtime(13, 15))
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5:
+        out.setdefault(christmas_eve, dtime(13, 15))
+    return out
+
+
+# ============================================
+# CALENDARS
+# ============================================
+
+@dataclass(frozen=True)
+class Calendar:
+    """
+    Weekday sessions keyed by trading day. With open_previous_day the
+    session of day D opens the evening before (Globex: 18:00 D-1 -> 17:00 D).
+    """
+    name: str
+    tz: ZoneInfo
+    open: dtime
+    close: dtime
+    exceptions: Optional[Callable[[int], Dict[date, Optional[dtime]]]] = None
+    open_previous_day: bool = False
+    always_open: bool = False
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """(open, close) of a trading day in UTC, None when the market is shut"""
+        if self.always_open:
+            start = datetime.combine(day, dtime(0), timezone.utc)
+            return start, start + timedelta(days=1)
+        if day.weekday() >= 5:
+            return None
+        close = self.close
+        if self.exceptions is not None:
+            special = self.exceptions(day.year)
+            if day in special:
+                if special[day] is None:
+                    return None
+                close = special[day]
+        open_day = day - timedelta(days=1) if self.open_previous_day else day
+        start = datetime.combine(open_day, self.open, self.tz)
+        end = datetime.combine(day, close, self.tz)
+        return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+    def _days_around(self, now: datetime, back: int, ahead: int):
+        local = now.astimezone(self.tz).date()
+        return [local + timedelta(days=i) for i in range(-back, ahead + 1)]
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(timezone.utc)
+        for day in self._days_around(now, 1, 1):
+            session = self.session(day)
+            if session and session[0] <= now < session[1]:
+                return True
+        return False
+
+    def last_close(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Most recent session close at or before now"""
+        now = now or datetime.now(timezone.utc)
+        closes = [s[1] for s in map(self.session, self._days_around(now, 10, 0)) if s and s[1] <= now]
+        return max(closes) if closes else None
+
+    def next_open(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Start of the next session after now (now itself when open)"""
+        now = now or datetime.now(timezone.utc)
+        for day in self._days_around(now, 1, 14):
+            session = self.session(day)
+            if session and session[1] > now:
+                return max(session[0], now)
+        return None
+
+    def has_new_bars(self, since: Optional[datetime], now: Optional[datetime] = None) -> bool:
+        """Could a bar have printed or changed between since and now?"""
+        now = now or datetime.now(timezone.utc)
+        if since is None or self.is_open(now):
+            return True
+        last_close = self.last_close(now)
+        return last_close is not None and last_close > since
+
+
+NYSE = Calendar("NYSE", ET, dtime(9, 30), dtime(16, 0), nyse_exceptions)
+TSX = Calendar("TSX", TORONTO, dtime(9, 30), dtime(16, 0), tsx_exceptions)
+CME_GLOBEX = Calendar("CME Globex", ET, dtime(18, 0), dtime(17, 0), cme_exceptions, open_previous_day=True)
+CRYPTO_24_7 = Calendar("Crypto 24/7", ZoneInfo("UTC"), dtime(0), dtime(0), always_open=True)
+
+MARKET_CALENDARS: Dict[str, Calendar] = {
+    'us': NYSE,
+    'ca': TSX,
+    'futures': CME_GLOBEX,
+    'crypto': CRYPTO_24_7,
+}
+
+
+def calendar_for(market: str) -> Calendar:
+    return MARKET_CALENDARS.get(market, NYSE)
+
+
+# ============================================
+# SCHEDULER
+# ============================================
+
+def cadence_from_env(default: Dict[str, float] = DEFAULT_CADENCE) -> Dict[str, float]:
+    """BACON_SCAN_CADENCE="us=300,crypto=900" overrides the defaults"""
+    cadence = dict(default)
+    for item in os.getenv("BACON_SCAN_CADENCE", "").split(","):
+        if "=" in item:
+            market, seconds = item.split("=", 1)
+            cadence[market.strip()] = float(seconds)
+    return cadence
+
+
+class SessionScheduler:
+    """
+    A market is due when its cadence has elapsed AND it can have new bars:
+    the session is open, or it closed after the last scan (one final scan
+    picks up the settled bar). Closed markets cost nothing.
+    """
+
+    def __init__(self, markets: List[str], cadence: Optional[Dict[str, float]] = None,
+                 calendars: Dict[str, Calendar] = MARKET_CALENDARS):
+        self.markets = list(markets)
+        self.cadence = cadence or cadence_from_env()
+        self.calendars = calendars
+        self.last_run: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def _calendar(self, market: str) -> Calendar:
+        return self.calendars.get(market, NYSE)
+
+    def due(self, now: Optional[datetime] = None) -> List[str]:
+        now = now or datetime.now(timezone.utc)
+        out = []
+        with self._lock:
+            for market in self.markets:
+                last = self.last_run.get(market)
+                if last is not None and (now - last).total_seconds() < self.cadence.get(market, 300):
+                    continue
+                if self._calendar(market).has_new_bars(last, now):
+                    out.append(market)
+        return out
+
+    def mark_ran(self, market: str, now: Optional[datetime] = None):
+        with self._lock:
+            self.last_run[market] = now or datetime.now(timezone.utc)
+
+    def next_wake(self, now: Optional[datetime] = None) -> datetime:
+        """Earliest moment any market can become due"""
+        now = now or datetime.now(timezone.utc)
+        wakes = []
+        for market in self.markets:
+            calendar = self._calendar(market)
+            last = self.last_run.get(market)
+            ready = last + timedelta(seconds=self.cadence.get(market, 300)) if last else now
+            if calendar.has_new_bars(last, max(ready, now)):
+                wakes.append(max(ready, now))
+            else:
+                wakes.append(calendar.next_open(now) or now + timedelta(hours=1))
+        return min(wakes) if wakes else now + timedelta(minutes=1)
+
+    def status(self, now: Optional[datetime] = None) -> Dict[str, Dict]:
+        now = now or datetime.now(timezone.utc)
+        due = set(self.due(now))
+        out = {}
+        for market in self.markets:
+            calendar = self._calendar(market)
+            last = self.last_run.get(market)
+            next_open = calendar.next_open(now)
+            out[market] = {
+                'calendar': calendar.name,
+                'open': calendar.is_open(now),
+                'next_open': next_open.isoformat() if next_open else None,
+                'cadence_seconds': self.cadence.get(market, 300),
+                'last_scan': last.isoformat() if last else None,
+                'due': market in due,
+            }
+        return out
+
+    def run(self, scan: Callable[[str], None], stop: threading.Event, max_sleep: float = 300):
+        """Scan due markets until stop is set; sleeps until the next wake-up"""
+        while not stop.is_set():
+            for market in self.due():
+                started = datetime.now(timezone.utc)
+                try:
+                    scan(market)
+                except Exception as e:
+                    print(f"❌ Scheduled scan of {market} failed: {e}")
+                self.mark_ran(market, started)
+            wait = (self.next_wake() - datetime.now(timezone.utc)).total_seconds()
+            stop.wait(min(max(wait, 1), max_sleep))
+
+
+if __name__ == "__main__":
+    import json
+
+    now = datetime.now(timezone.utc)
+    scheduler = SessionScheduler(list(MARKET_CALENDARS))
+    print(json.dumps(scheduler.status(now), indent=2))
+    for name, rule in (("NYSE", nyse_exceptions), ("TSX", tsx_exceptions), ("CME", cme_exceptions)):
+        special = rule(now.year)
+        print(f"\n{name} {now.year}:")
+        for day in sorted(special):
+            print(f"  {day} {'closed' if special[day] is None else f'early close {special[day]:%H:%M}'}")
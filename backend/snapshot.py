@@ -0,0 +1,158 @@
+"""
+🥓 Columnar Snapshot
+Latest scan state of every symbol as one numpy array per field, so screens
+like "rsi < 30 and volume_ratio > 2 in crypto, top 20 by confluences" are
+a handful of vectorized masks and an argpartition instead of a Python loop
+over result objects.
+
+Rows are upserted as symbols are (re)scanned and dropped by retain() when
+a symbol leaves the universe; publish() swaps in a new immutable
+Snapshot, so readers never see a half-built one.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+import confluences as confluence_codes
+
+NUMERIC_FIELDS = ['price', 'rsi', 'volume', 'volume_ratio', 'change_1d', 'change_5d',
+                  'avwap_5d', 'avwap_13d', 'avwap_21d', 'atr_pct', 'confluence_count',
+                  'ml_confidence']
+TEXT_FIELDS = ['symbol', 'market', 'signal', 'ml_prediction']
+MASK_FIELD = 'confluence_mask'
+
+# Bitwise filters on the confluence mask: all of / any of / none of
+MASK_FILTERS = {
+    'confluences': lambda col, bits: (col & bits) == bits,
+    'confluences_any': lambda col, bits: (col & bits) != 0,
+    'confluences_none': lambda col, bits: (col & bits) == 0,
+}
+
+OPERATORS = {
+    'lt': np.less,
+    'lte': np.less_equal,
+    'gt': np.greater,
+    'gte': np.greater_equal,
+    'eq': np.equal,
+    'ne': np.not_equal,
+}
+MAX_LIMIT = 500
+
+
+class Snapshot:
+    """Immutable column arrays (float64 for numbers, int64 mask, object for text)"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], created_at: float):
+        self.columns = columns
+        self.created_at = created_at
+
+    def __len__(self):
+        return len(self.columns['symbol'])
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "Snapshot":
+        columns = {}
+        for field in NUMERIC_FIELDS:
+            columns[field] = np.array([np.nan if r.get(field) is None else r[field] for r in rows],
+                                      dtype=np.float64)
+        for field in TEXT_FIELDS:
+            columns[field] = np.array([r.get(field) for r in rows], dtype=object)
+        columns[MASK_FIELD] = np.array([r.get(MASK_FIELD) or 0 for r in rows], dtype=np.int64)
+        return cls(columns, time.time())
+
+    # ---------- screening ----------
+
+    def mask(self, filters: Dict[str, str]) -> np.ndarray:
+        """
+        filters: {"rsi_lt": "30", "volume_ratio_gt": "2", "market": "crypto"}.
+        Numeric fields take <field>_<op>; text fields match exactly
+        (comma-separated values = any of); confluences / confluences_any /
+        confluences_none take comma-separated code names.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for key, raw in filters.items():
+            if key in MASK_FILTERS:
+                bits = confluence_codes.parse(str(raw).split(","))
+                mask &= MASK_FILTERS[key](self.columns[MASK_FIELD], bits)
+                continue
+            if key in TEXT_FIELDS:
+                wanted = [v.strip() for v in str(raw).split(",")]
+                mask &= np.isin(self.columns[key], wanted)
+                continue
+            field, _, op = key.rpartition("_")
+            if field not in NUMERIC_FIELDS or op not in OPERATORS:
+                raise ValueError(f"Unknown filter '{key}'")
+            try:
+                value = float(raw)
+            except ValueError:
+                raise ValueError(f"Filter '{key}' needs a number, got '{raw}'")
+            # NaN compares False, so rows missing the field never match
+            mask &= OPERATORS[op](self.columns[field], value)
+        return mask
+
+    def top(self, index: np.ndarray, sort: str, limit: int) -> np.ndarray:
+        """Top-k rows of index by sort ('-field' = descending) via argpartition"""
+        descending = sort.startswith("-")
+        field = sort.lstrip("-+ ")
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Cannot sort by '{field}'")
+        keys = self.columns[field][index]
+        keys = -keys if descending else keys.copy()
+        keys[np.isnan(keys)] = np.inf  # missing values last
+        if limit < len(index):
+            part = np.argpartition(keys, limit - 1)[:limit]
+        else:
+            part = np.arange(len(index))
+        return index[part[np.argsort(keys[part], kind='stable')]]
+
+    def screen(self, filters: Dict[str, str], sort: Optional[str] = None,
+               limit: int = 20) -> Dict:
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        index = np.flatnonzero(self.mask(filters))
+        rows = self.top(index, sort, limit) if sort else index[:limit]
+        return {'matched': int(len(index)), 'results': self.rows(rows)}
+
+    def rows(self, index: Iterable[int]) -> List[Dict]:
+        out = []
+        for i in index:
+            row = {f: self.columns[f][i] for f in TEXT_FIELDS}
+            row[MASK_FIELD] = int(self.columns[MASK_FIELD][i])
+            for f in NUMERIC_FIELDS:
+                value = self.columns[f][i]
+                row[f] = None if np.isnan(value) else float(value)
+            out.append(row)
+        return out
+
+
+class SnapshotStore:
+    """Per-symbol latest rows + the currently published Snapshot"""
+
+    def __init__(self):
+        self._rows: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.current = Snapshot.from_rows([])
+
+    def upsert(self, row: Dict):
+        with self._lock:
+            self._rows[row['symbol']] = row
+
+    def retain(self, symbols: Iterable[str]) -> int:
+        """Drop the rows of symbols that left the universe; returns how many"""
+        keep = set(symbols)
+        with self._lock:
+            gone = [symbol for symbol in self._rows if symbol not in keep]
+            for symbol in gone:
+                del self._rows[symbol]
+        return len(gone)
+
+    def publish(self) -> Snapshot:
+        with self._lock:
+            rows = list(self._rows.values())
+        self.current = Snapshot.from_rows(rows)
+        return self.current
+
+
+STORE = SnapshotStore()
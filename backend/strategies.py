@@ -0,0 +1,371 @@
+"""
+🥓 Strategy Plane
+One scan cycle fetches each symbol once per timeframe, computes shared
+indicators once (memoized per symbol / interval / params) and runs every
+registered strategy over the same bars. The result is one PlaneSnapshot
+holding each strategy's results.
+
+A strategy declares the timeframes it reads and evaluates one symbol:
+
+    class MyStrategy(Strategy):
+        name = "my_strategy"
+        timeframes = {'1h': '1mo'}
+
+        def evaluate(self, bars):
+            if bars.indicator('rsi', '1h') < 30:
+                return {'symbol': bars.symbol, 'score': 1}
+
+    register(MyStrategy())
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+import confluences as cc
+from market_data import get_provider, period_to_timedelta
+from markets import market_of
+from metrics import StageTimer, SYMBOLS_SCANNED, SYMBOLS_ERRORED
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PLANE_NAME = "plane"  # label for metrics
+
+
+# ============================================
+# SHARED INDICATORS
+# ============================================
+
+INDICATORS: Dict[str, Callable] = {}
+
+
+def indicator(name: str):
+    """Register fn(df, *params) -> float as a shared indicator"""
+    def wrap(fn):
+        INDICATORS[name] = fn
+        return fn
+    return wrap
+
+
+@indicator('close')
+def last_close(df: "pd.DataFrame") -> float:
+    return float(df['Close'].iloc[-1])
+
+
+@indicator('rsi')
+def rsi(df: "pd.DataFrame", period: int = 14) -> float:
+    """Rolling-mean RSI, as every scanner in the repo computes it"""
+    delta = df['Close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(period).mean()
+    loss = -delta.where(delta < 0, 0).rolling(period).mean()
+    return float((100 - 100 / (1 + gain / loss)).iloc[-1])
+
+
+@indicator('ema')
+def ema(df: "pd.DataFrame", span: int) -> float:
+    return float(df['Close'].ewm(span=span).mean().iloc[-1])
+
+
+@indicator('volume_ratio')
+def volume_ratio(df: "pd.DataFrame", window: Optional[int] = 20) -> float:
+    """Last volume over its rolling mean (window=None: mean of the whole frame)"""
+    volume = df['Volume']
+    average = float(volume.mean() if window is None else volume.rolling(window).mean().iloc[-1])
+    return float(volume.iloc[-1]) / average if average > 0 else 0.0
+
+
+@indicator('change')
+def change(df: "pd.DataFrame", bars: int) -> float:
+    """% change of the last close over `bars` bars"""
+    close = df['Close']
+    return float((close.iloc[-1] - close.iloc[-1 - bars]) / close.iloc[-1 - bars] * 100)
+
+
+@indicator('avwap')
+def avwap(df: "pd.DataFrame", bars: int) -> float:
+    """VWAP anchored `bars` bars back"""
+    recent = df.tail(bars)
+    typical = (recent['High'] + recent['Low'] + recent['Close']) / 3
+    return float((typical * recent['Volume']).sum() / recent['Volume'].sum())
+
+
+@indicator('atr_pct')
+def atr_pct(df: "pd.DataFrame", period: int = 14) -> float:
+    """Average True Range as % of the last close"""
+    recent = df.tail(period + 1)
+    prev_close = recent['Close'].shift()
+    true_range = (recent['High'] - recent['Low']).to_frame('hl')
+    true_range['hc'] = (recent['High'] - prev_close).abs()
+    true_range['lc'] = (recent['Low'] - prev_close).abs()
+    return float(true_range.max(axis=1).iloc[1:].mean() / recent['Close'].iloc[-1] * 100)
+
+
+@indicator('range_mean')
+def range_mean(df: "pd.DataFrame", period: int = 14) -> float:
+    """Mean High-Low range (BaconScanner's ATR)"""
+    return float((df['High'] - df['Low']).rolling(period).mean().iloc[-1])
+
+
+class SymbolBars:
+    """Bars of one symbol per interval, with memoized shared indicators"""
+
+    def __init__(self, symbol: str, frames: Dict[str, "pd.DataFrame"]):
+        self.symbol = symbol
+        self.market = market_of(symbol)
+        self.frames = frames
+        self._values: Dict[tuple, float] = {}
+        self.computed = 0
+        self.hits = 0
+
+    def frame(self, interval: str) -> "pd.DataFrame":
+        return self.frames[interval]
+
+    def has(self, interval: str, min_bars: int = 1) -> bool:
+        df = self.frames.get(interval)
+        return df is not None and len(df) >= min_bars
+
+    def indicator(self, name: str, interval: str, *params) -> float:
+        key = (name, interval, params)
+        if key in self._values:
+            self.hits += 1
+            return self._values[key]
+        value = INDICATORS[name](self.frames[interval], *params)
+        self._values[key] = value
+        self.computed += 1
+        return value
+
+
+# ============================================
+# STRATEGIES
+# ============================================
+
+class Strategy:
+    """
+    timeframes: {interval: period} the strategy reads (the plane fetches the
+    longest period asked for each interval, once per symbol).
+    """
+
+    name = "base"
+    timeframes: Dict[str, str] = {}
+    min_bars = 30
+
+    def ready(self, bars: SymbolBars) -> bool:
+        return all(bars.has(interval, self.min_bars) for interval in self.timeframes)
+
+    def evaluate(self, bars: SymbolBars) -> Optional[Dict]:
+        """Result for one symbol, or None (no signal)"""
+        raise NotImplementedError
+
+    def finish(self, results: List) -> List[Dict]:
+        """Batch step after every symbol was evaluated (ranking, ML, ...)"""
+        return results
+
+
+STRATEGIES: Dict[str, Strategy] = {}
+
+
+def register(strategy: Strategy) -> Strategy:
+    STRATEGIES[strategy.name] = strategy
+    return strategy
+
+
+def requirements(strategies: Iterable[Strategy]) -> Dict[str, str]:
+    """Longest period per interval over all strategies"""
+    needs: Dict[str, str] = {}
+    for strategy in strategies:
+        for interval, period in strategy.timeframes.items():
+            current = needs.get(interval)
+            window = period_to_timedelta(period)
+            if current is None or window is None or (
+                    period_to_timedelta(current) is not None and window > period_to_timedelta(current)):
+                needs[interval] = period
+    return needs
+
+
+class AvwapStackStrategy(Strategy):
+    """main1.py's AVWAP-stack scanner on shared daily bars"""
+
+    name = "avwap_stack"
+    timeframes = {'1d': '3mo'}
+    min_bars = 20
+
+    def evaluate(self, bars: SymbolBars) -> Optional[Dict]:
+        price = bars.indicator('close', '1d')
+        avwaps = [bars.indicator('avwap', '1d', days) for days in (5, 13, 21)]
+        mask = cc.detect_avwap_stack(price, bars.indicator('rsi', '1d', 14),
+                                     bars.indicator('volume_ratio', '1d', None),
+                                     bars.indicator('change', '1d', 5), *avwaps)
+        count = cc.count(mask)
+        if count < 2:
+            return None
+        return {
+            'symbol': bars.symbol,
+            'price': price,
+            'confluences': cc.labels(mask),
+            'confluence_mask': mask,
+            'confluence_count': count,
+        }
+
+    def finish(self, results: List) -> List[Dict]:
+        return sorted(results, key=lambda r: r['confluence_count'], reverse=True)
+
+
+class Bacon15mStrategy(Strategy):
+    """
+    BaconScanner's technical score (out of 200) on shared 15m bars. The
+    per-symbol StockTwits call stays in BaconScanner, so the threshold here
+    applies to the technical score alone.
+    """
+
+    name = "bacon15m"
+    timeframes = {'15m': '5d'}
+    min_bars = 50
+
+    def __init__(self):
+        self._scanner = None
+
+    def evaluate(self, bars: SymbolBars) -> Optional[Dict]:
+        if self._scanner is None:
+            from scanner import BaconScanner
+            self._scanner = BaconScanner()
+
+        data = bars.frame('15m')
+        indicators = {
+            'ema_9': bars.indicator('ema', '15m', 9),
+            'ema_21': bars.indicator('ema', '15m', 21),
+            'ema_50': bars.indicator('ema', '15m', 50),
+            'rsi': bars.indicator('rsi', '15m', 14),
+            'vol_ratio': bars.indicator('volume_ratio', '15m', 20),
+        }
+        score = self._scanner.calculate_score(data, indicators)
+        if score < self._scanner.min_score:
+            return None
+        price = bars.indicator('close', '15m')
+        atr = bars.indicator('range_mean', '15m', 14)
+        direction = 'BUY' if price > indicators['ema_21'] else 'SELL'
+        sign = 1 if direction == 'BUY' else -1
+        return {
+            'symbol': bars.symbol,
+            'direction': direction,
+            'entry': price,
+            'stop': price - sign * atr,
+            'target': price + sign * atr * 3,
+            'tech_score': int(score),
+            'rsi': indicators['rsi'],
+            'volume_ratio': indicators['vol_ratio'],
+        }
+
+    def finish(self, results: List) -> List[Dict]:
+        return sorted(results, key=lambda r: r['tech_score'], reverse=True)
+
+
+register(AvwapStackStrategy())
+register(Bacon15mStrategy())
+
+
+# ============================================
+# DATA PLANE
+# ============================================
+
+@dataclass
+class PlaneSnapshot:
+    created_at: float
+    symbols: int
+    fetches: int
+    indicators_computed: int
+    indicators_shared: int
+    results: Dict[str, List[Dict]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    scan_time: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'created_at': self.created_at,
+            'symbols': self.symbols,
+            'fetches': self.fetches,
+            'indicators_computed': self.indicators_computed,
+            'indicators_shared': self.indicators_shared,
+            'scan_time': f"{self.scan_time:.2f}s",
+            'errors': self.errors,
+            'strategies': {name: {'signals_found': len(rows), 'results': rows}
+                           for name, rows in self.results.items()},
+        }
+
+
+class DataPlane:
+    """
+    Fetches each symbol once per interval any selected strategy needs
+    (a ResamplingProvider collapses those into one base fetch), then runs
+    the strategies in registration order over the shared SymbolBars.
+    """
+
+    def __init__(self, provider=None, workers: int = 8):
+        self.provider = provider
+        self.workers = workers
+        self.latest: Optional[PlaneSnapshot] = None
+        self._lock = threading.Lock()
+
+    def load(self, symbol: str, needs: Dict[str, str]) -> SymbolBars:
+        SYMBOLS_SCANNED.inc(scanner=PLANE_NAME)
+        timer = StageTimer(PLANE_NAME)
+        provider = self.provider or get_provider()
+        frames = {}
+        for interval, period in needs.items():
+            try:
+                frames[interval] = provider.history(symbol, period=period, interval=interval)
+            except Exception as e:
+                SYMBOLS_ERRORED.inc(scanner=PLANE_NAME)
+                print(f"Error fetching {symbol} ({interval}): {e}")
+        timer.lap("fetch")
+        return SymbolBars(symbol, frames)
+
+    def scan(self, symbols: List[str], names: Optional[Iterable[str]] = None) -> PlaneSnapshot:
+        start = time.time()
+        selected = [STRATEGIES[name] for name in names] if names else list(STRATEGIES.values())
+        needs = requirements(selected)
+        results: Dict[str, List] = {s.name: [] for s in selected}
+        errors: Dict[str, int] = {}
+        computed = shared = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            loaded = pool.map(lambda symbol: self.load(symbol, needs), symbols)
+            for bars in loaded:
+                timer = StageTimer(PLANE_NAME)
+                for strategy in selected:
+                    if not strategy.ready(bars):
+                        continue
+                    try:
+                        result = strategy.evaluate(bars)
+                    except Exception as e:
+                        errors[strategy.name] = errors.get(strategy.name, 0) + 1
+                        SYMBOLS_ERRORED.inc(scanner=strategy.name)
+                        print(f"Error in {strategy.name} for {bars.symbol}: {e}")
+                        continue
+                    if result is not None:
+                        results[strategy.name].append(result)
+                timer.lap("scoring")
+                computed += bars.computed
+                shared += bars.hits
+
+        for strategy in selected:
+            results[strategy.name] = strategy.finish(results[strategy.name])
+
+        snapshot = PlaneSnapshot(
+            created_at=time.time(),
+            symbols=len(symbols),
+            fetches=len(symbols) * len(needs),
+            indicators_computed=computed,
+            indicators_shared=shared,
+            results=results,
+            errors=errors,
+            scan_time=time.time() - start,
+        )
+        with self._lock:
+            self.latest = snapshot
+        return snapshot
+
+
+PLANE = DataPlane()
@@ -0,0 +1,255 @@
+"""
+🥓 Parameter Sweep
+Grid or random search over the BaconScanner thresholds with the vectorized
+backtester, spread over a process pool.
+
+Bars and indicators are computed once and placed in shared memory; workers
+map them instead of receiving pickled copies. Each finished parameter set
+is written to a SQLite results table, so an interrupted sweep resumes where
+it stopped.
+
+Run:  python sweep.py --name q1 --random 300 --period 1y
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backtest import BacktestParams, BarPanel, compute_indicators, simulate
+
+logger = logging.getLogger(__name__)
+
+SWEEP_DIR = Path(__file__).resolve().parent / "data" / "sweeps"
+
+DEFAULT_SPACE = {
+    'min_score': [130, 140, 150, 160, 170, 180],
+    'stop_atr': [0.75, 1.0, 1.5, 2.0],
+    'target_atr': [1.5, 2.0, 3.0, 4.0],
+    'rsi_core_low': [40, 45, 50],
+    'rsi_core_high': [60, 65, 70],
+    'vol_high': [1.8, 2.0, 2.5],
+    'vol_mid': [1.3, 1.5],
+}
+
+
+# ============================================
+# SEARCH SPACE
+# ============================================
+
+def grid(space: Dict[str, Sequence]) -> List[BacktestParams]:
+    keys = list(space)
+    return [BacktestParams(**dict(zip(keys, values))) for values in itertools.product(*space.values())]
+
+
+def random_search(space: Dict[str, Sequence], n: int, seed: int = 0) -> List[BacktestParams]:
+    """n distinct draws; a (low, high) tuple is sampled uniformly, a list by choice"""
+    rng = random.Random(seed)
+    seen, out = set(), []
+    for _ in range(n * 20):
+        if len(out) >= n:
+            break
+        draw = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                draw[key] = rng.randint(low, high) if isinstance(low, int) else round(rng.uniform(low, high), 3)
+            else:
+                draw[key] = rng.choice(values)
+        params = BacktestParams(**draw)
+        if params not in seen:
+            seen.add(params)
+            out.append(params)
+    return out
+
+
+def params_key(params: BacktestParams) -> str:
+    return hashlib.sha1(json.dumps(asdict(params), sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ============================================
+# SHARED MEMORY
+# ============================================
+
+class SharedArrays:
+    """Named numpy arrays copied once into shared memory blocks"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.specs = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+            self.blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+_worker: Dict = {}
+
+
+def _attach(specs: Dict, symbols: List[str]):
+    """Pool initializer: map the shared arrays (no copy)"""
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker.setdefault('blocks', []).append(block)  # keep mapped
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+
+    _worker['panel'] = BarPanel(symbols, arrays.pop('offsets'), arrays.pop('ts'),
+                                {f: arrays.pop(f) for f in BarPanel.FIELDS})
+    _worker['indicators'] = arrays
+
+
+def _evaluate(params: BacktestParams) -> Dict:
+    result = simulate(_worker['panel'], _worker['indicators'], params)
+    return result.summary()
+
+
+# ============================================
+# RESULTS TABLE
+# ============================================
+
+SUMMARY_COLUMNS = ['trades', 'win_rate', 'stop_rate', 'timeout_rate', 'avg_r',
+                   'avg_pnl_pct', 'total_pnl_pct', 'avg_bars_held']
+
+
+def open_results(path: Path, fingerprint: str) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    param_columns = ", ".join(f"{f.name} REAL" for f in fields(BacktestParams))
+    metric_columns = ", ".join(f"{c} REAL" for c in SUMMARY_COLUMNS)
+    db.executescript(f"""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS results (
+            params_key TEXT PRIMARY KEY,
+            {param_columns},
+            {metric_columns},
+            finished_at TEXT
+        );
+    """)
+    row = db.execute("SELECT value FROM meta WHERE key = 'data_fingerprint'").fetchone()
+    if row is None:
+        db.execute("INSERT INTO meta VALUES ('data_fingerprint', ?)", (fingerprint,))
+        db.commit()
+    elif row[0] != fingerprint:
+        raise ValueError(f"{path} was swept on different bars - use another --name")
+    return db
+
+
+def done_keys(db: sqlite3.Connection) -> set:
+    return {row[0] for row in db.execute("SELECT params_key FROM results")}
+
+
+def save_result(db: sqlite3.Connection, params: BacktestParams, summary: Dict):
+    values = asdict(params)
+    columns = ['params_key'] + list(values) + SUMMARY_COLUMNS + ['finished_at']
+    row = [params_key(params)] + list(values.values()) + \
+          [summary.get(c) for c in SUMMARY_COLUMNS] + [time.strftime('%Y-%m-%dT%H:%M:%S')]
+    db.execute(f"INSERT OR REPLACE INTO results ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})", row)
+    db.commit()
+
+
+def data_fingerprint(panel: BarPanel) -> str:
+    digest = hashlib.sha1(json.dumps(panel.symbols).encode())
+    digest.update(panel.offsets.tobytes())
+    if len(panel):
+        digest.update(np.array([panel.ts[0], panel.ts[-1]], dtype=np.int64).tobytes())
+        digest.update(np.float64(panel.close.sum()).tobytes())
+    return digest.hexdigest()[:16]
+
+
+# ============================================
+# SWEEP
+# ============================================
+
+def sweep(panel: BarPanel, candidates: List[BacktestParams], db_path: Path,
+          workers: Optional[int] = None, min_trades: int = 30) -> List[Dict]:
+    """Evaluate the candidates not yet in the results table; return the leaderboard"""
+    db = open_results(db_path, data_fingerprint(panel))
+    finished = done_keys(db)
+    todo = [p for p in candidates if params_key(p) not in finished]
+    print(f"🧮 {len(candidates)} parameter sets: {len(candidates) - len(todo)} done, {len(todo)} to run")
+
+    if todo:
+        indicators = compute_indicators(panel)
+        shared = SharedArrays(dict(
+            {f: getattr(panel, f) for f in BarPanel.FIELDS},
+            ts=panel.ts, offsets=panel.offsets, **indicators))
+        try:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                     initializer=_attach, initargs=(shared.specs, panel.symbols)) as pool:
+                futures = {pool.submit(_evaluate, params): params for params in todo}
+                for i, future in enumerate(as_completed(futures), 1):
+                    save_result(db, futures[future], future.result())
+                    if i % 25 == 0 or i == len(todo):
+                        print(f"  ✅ {i}/{len(todo)}")
+        finally:
+            shared.close()
+
+    return leaderboard(db, min_trades)
+
+
+def leaderboard(db: sqlite3.Connection, min_trades: int = 30, limit: int = 10) -> List[Dict]:
+    cursor = db.execute(
+        "SELECT * FROM results WHERE trades >= ? ORDER BY avg_r DESC LIMIT ?", (min_trades, limit))
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from market_data import get_provider
+
+    parser = argparse.ArgumentParser(description="Sweep BaconScanner thresholds with the backtester")
+    parser.add_argument("symbols", nargs="*", help="defaults to the bacon_scanner_complete WATCHLIST")
+    parser.add_argument("--name", default="default", help="results table: data/sweeps/<name>.db")
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--interval", default="15m")
+    parser.add_argument("--random", type=int, help="random search with N draws (default: full grid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--space", help="JSON file overriding DEFAULT_SPACE")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--min-trades", type=int, default=30)
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if not symbols:
+        from bacon_scanner_complete import WATCHLIST
+        symbols = WATCHLIST
+
+    space = DEFAULT_SPACE
+    if args.space:
+        # {"min_score": [140, 150], "stop_atr": {"low": 0.5, "high": 2.0}}
+        space = {k: (v['low'], v['high']) if isinstance(v, dict) else v
+                 for k, v in json.loads(Path(args.space).read_text()).items()}
+    candidates = random_search(space, args.random, args.seed) if args.random else grid(space)
+
+    provider = get_provider()
+    panel = BarPanel.from_frames({s: provider.history(s, period=args.period, interval=args.interval)
+                                  for s in symbols})
+
+    t0 = time.perf_counter()
+    best = sweep(panel, candidates, SWEEP_DIR / f"{args.name}.db", args.workers, args.min_trades)
+    print(f"\n⏱️  {time.perf_counter() - t0:.1f}s\n🏆 Top parameter sets by avg R:")
+    for row in best:
+        params = {f.name: row[f.name] for f in fields(BacktestParams)}
+        print(f"  avg_r {row['avg_r']:+.3f}  win {row['win_rate']:.1%}  trades {int(row['trades'])}  {params}")
@@ -0,0 +1,129 @@
+"""
+🥓 Alert rule tests
+RuleIndex against a rule-by-rule evaluation: edge triggers, missing
+values, cooldowns, rules added between snapshots. Run from backend/:
+python -m pytest -q
+"""
+
+import operator
+import random
+
+import pytest
+
+import alerts
+from alerts import Rule, RuleIndex
+
+COMPARE = {'lt': operator.lt, 'lte': operator.le, 'gt': operator.gt, 'gte': operator.ge}
+
+
+def rule(rule_id: int = 1, cooldown: float = 0, **conditions) -> Rule:
+    return Rule(id=rule_id, user_id="u1", conditions=alerts.parse_conditions(conditions), cooldown=cooldown)
+
+
+def fired(index: RuleIndex, now: float = 1000.0, subscribers=lambda symbol: set(), **rsi_by_symbol):
+    rows = [{'symbol': symbol, 'rsi': rsi} for symbol, rsi in rsi_by_symbol.items()]
+    return sorted((a.rule_id, a.symbol) for a in index.evaluate(rows, subscribers, now=now))
+
+
+def test_fires_on_the_edge_only():
+    index = RuleIndex()
+    index.replace([rule(rsi_lt=30)])
+    assert fired(index, AAPL=40) == []          # baseline
+    assert fired(index, AAPL=25) == [(1, 'AAPL')]
+    assert fired(index, AAPL=20) == []          # still true
+    assert fired(index, AAPL=30) == []          # lt is strict
+    assert fired(index, AAPL=29.9) == [(1, 'AAPL')]
+
+
+def test_missing_values_never_hold():
+    index = RuleIndex()
+    index.replace([rule(rsi_lt=30), rule(2, rsi_gte=50)])
+    assert fired(index, AAPL=None) == []
+    assert fired(index, AAPL=None) == []
+    assert fired(index, AAPL=25) == [(1, 'AAPL')]
+    assert fired(index, AAPL=None) == []
+    assert fired(index, AAPL=60) == [(2, 'AAPL')]
+
+
+def test_cooldown_per_rule_and_symbol():
+    index = RuleIndex()
+    index.replace([rule(rsi_lt=30, cooldown=100)])
+    fired(index, AAPL=40, TSLA=40, now=1000)
+    assert fired(index, AAPL=25, now=1000) == [(1, 'AAPL')]
+    fired(index, AAPL=40, now=1010)
+    assert fired(index, AAPL=25, TSLA=25, now=1050) == [(1, 'TSLA')]
+    fired(index, AAPL=40, now=1060)
+    assert fired(index, AAPL=25, now=1101) == [(1, 'AAPL')]
+
+
+def test_added_rule_fires_if_it_already_holds():
+    index = RuleIndex()
+    index.replace([rule(rsi_lt=30)])
+    fired(index, AAPL=20)
+    index.add(rule(2, rsi_lt=25))
+    assert fired(index, AAPL=20) == [(2, 'AAPL')]
+    assert fired(index, AAPL=20) == []
+    # A pending rule stays pending through an empty snapshot
+    index.add(rule(3, rsi_lt=35))
+    assert index.evaluate([]) == []
+    assert fired(index, AAPL=20) == [(3, 'AAPL')]
+    # Loaded rules (replace) are not pending
+    index.replace(list(index.rules.values()) + [rule(4, rsi_lt=40)])
+    assert fired(index, AAPL=20) == []
+
+
+def test_scopes():
+    index = RuleIndex()
+    index.replace([
+        Rule(id=1, user_id="u1", conditions=(('rsi', 'lt', 30.0),), symbols=frozenset({'AAPL'}), cooldown=0),
+        Rule(id=2, user_id="u2", conditions=(('rsi', 'lt', 30.0),), watchlist=True, cooldown=0),
+    ])
+    fired(index, AAPL=40, TSLA=40)
+    subscribers = {'TSLA': {'u2'}}.get
+    assert fired(index, AAPL=20, TSLA=20, subscribers=lambda s: subscribers(s, set())) == [(1, 'AAPL'), (2, 'TSLA')]
+
+
+@pytest.mark.parametrize("raw", [{}, {"rsi_between": 1}, {"nope_lt": 1}, {"rsi_lt": "x"},
+                                 {f"{f}_lt": 1 for f in ('rsi', 'price', 'volume', 'change_1d', 'atr_pct')}])
+def test_invalid_conditions(raw):
+    with pytest.raises(ValueError):
+        alerts.parse_conditions(raw)
+
+
+def test_matches_rule_by_rule_evaluation():
+    rng = random.Random(3)
+    symbols = [f"S{i}" for i in range(40)]
+    fields = {'rsi': (10, 90), 'volume_ratio': (0.5, 4), 'change_1d': (-5, 5)}
+    rules = []
+    for i in range(400):
+        conditions = tuple((name, rng.choice(alerts.OPS), round(rng.uniform(*fields[name]), 1))
+                           for name in rng.sample(sorted(fields), rng.randint(1, 3)))
+        scope = rng.random()
+        rules.append(Rule(id=i, user_id=f"u{i % 7}", conditions=conditions, cooldown=0,
+                          symbols=frozenset(rng.sample(symbols, 2)) if scope < 0.6 else None,
+                          watchlist=scope > 0.9))
+    watching = {s: {f"u{rng.randrange(7)}"} for s in symbols}
+    index = RuleIndex()
+    index.replace(rules)
+
+    def holds(r, row):
+        return all(row[name] is not None and COMPARE[op](row[name], value) for name, op, value in r.conditions)
+
+    rows = {s: {name: round(rng.uniform(*bounds), 1) for name, bounds in fields.items()} for s in symbols}
+    previous = None
+    for step in range(30):
+        for s in rng.sample(symbols, 15):
+            name = rng.choice(sorted(fields))
+            rows[s][name] = None if rng.random() < 0.05 else round(rng.uniform(*fields[name]), 1)
+        got = sorted((a.rule_id, a.symbol) for a in index.evaluate(
+            [{'symbol': s, **row} for s, row in rows.items()], watching.get, now=1000 + step))
+        expected = []
+        if previous is not None:
+            for r in rules:
+                for s in (r.symbols or symbols):
+                    if r.watchlist and not r.symbols and r.user_id not in watching[s]:
+                        continue
+                    if holds(r, rows[s]) and not holds(r, previous[s]):
+                        expected.append((r.id, s))
+        assert got == sorted(expected), step
+        previous = {s: dict(row) for s, row in rows.items()}
@@ -0,0 +1,81 @@
+"""
+🥓 Backtest tests
+The vectorized score against BaconScanner.calculate_tech_score bar by bar,
+and first-touch exits on hand-built bars. Run from backend/:
+python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from fixtures import synthetic_ohlcv  # noqa: E402
+
+import backtest as bt  # noqa: E402
+from bacon_scanner_complete import BaconScanner  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_score_equals_the_live_scanner(seed):
+    df = synthetic_ohlcv(120, '15m', seed=seed)
+    panel = bt.BarPanel.from_frames({'X': df})
+    score = bt.tech_score(panel, bt.compute_indicators(panel))
+    scanner = BaconScanner()
+    # The live scanner sees the bars up to i; its EMAs start from the same first bar
+    live = [scanner.calculate_tech_score(df.iloc[:i + 1], scanner.calculate_indicators(df.iloc[:i + 1]))
+            for i in range(len(df))]
+    assert score.tolist() == live
+    assert score.max() > 0
+
+
+def flat(n: int = 60, **bars) -> pd.DataFrame:
+    """Close = 100 + 0.01 * i inside a +-0.5 range; bars={i: {'High': ..}} overrides"""
+    close = 100 + 0.01 * np.arange(n)
+    df = pd.DataFrame({'Open': close, 'High': close + 0.5, 'Low': close - 0.5, 'Close': close,
+                       'Volume': np.full(n, 1000.0)},
+                      index=pd.date_range('2025-01-06 14:30', periods=n, freq='15min', tz='UTC'))
+    for i, values in bars.items():
+        for column, value in values.items():
+            df.iloc[int(i[1:]), df.columns.get_loc(column)] = value
+    return df
+
+
+def test_first_touch_outcomes():
+    # Entries at bar 50 (57 for E), price 100.5: ATR 2 -> stop 98.5, target 106.5
+    frames = {
+        'A': flat(b52={'High': 107.0}),                  # target on the 2nd bar
+        'B': flat(b51={'Low': 98.0}, b53={'High': 107.0}),  # stop first
+        'C': flat(b53={'High': 107.0, 'Low': 98.0}),     # both in one bar: stop
+        'D': flat(),                                     # neither within max_hold
+        'E': flat(),                                     # data ends before max_hold
+    }
+    panel = bt.BarPanel.from_frames(frames)
+    n = len(panel)
+    bar_index = np.concatenate([np.arange(60)] * 5)
+    ind = {'bar_index': bar_index, 'atr': np.full(n, 2.0), 'ema_21': np.full(n, 0.0)}
+    score = np.zeros(n, dtype=np.int32)
+    score[panel.offsets[:4] + 50] = 200
+    score[panel.offsets[4] + 57] = 200
+
+    result = bt.simulate(panel, ind, bt.BacktestParams(max_hold=5), score=score)
+    assert [panel.symbols[i] for i in result.symbol_id] == list('ABCDE')
+    assert result.direction.tolist() == [1] * 5
+    assert result.outcome.tolist() == [bt.TARGET, bt.STOP, bt.STOP, bt.TIMEOUT, bt.TIMEOUT]
+    assert result.bars_held.tolist() == [2, 1, 3, 5, 2]
+    assert result.exit == pytest.approx([106.5, 98.5, 98.5, 100.55, 100.59])
+    assert result.r_multiple == pytest.approx([3.0, -1.0, -1.0, 0.025, 0.01])
+
+
+def test_a_persisting_signal_is_one_trade():
+    panel = bt.BarPanel.from_frames({'A': flat(), 'B': flat()})
+    ind = {'bar_index': np.concatenate([np.arange(60)] * 2), 'atr': np.full(120, 2.0),
+           'ema_21': np.zeros(120)}
+    score = np.zeros(120, dtype=np.int32)
+    score[50:60] = 200      # the last bars of A ...
+    score[60:65] = 200      # ... and the first of B, too early for a signal
+    entries = np.flatnonzero(bt.signal_mask(panel, ind, bt.BacktestParams(), score))
+    assert entries.tolist() == [50]
@@ -0,0 +1,99 @@
+"""
+🥓 Confluence tests
+Masks and params decode to the labels the original string-building scan
+produced, plus parsing, matching and scoring. Run from backend/:
+python -m pytest -q
+"""
+
+import random
+
+import pytest
+
+import confluences as cc
+
+
+def legacy_labels(price, rsi, volume_ratio, change_1d, change_5d, avwap_5d, avwap_13d, avwap_21d,
+                  ml_prediction, ml_confidence):
+    """The list of strings main.analyze built before confluences were bits"""
+    out = []
+    if rsi < 30:
+        out.append("RSI Oversold (<30)")
+    elif rsi < 40:
+        out.append("RSI Buy Zone (30-40)")
+    if volume_ratio > 2.0:
+        out.append(f"Volume Explosion ({volume_ratio:.1f}x)")
+    elif volume_ratio > 1.5:
+        out.append(f"High Volume ({volume_ratio:.1f}x)")
+    if price > avwap_5d:
+        out.append("Price > AVWAP 5D")
+    if price > avwap_13d:
+        out.append("Price > AVWAP 13D")
+    if price > avwap_21d:
+        out.append("Price > AVWAP 21D")
+    if change_5d > 5:
+        out.append(f"Strong 5D Momentum (+{change_5d:.1f}%)")
+    elif change_5d > 2:
+        out.append(f"Positive 5D Momentum (+{change_5d:.1f}%)")
+    if change_1d > 3:
+        out.append(f"Today's Breakout (+{change_1d:.1f}%)")
+    if ml_prediction in ("STRONG BUY", "BUY"):
+        out.append(f"ML: {ml_prediction} ({ml_confidence:.0f}%)")
+    return out
+
+
+def test_labels_match_the_legacy_strings():
+    rng = random.Random(4)
+    for _ in range(2000):
+        price = rng.uniform(50, 150)
+        args = dict(price=price, rsi=rng.uniform(10, 80), volume_ratio=rng.uniform(0.5, 4),
+                    change_1d=rng.uniform(-5, 6), change_5d=rng.uniform(-8, 10),
+                    avwap_5d=rng.uniform(50, 150), avwap_13d=rng.uniform(50, 150),
+                    avwap_21d=rng.uniform(50, 150))
+        ml_prediction = rng.choice(["STRONG BUY", "BUY", "NEUTRAL", "SELL"])
+        ml_confidence = rng.uniform(50, 99)
+        mask, params = cc.detect_daily(**args)
+        if ml_prediction in cc.ML_CODES:
+            mask |= cc.ML_CODES[ml_prediction]
+            params.append(ml_confidence)
+        assert cc.labels(mask, params) == legacy_labels(**args, ml_prediction=ml_prediction,
+                                                        ml_confidence=ml_confidence)
+        assert cc.score(mask) == cc.count(mask) <= cc.MAX_DAILY
+
+
+def test_decode_bits_and_params():
+    mask = cc.RSI_OVERSOLD | cc.VOLUME_EXPLOSION | cc.BREAKOUT
+    assert cc.bits(mask) == [cc.RSI_OVERSOLD, cc.VOLUME_EXPLOSION, cc.BREAKOUT]
+    assert cc.decode(mask, (2.5, 4.0)) == [(cc.RSI_OVERSOLD, None), (cc.VOLUME_EXPLOSION, 2.5),
+                                           (cc.BREAKOUT, 4.0)]
+    # Labels without their params fall back to the bare template
+    assert cc.labels(cc.RSI_OVERSOLD) == ["RSI Oversold (<30)"]
+    assert cc.bits(0) == [] and cc.labels(0) == []
+
+
+def test_parse_and_matches():
+    required = cc.parse(["volume_explosion", " ML_BUY", ""])
+    assert required == cc.VOLUME_EXPLOSION | cc.ML_BUY
+    with pytest.raises(ValueError):
+        cc.parse(["NOT_A_CODE"])
+    mask = cc.VOLUME_EXPLOSION | cc.ML_BUY | cc.BREAKOUT
+    assert cc.matches(mask, required)
+    assert not cc.matches(mask, required | cc.RSI_OVERSOLD)
+    assert not cc.matches(mask, required, excluded=cc.BREAKOUT)
+    assert cc.matches(mask, excluded=cc.RSI_OVERSOLD)
+
+
+def test_avwap_stack():
+    assert cc.detect_avwap_stack(110, 50, 1.0, 0, 105, 100, 95) == cc.AVWAP_BULLISH
+    assert cc.detect_avwap_stack(90, 75, 2.5, -6, 95, 100, 105) == \
+        cc.AVWAP_BEARISH | cc.RSI_OVERBOUGHT | cc.VOLUME_SPIKE | cc.STRONG_DOWNTREND
+    # Missing AVWAPs give no stack code
+    assert cc.detect_avwap_stack(110, 25, 1.6, 6, None, 100, 95) == \
+        cc.RSI_OVERSOLD | cc.STRONG_VOLUME | cc.STRONG_UPTREND
+
+
+def test_code_table_covers_every_code():
+    table = cc.code_table()
+    assert len({row['bit'] for row in table}) == len(table) == len(cc.LABELS)
+    assert {row['name'] for row in table if row['param']} == \
+        {'VOLUME_EXPLOSION', 'HIGH_VOLUME', 'STRONG_MOMENTUM', 'POSITIVE_MOMENTUM', 'BREAKOUT',
+         'ML_STRONG_BUY', 'ML_BUY'}
@@ -0,0 +1,80 @@
+"""
+🥓 Feature store tests
+Stored features against the live calculation, stale frames against the
+stored tail, gaps and short live fetches. Run from backend/: python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from fixtures import synthetic_ohlcv  # noqa: E402
+
+import main  # noqa: E402
+from feature_store import LOOKBACK, FeatureStore  # noqa: E402
+
+
+def test_stored_features_match_the_live_calculation(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = synthetic_ohlcv(300, seed=1)
+    # Built in two steps, the second one incremental
+    store.update('X', df.iloc[:250])
+    assert store.update('X', df) == 50
+    stored = store.latest('X')
+    live = main.calculate_ml_features(df.tail(LOOKBACK))
+    assert stored.keys() == live.keys()
+    for name in live:
+        assert np.isclose(stored[name], live[name]), name
+
+
+def test_stale_frame_does_not_get_newer_features(tmp_path, monkeypatch):
+    store = FeatureStore(str(tmp_path))
+    monkeypatch.setattr('feature_store.get_store', lambda: store)
+    df = synthetic_ohlcv(200, seed=2)
+    store.update('X', df)
+    stale = df.iloc[:150]
+    assert store.update('X', stale) == 0
+    assert store.latest('X', at=df.index[-1]) == store.latest('X')
+    assert store.latest('X', at=stale.index[-1]) is not None
+    # A revised close for that bar is not served from the store either
+    assert store.latest('X', at=stale.index[-1], close=0.0) is None
+    features = main.stored_ml_features('X', stale)
+    expected = main.calculate_ml_features(stale)
+    assert all(np.isclose(features[k], expected[k]) for k in expected)
+
+
+def test_rows_without_full_context_are_not_stored(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = synthetic_ohlcv(100, seed=3)
+    assert store.update('X', df.iloc[:LOOKBACK - 1]) == 0
+    assert store.update('X', df) == 100 - (LOOKBACK - 1)
+    ts, cols = store.read('X')
+    assert ts[0] == df.index[LOOKBACK - 1].value
+    assert np.isfinite(cols['volatility']).all()
+
+
+def test_short_live_fetch_uses_stored_context(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = synthetic_ohlcv(300, seed=4)
+    store.update('X', df.iloc[:280])
+    # A ~3mo live fetch is shorter than LOOKBACK; the stored bars fill it in
+    live = df.iloc[-(LOOKBACK - 1):]
+    assert store.update('X', live) == 20
+    full = FeatureStore(str(tmp_path / 'full'))
+    full.update('X', df)
+    for name, values in store.read('X')[1].items():
+        assert np.allclose(values, full.read('X')[1][name][-len(values):]), name
+
+
+def test_frame_after_the_stored_tail_is_rejected(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    df = synthetic_ohlcv(300, seed=5)
+    store.update('X', df.iloc[:200])
+    rows = store.rows('X')
+    assert store.update('X', df.iloc[210:]) == 0
+    assert store.rows('X') == rows
+    assert store.latest('X', at=df.index[-1]) is None
+    # Once the gap is covered, the frame goes in
+    assert store.update('X', df.iloc[150:]) == 100
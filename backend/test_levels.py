@@ -0,0 +1,78 @@
+"""
+🥓 Levels tests
+Pivots, zone clustering and targets on hand-checked numbers, the batch
+pass against one symbol at a time, and the zone cache. Run from backend/:
+python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from fixtures import synthetic_ohlcv  # noqa: E402
+
+import levels  # noqa: E402
+
+
+def test_pivots_ignore_padding():
+    high = np.array([[np.nan, np.nan, 1, 2, 5, 2, 1, 3, 2]], dtype=float)
+    low = high - 1
+    found = levels.pivots(high, low, bars=2)
+    assert sorted(found[~np.isnan(found)]) == [0.0, 5.0]
+
+
+def test_cluster_splits_on_tolerance():
+    prices = np.array([[5.2, 1.0, np.nan, 1.1, 5.0],
+                       [3.0, np.nan, np.nan, np.nan, np.nan]])
+    centres, touches = levels.cluster(prices, tolerance=np.array([0.5, 0.5]))
+    assert np.allclose(centres[0], [1.05, 5.1])
+    assert touches.tolist() == [[2, 2], [1, 0]]
+    centres, touches = levels.cluster(prices, tolerance=np.array([0.5, 0.5]), min_touches=2)
+    assert np.allclose(centres[0], [1.05, 5.1]) and touches[1].tolist() == [0, 0]
+
+
+def test_targets_long_and_short():
+    zones = np.array([[90.0, 95.0, 105.0, 110.0]] * 2)
+    out = levels.targets(zones, atr=np.array([2.0, 2.0]), entry=np.array([100.0, 100.0]),
+                         direction=np.array([1, -1]))
+    long = {name: float(values[0]) for name, values in out.items()}
+    short = {name: float(values[1]) for name, values in out.items()}
+    assert long == pytest.approx({'support': 95, 'resistance': 105, 'tp1': 105, 'tp2': 110, 'tp3': 114,
+                                  'stop_loss': 96, 'rr': 2.5})
+    assert short == pytest.approx({'support': 95, 'resistance': 105, 'tp1': 95, 'tp2': 90, 'tp3': 86,
+                                   'stop_loss': 104, 'rr': 2.5})
+
+
+def test_targets_without_zones():
+    out = levels.targets(np.full((1, 0), np.nan), atr=np.array([2.0]), entry=np.array([100.0]),
+                         direction=np.array([1]))
+    assert np.isnan(out['support'][0]) and np.isnan(out['resistance'][0])
+    assert out['stop_loss'][0] == 98
+    assert [out[f'tp{k}'][0] for k in (1, 2, 3)] == [102, 104, 106]
+
+
+def test_batch_equals_one_symbol_at_a_time():
+    frames = [synthetic_ohlcv(n, seed=n) for n in (40, 120, 200, 3)]
+    engine = levels.LevelEngine()
+    for batch, df in zip(engine.compute(frames), frames):
+        single = engine.compute([df])[0]
+        assert np.allclose(batch.prices, single.prices) and (batch.touches == single.touches).all()
+        assert batch.atr == pytest.approx(single.atr) and batch.close == single.close
+    zones = engine.compute(frames[1:2])[0]
+    assert (np.diff(zones.prices) > 0).all() and zones.touches.sum() > 0
+
+
+def test_zones_cached_until_a_new_bar():
+    df = synthetic_ohlcv(150, seed=7)
+    engine = levels.LevelEngine()
+    first = engine.levels({'X': df.iloc[:-1]})
+    assert engine.levels({'X': df.iloc[:-1]}) == first
+    assert (engine.computed, engine.reused) == (1, 1)
+    engine.levels({'X': df})
+    assert engine.computed == 2
+    row = engine.levels({'X': df}, entries={'X': 1e6})['X']
+    assert row['resistance'] is None and row['tp1'] > 1e6
+    assert row['stop_loss'] < 1e6
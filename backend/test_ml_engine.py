@@ -0,0 +1,45 @@
+"""
+🥓 ML engine tests
+The holdout split leaves a purge gap of `horizon` bars, so no training
+label is computed from holdout closes. Run from backend/: python -m pytest -q
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+
+from ml_engine import FEATURE_NAMES, MLEngine  # noqa: E402
+
+
+def stacked(days: int = 100, symbols: int = 2, seed: int = 0):
+    """Rows of several symbols sharing the same daily timestamps"""
+    rng = np.random.default_rng(seed)
+    days_ts = np.arange('2024-01-01', days, dtype='datetime64[D]').astype('datetime64[ns]')
+    ts = np.tile(days_ts, symbols)
+    X = rng.normal(size=(len(ts), len(FEATURE_NAMES)))
+    y = (rng.random(len(ts)) > 0.5).astype(np.int8)
+    return X, y, ts, days_ts
+
+
+def test_last_horizon_bars_before_the_holdout_are_purged():
+    X, y, ts, days = stacked()
+    engine = MLEngine.fit(X, y, ts, horizon=5, n_estimators=5, holdout=0.2, n_jobs=1)
+    meta = engine.meta
+    # Holdout = last 20 days of both symbols; the 5 days before it are dropped
+    assert meta['metrics']['holdout_rows'] == 2 * 20
+    assert meta['metrics']['purged_rows'] == 2 * 5
+    assert meta['train_rows'] == 2 * 75
+    assert meta['train_end'] == str(days[74])
+
+
+def test_no_holdout_trains_on_everything():
+    X, y, ts, _ = stacked()
+    engine = MLEngine.fit(X, y, ts, horizon=5, n_estimators=5, holdout=0, n_jobs=1)
+    assert engine.meta['train_rows'] == len(X) and engine.meta['metrics'] == {}
+
+
+def test_too_short_for_the_purge_gap():
+    X, y, ts, _ = stacked(days=6)
+    with pytest.raises(ValueError):
+        MLEngine.fit(X, y, ts, horizon=5, n_estimators=5, holdout=0.5, n_jobs=1)
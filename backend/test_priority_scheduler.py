@@ -0,0 +1,70 @@
+"""
+🥓 Priority scheduler tests
+Refresh intervals, the lazy-delete heap and the token bucket, on a fake
+clock. Run from backend/: python -m pytest -q
+"""
+
+import pytest
+
+from priority_scheduler import BASE_INTERVAL, MAX_INTERVAL, MIN_INTERVAL, PriorityScheduler, refresh_interval
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_refresh_interval():
+    assert refresh_interval(None, None, None) == BASE_INTERVAL
+    assert refresh_interval(2.0, 1.0, 2) == BASE_INTERVAL
+    assert refresh_interval(4.0, None, None) == BASE_INTERVAL / 2       # twice as volatile
+    assert refresh_interval(None, 3.0, None) == BASE_INTERVAL / 3       # volume spike
+    assert refresh_interval(None, None, 1) == BASE_INTERVAL / 2         # next to a grade change
+    assert refresh_interval(20.0, 10.0, 1) == MIN_INTERVAL
+    assert refresh_interval(0.1, 0.5, 10) == BASE_INTERVAL * 4 * 2      # quiet volume does not slow it
+    assert refresh_interval(0.1, None, 10, base=600) == MAX_INTERVAL
+
+
+def test_most_overdue_first_and_stale_entries_skipped():
+    clock = Clock()
+    scheduler = PriorityScheduler(budget_per_minute=100, clock=clock)
+    for symbol, due in (('A', 990), ('B', 950), ('C', 980), ('D', 2000)):
+        scheduler.add(symbol, due=due)
+    scheduler.defer('C', 1500)      # leaves a stale (980, C) entry behind
+    scheduler.remove('A')           # leaves a stale (990, A) entry behind
+    assert scheduler.take() == ['B']
+    assert scheduler.next_due() == 1000 + BASE_INTERVAL    # B again, before C
+    clock.now = 1500
+    assert scheduler.take() == ['B', 'C']     # B (due 1300) is more overdue
+    # Taken symbols are re-queued one interval later until observe() reports back
+    assert scheduler.states['C'].next_due == 1500 + BASE_INTERVAL
+    assert scheduler.observe('C', atr_pct=4.0, now=1500) == BASE_INTERVAL / 2
+    assert scheduler.states['C'].next_due == 1500 + BASE_INTERVAL / 2
+    assert len(scheduler._heap) > len(scheduler)   # stale entries stay until popped
+
+
+def test_token_bucket_caps_fetches():
+    clock = Clock()
+    scheduler = PriorityScheduler([f"S{i}" for i in range(10)], budget_per_minute=6, clock=clock)
+    assert len(scheduler.take()) == 6
+    assert scheduler.take() == []
+    # One token every 10 seconds
+    assert scheduler.seconds_until_next() == pytest.approx(10)
+    clock.now += 25
+    assert len(scheduler.take()) == 2
+    clock.now += 600     # every symbol is due, but the bucket holds one minute of budget
+    assert len(scheduler.take()) == 6
+
+
+def test_deferred_symbols_spend_no_budget():
+    clock = Clock()
+    scheduler = PriorityScheduler(['BTC'], budget_per_minute=1, clock=clock)
+    scheduler.add('US1', due=900)
+    scheduler.add('US2', due=950)
+    closed = {'US1': 5000.0, 'US2': 5000.0}
+    assert scheduler.take(defer_until=lambda symbol, now: closed.get(symbol)) == ['BTC']
+    assert scheduler.states['US1'].next_due == 5000
+    assert scheduler.take(defer_until=lambda symbol, now: closed.get(symbol)) == []
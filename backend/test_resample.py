@@ -0,0 +1,97 @@
+"""
+🥓 Resample tests
+Derived bars against a bar-by-bar grouping on each calendar's session
+clock. Run from backend/: python -m pytest -q
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from resample import resample, resample_all
+from sessions import CME_GLOBEX, CRYPTO_24_7, NYSE
+
+
+def around_the_clock(start: str = '2025-01-05', days: int = 6, seed: int = 0) -> pd.DataFrame:
+    """15m bars for every quarter hour, pre/post market and weekends included"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=days * 96, freq='15min', tz='UTC')
+    close = 100 + np.cumsum(rng.normal(0, 0.2, len(index)))
+    spread = np.abs(rng.normal(0, 0.1, len(index)))
+    return pd.DataFrame({
+        'Open': close - rng.normal(0, 0.05, len(index)),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(100, 10_000, len(index)).astype(float),
+    }, index=index)
+
+
+def reference(df: pd.DataFrame, calendar, minutes: int) -> pd.DataFrame:
+    """Group bar by bar: bucket = session start + whole intervals since the open"""
+    open_min = calendar.open.hour * 60 + calendar.open.minute
+    close_min = calendar.close.hour * 60 + calendar.close.minute
+    length = 1440 if calendar.always_open else (close_min - open_min) % 1440 or 1440
+    groups = defaultdict(list)
+    for ts, row in df.iterrows():
+        local = ts.tz_convert(calendar.tz)
+        since_open = (local.hour * 60 + local.minute - open_min) % 1440
+        if since_open >= length:
+            continue
+        session_open = local.floor('min') - pd.Timedelta(minutes=since_open)
+        if minutes >= 1440:
+            day = (session_open + pd.Timedelta(days=1)).normalize() if calendar.open_previous_day \
+                else session_open.normalize()
+            key = day.tz_localize(None).tz_localize(calendar.tz)
+        else:
+            key = session_open + pd.Timedelta(minutes=since_open // minutes * minutes)
+        groups[key].append(row)
+    rows = {key: {'Open': bars[0]['Open'], 'High': max(b['High'] for b in bars),
+                  'Low': min(b['Low'] for b in bars), 'Close': bars[-1]['Close'],
+                  'Volume': sum(b['Volume'] for b in bars)} for key, bars in groups.items()}
+    return pd.DataFrame.from_dict(rows, orient='index').sort_index()
+
+
+def same_bars(got: pd.DataFrame, expected: pd.DataFrame):
+    assert len(got) == len(expected)
+    assert (got.index == expected.index).all()
+    assert np.allclose(got[expected.columns].to_numpy(float), expected.to_numpy(float))
+
+
+@pytest.mark.parametrize("calendar", [NYSE, CME_GLOBEX, CRYPTO_24_7], ids=lambda c: c.name)
+def test_matches_bar_by_bar_grouping(calendar):
+    df = around_the_clock()
+    derived = resample_all(df, ['30m', '1h', '4h', '1d'], calendar)
+    for interval, minutes in {'30m': 30, '1h': 60, '4h': 240, '1d': 1440}.items():
+        same_bars(derived[interval], reference(df, calendar, minutes))
+
+
+def test_nyse_buckets_follow_the_open():
+    df = around_the_clock()
+    # Labels keep the input's timezone (UTC here)
+    hours = resample(df, '1h', NYSE).index.tz_convert(NYSE.tz)
+    monday = hours[hours.date == pd.Timestamp('2025-01-06').date()]
+    assert [t.strftime('%H:%M') for t in monday] == \
+        ['09:30', '10:30', '11:30', '12:30', '13:30', '14:30', '15:30']
+    four = resample(df, '4h', NYSE).index.tz_convert(NYSE.tz)
+    assert [t.strftime('%H:%M') for t in four[:2]] == ['09:30', '13:30']
+
+
+def test_globex_sunday_evening_is_monday():
+    df = around_the_clock()
+    days = resample(df, '1d', CME_GLOBEX)
+    sunday_open = df.index[df.index.tz_convert(CME_GLOBEX.tz) ==
+                           pd.Timestamp('2025-01-05 18:00', tz=CME_GLOBEX.tz)][0]
+    monday = days.loc[pd.Timestamp('2025-01-06', tz=CME_GLOBEX.tz)]
+    assert monday['Open'] == df.loc[sunday_open, 'Open']
+
+
+def test_unsorted_and_empty_input():
+    df = around_the_clock(days=2)
+    shuffled = df.sample(frac=1, random_state=0)
+    same_bars(resample(shuffled, '1h', NYSE), resample(df, '1h', NYSE))
+    assert all(out.empty for out in resample_all(df.iloc[:0], ['1h', '1d'], NYSE).values())
+    with pytest.raises(ValueError):
+        resample(df, '7m', NYSE)
@@ -0,0 +1,116 @@
+"""
+🥓 Retention tests
+Rollups against the raw rows they replace, on the in-memory SQLite
+stand-in. Run from backend/: python -m pytest -q
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import retention
+
+NOW = datetime(2026, 6, 15, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    conn, dialect = retention.connect("sqlite://")
+    yield conn, dialect
+    conn.close()
+
+
+def insert(conn, created: datetime, score: int = 100, symbol: str = 'SPY', direction: str = 'BUY'):
+    conn.execute("INSERT INTO signals (symbol, direction, entry, stop, target, tech_score, social_score, "
+                 "total_score, created_at) VALUES (?, ?, 1, 1, 1, ?, 0, ?, ?)",
+                 (symbol, direction, score, score, retention._iso(created)))
+    conn.commit()
+
+
+def rolled(conn, granularity: str = 'day'):
+    return conn.execute("SELECT COALESCE(SUM(signal_count), 0), COALESCE(SUM(score_sum), 0), MAX(score_max) "
+                        "FROM signal_rollups WHERE granularity = ?", (granularity,)).fetchone()
+
+
+def test_rollups_match_raw_and_rerun_is_a_noop(db):
+    conn, dialect = db
+    for hours in range(0, 24 * 120, 5):
+        insert(conn, NOW - timedelta(hours=hours, minutes=7), score=hours % 90 + 10)
+    closed = conn.execute("SELECT COUNT(*), SUM(total_score), MAX(total_score) FROM signals "
+                          "WHERE created_at < ?", (retention._iso(retention._floor_hour(NOW)),)).fetchone()
+    first = retention.run_retention(conn, dialect, now=NOW)
+    second = retention.run_retention(conn, dialect, now=NOW)
+    assert rolled(conn, 'hour') == rolled(conn, 'day') == closed
+    assert first['rows_deleted'] > 0 and second['rows_deleted'] == 0
+    oldest = conn.execute("SELECT MIN(created_at) FROM signals").fetchone()[0]
+    assert retention._parse(oldest) >= NOW - timedelta(days=retention.RAW_RETENTION_DAYS)
+
+
+def test_late_row_before_the_grace_window_is_rolled_once(db):
+    conn, dialect = db
+    insert(conn, NOW - timedelta(days=10))
+    retention.run_retention(conn, dialect, now=NOW)
+    # Arrives after that run, stamped well before the recomputed window
+    insert(conn, NOW - timedelta(days=10, hours=3), score=150)
+    report = retention.run_retention(conn, dialect, now=NOW + timedelta(hours=1))
+    assert report['late_rows'] == 1
+    retention.run_retention(conn, dialect, now=NOW + timedelta(hours=2))
+    assert rolled(conn, 'hour') == rolled(conn, 'day') == (2, 250, 150)
+
+
+def test_late_row_in_a_compacted_hour_is_added_not_replacing(db):
+    conn, dialect = db
+    old = NOW - timedelta(days=200)
+    insert(conn, old, score=100)
+    insert(conn, old + timedelta(minutes=5), score=120)
+    retention.run_retention(conn, dialect, now=NOW)
+    assert conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 0
+    insert(conn, old + timedelta(minutes=10), score=90)
+    retention.run_retention(conn, dialect, now=NOW + timedelta(hours=1))
+    assert rolled(conn, 'hour') == rolled(conn, 'day') == (3, 310, 120)
+    assert conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 0
+
+
+def test_compaction_keeps_rows_the_next_run_recomputes(db):
+    conn, dialect = db
+    for hours in range(1, 100):
+        insert(conn, NOW - timedelta(hours=hours))
+    report = retention.run_retention(conn, dialect, raw_days=0, now=NOW, grace_hours=24)
+    assert retention._parse(report['raw_cutoff']) == retention._floor_hour(NOW) - timedelta(hours=24)
+    # Recomputing the grace window from what is left keeps the totals
+    retention.run_retention(conn, dialect, raw_days=0, now=NOW + timedelta(hours=3), grace_hours=24)
+    assert rolled(conn, 'hour')[0] == rolled(conn, 'day')[0] == 99
+
+
+def test_rolling_forward_run_by_run(db):
+    conn, dialect = db
+    inserted = 0
+    for step in range(60):
+        now = NOW + timedelta(hours=step)
+        insert(conn, now - timedelta(minutes=20))
+        # Every fifth run also sees a straggler from three days back
+        if step % 5 == 0:
+            insert(conn, now - timedelta(days=3))
+            inserted += 1
+        inserted += 1
+        retention.run_retention(conn, dialect, raw_days=1, now=now, grace_hours=6)
+    final = NOW + timedelta(hours=60)
+    retention.run_retention(conn, dialect, raw_days=1, now=final, grace_hours=6)
+    assert rolled(conn, 'hour')[0] == rolled(conn, 'day')[0] == inserted
+
+
+def test_row_inserted_after_the_rollup_survives_compaction(db):
+    conn, dialect = db
+    old = NOW - timedelta(days=200)
+    insert(conn, old, score=100)
+    report = retention.rollup(conn, dialect, NOW)
+    # Lands between the rollup and the DELETE
+    insert(conn, old + timedelta(minutes=5), score=120)
+    out = retention.compact(conn, dialect, NOW - timedelta(days=90), NOW - timedelta(days=400),
+                            report['last_signal_id'])
+    assert out['rows_deleted'] == 1
+    assert conn.execute("SELECT total_score FROM signals").fetchall() == [(120,)]
+    # The next run rolls it up as a late row, then compacts it
+    report = retention.run_retention(conn, dialect, now=NOW + timedelta(hours=1))
+    assert report['late_rows'] == 1 and report['rows_deleted'] == 1
+    assert rolled(conn, 'hour') == rolled(conn, 'day') == (2, 220, 120)
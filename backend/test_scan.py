@@ -0,0 +1,139 @@
+"""
+🥓 Scan tests
+What a scan publishes against a read-only look at the same symbols, delta
+scanning (fingerprint reuse, closed-market short-circuit) on replayed
+synthetic bars, and what the 15m scanner stores. Run from backend/:
+python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from fixtures import synthetic_universe  # noqa: E402
+
+import confluences  # noqa: E402
+import main  # noqa: E402
+from bacon_scanner_complete import BaconScanner  # noqa: E402
+import snapshot  # noqa: E402
+from market_data import ReplayProvider, get_provider, set_provider  # noqa: E402
+
+
+@pytest.fixture
+def scan(monkeypatch):
+    """Replayed universe where every analyzed symbol grades ULTRA; records what leaves"""
+    frames = synthetic_universe(8, '1d', n_bars=100, seed=5)
+    symbols = [symbol for symbol, _ in frames]
+    previous = get_provider()
+    set_provider(ReplayProvider(frames=frames))
+    monkeypatch.setattr('feature_store.get_store', lambda: None)
+    monkeypatch.setattr(confluences, 'score', lambda mask: 7)
+    sent = {'discord': [], 'pushed': [], 'upserted': [], 'offered': []}
+    monkeypatch.setattr(main, 'send_discord_webhook', sent['discord'].append)
+    monkeypatch.setattr(main.PUSHER, 'push_signal', sent['pushed'].append)
+    monkeypatch.setattr(snapshot.STORE, 'upsert', sent['upserted'].append)
+    monkeypatch.setattr(main.TOP, 'offer', lambda symbol, item: sent['offered'].append(symbol))
+    main.reset_delta_cache()
+    yield symbols, sent
+    main.reset_delta_cache()
+    set_provider(previous)
+
+
+def test_read_only_paths_publish_nothing(scan):
+    symbols, sent = scan
+    stats = dict(main.SYMBOL_STATS)
+    result = main.analyze_symbol(symbols[0])
+    assert result is not None and "ULTRA" in result.signal
+    assert sent == {'discord': [], 'pushed': [], 'upserted': [], 'offered': []}
+    assert main.SYMBOL_STATS == stats
+    # The next real scan still publishes it
+    results, reused = main.analyze_symbols(symbols[:1])
+    assert reused == 0 and len(results) == 1
+    assert len(sent['discord']) == len(sent['pushed']) == len(sent['upserted']) == 1
+
+
+def test_strategy_scan_sends_no_discord(scan):
+    symbols, sent = scan
+    out = main.strategies.PLANE.scan(symbols[:3], [main.DailyConfluenceStrategy.name])
+    assert out.results[main.DailyConfluenceStrategy.name]
+    assert sent['discord'] == []
+
+
+@pytest.fixture
+def delta(scan, monkeypatch):
+    """Counts fetches and preparations; market_open drives has_new_bars"""
+    symbols, sent = scan
+    calls = {'fetched': [], 'prepared': [], 'market_open': True, 'bars': {}}
+    fetch, prepare = main.fetch_bars, main.prepare_symbol
+
+    def fetch_bars(symbol):
+        calls['fetched'].append(symbol)
+        return calls['bars'].get(symbol, fetch(symbol))
+
+    def prepare_symbol(symbol, df=None, bars=None):
+        calls['prepared'].append(symbol)
+        return prepare(symbol, df, bars)
+
+    monkeypatch.setattr(main, 'fetch_bars', fetch_bars)
+    monkeypatch.setattr(main, 'prepare_symbol', prepare_symbol)
+    monkeypatch.setattr(main, 'calendar_for', lambda market: SimpleNamespace(
+        has_new_bars=lambda since: calls['market_open']))
+    return symbols, calls
+
+
+def test_unchanged_bars_reuse_the_previous_result(delta):
+    symbols, calls = delta
+    first, reused = main.analyze_symbols(symbols)
+    assert reused == 0 and calls['prepared'] == symbols
+    calls['prepared'].clear()
+    again, reused = main.analyze_symbols(symbols)
+    assert reused == len(symbols) and calls['prepared'] == []
+    assert len(calls['fetched']) == 2 * len(symbols)
+    assert [r.symbol for r in again] == [r.symbol for r in first]
+
+
+def test_a_changed_last_bar_is_recomputed(delta):
+    symbols, calls = delta
+    main.analyze_symbols(symbols)
+    calls['prepared'].clear()
+    df = main.fetch_bars(symbols[2]).copy()
+    df.iloc[-1, df.columns.get_loc('Close')] *= 1.01
+    calls['bars'][symbols[2]] = df
+    _, reused = main.analyze_symbols(symbols)
+    assert reused == len(symbols) - 1 and calls['prepared'] == [symbols[2]]
+    # After reset_delta_cache everything is recomputed
+    main.reset_delta_cache()
+    calls['prepared'].clear()
+    assert main.analyze_symbols(symbols)[1] == 0 and calls['prepared'] == symbols
+
+
+def test_closed_market_is_not_fetched(delta):
+    symbols, calls = delta
+    first, _ = main.analyze_symbols(symbols)
+    calls['fetched'].clear()
+    calls['market_open'] = False
+    again, reused = main.analyze_symbols(symbols)
+    assert calls['fetched'] == [] and reused == len(symbols)
+    assert again == first
+    # Symbols never scanned are still fetched
+    main.reset_delta_cache()
+    main.analyze_symbols(symbols[:1])
+    assert calls['fetched'] == symbols[:1]
+
+
+def test_bacon15m_scan_stores_its_signals(monkeypatch):
+    saved = []
+
+    class Database:
+        async def save_signal(self, signal, scanner='bacon15m'):
+            saved.append((signal['symbol'], scanner))
+
+    scanner = BaconScanner(database=Database())
+    scores = {'AAPL': 160, 'TSLA': None, 'SPY': 200}
+    monkeypatch.setattr(scanner, 'scan_symbol', lambda symbol: scores[symbol] and
+                        {'symbol': symbol, 'total_score': scores[symbol]})
+    assert [s['symbol'] for s in scanner.scan(list(scores))] == ['SPY', 'AAPL']
+    assert saved == [('SPY', 'bacon15m'), ('AAPL', 'bacon15m')]
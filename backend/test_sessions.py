@@ -0,0 +1,97 @@
+"""
+🥓 Sessions tests
+Holiday rules on known exchange calendars, session bounds, has_new_bars
+and the session scheduler. Run from backend/: python -m pytest -q
+"""
+
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+import pytest
+
+from sessions import (CME_GLOBEX, CRYPTO_24_7, ET, NYSE, TSX, SessionScheduler, easter,
+                      nyse_exceptions, tsx_exceptions)
+
+
+def et(*args) -> datetime:
+    return datetime(*args, tzinfo=ET)
+
+
+def closed(exceptions) -> set:
+    return {day for day, close in exceptions.items() if close is None}
+
+
+def test_easter():
+    assert [easter(y) for y in (2024, 2025, 2026)] == \
+        [date(2024, 3, 31), date(2025, 4, 20), date(2026, 4, 5)]
+
+
+def test_nyse_2025():
+    assert closed(nyse_exceptions(2025)) == {
+        date(2025, 1, 1), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+        date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1),
+        date(2025, 11, 27), date(2025, 12, 25)}
+    early = {day for day, close in nyse_exceptions(2025).items() if close == dtime(13, 0)}
+    assert early == {date(2025, 7, 3), date(2025, 11, 28), date(2025, 12, 24)}
+
+
+def test_nyse_observed_days():
+    # New Year 2022 on a Saturday: Dec 31 2021 stays a trading day
+    assert NYSE.session(date(2021, 12, 31)) is not None
+    assert not any(d.month == 1 and d.day <= 3 for d in nyse_exceptions(2022))
+    # Juneteenth 2022 on a Sunday -> Monday; July 4 2026 on a Saturday -> Friday
+    assert date(2022, 6, 20) in closed(nyse_exceptions(2022))
+    assert nyse_exceptions(2026)[date(2026, 7, 3)] is None
+    # Juneteenth only from 2022
+    assert date(2021, 6, 18) not in nyse_exceptions(2021)
+
+
+def test_tsx_holidays():
+    days = closed(tsx_exceptions(2025))
+    assert {date(2025, 2, 17), date(2025, 5, 19), date(2025, 7, 1), date(2025, 8, 4),
+            date(2025, 10, 13), date(2025, 12, 25), date(2025, 12, 26)} <= days
+    # Victoria Day is the Monday before May 25, even when the 25th is a Monday
+    assert date(2020, 5, 18) in closed(tsx_exceptions(2020))
+    # Christmas and Boxing Day on a weekend -> Monday and Tuesday
+    assert {date(2021, 12, 27), date(2021, 12, 28)} <= closed(tsx_exceptions(2021))
+    assert TSX.session(date(2025, 12, 24))[1] == et(2025, 12, 24, 13, 0)
+
+
+def test_session_bounds():
+    # DST is applied per day
+    assert NYSE.session(date(2025, 3, 7))[0] == datetime(2025, 3, 7, 14, 30, tzinfo=timezone.utc)
+    assert NYSE.session(date(2025, 3, 10))[0] == datetime(2025, 3, 10, 13, 30, tzinfo=timezone.utc)
+    assert NYSE.session(date(2025, 3, 8)) is None
+    # Globex: Monday's session opens Sunday evening
+    assert CME_GLOBEX.session(date(2025, 1, 6)) == (et(2025, 1, 5, 18, 0), et(2025, 1, 6, 17, 0))
+    assert CME_GLOBEX.is_open(et(2025, 1, 5, 19, 0))
+    assert CME_GLOBEX.session(date(2025, 12, 25)) is None
+    assert CME_GLOBEX.session(date(2025, 1, 20))[1] == et(2025, 1, 20, 13, 0)
+    assert CRYPTO_24_7.is_open(et(2025, 12, 25, 3, 0))
+
+
+@pytest.mark.parametrize("since, now, expected", [
+    (None, et(2025, 1, 4, 12), True),                        # never fetched
+    (et(2025, 1, 3, 16, 30), et(2025, 1, 4, 12), False),     # weekend after the close
+    (et(2025, 1, 3, 15, 0), et(2025, 1, 4, 12), True),       # the close settled the bar
+    (et(2025, 1, 6, 10, 0), et(2025, 1, 6, 10, 5), True),    # session open
+    (et(2025, 12, 24, 13, 5), et(2025, 12, 25, 12), False),  # early close, then a holiday
+])
+def test_nyse_has_new_bars(since, now, expected):
+    assert NYSE.has_new_bars(since, now) is expected
+
+
+def test_scheduler_skips_closed_markets():
+    scheduler = SessionScheduler(['us', 'crypto'], cadence={'us': 300, 'crypto': 600})
+    saturday = et(2025, 1, 4, 12)
+    assert scheduler.due(saturday) == ['us', 'crypto']
+    for market in ('us', 'crypto'):
+        scheduler.mark_ran(market, saturday)
+    assert scheduler.due(saturday + timedelta(seconds=599)) == []
+    assert scheduler.due(saturday + timedelta(seconds=600)) == ['crypto']
+    # us wakes at Monday's open, crypto after its cadence
+    assert scheduler.next_wake(saturday) == saturday + timedelta(seconds=600)
+    scheduler.mark_ran('crypto', saturday + timedelta(days=2))
+    assert scheduler.next_wake(saturday + timedelta(days=1)) == et(2025, 1, 6, 9, 30)
+    status = scheduler.status(saturday)
+    assert not status['us']['open'] and status['crypto']['open']
+    assert datetime.fromisoformat(status['us']['next_open']) == et(2025, 1, 6, 9, 30)
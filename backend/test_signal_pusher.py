@@ -0,0 +1,109 @@
+"""
+🥓 Signal pusher tests
+Coalescing, the bounded buffer, batching, retry with backoff and
+close/flush, against in-memory sinks. Run from backend/: python -m pytest -q
+"""
+
+import json
+
+import numpy as np
+
+from bacon_signal_pusher import BaconSignalPusher, FileSink, PushError, SignalSink
+
+
+class Recorder(SignalSink):
+    name = "recorder"
+
+    def __init__(self, failures=()):
+        self.batches = []
+        self.calls = 0
+        self.closed = False
+        self.failures = list(failures)   # exceptions raised by the first calls
+
+    async def send(self, batch):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        self.batches.append([(s['symbol'], s.get('entry')) for s in batch])
+
+    async def close(self):
+        self.closed = True
+
+
+def pusher(*sinks, **kwargs) -> BaconSignalPusher:
+    kwargs.setdefault('window', 0.05)
+    kwargs.setdefault('backoff', 0.001)
+    return BaconSignalPusher(sinks=list(sinks), **kwargs)
+
+
+def test_newer_signal_replaces_the_queued_one():
+    sink = Recorder()
+    p = pusher(sink, window=0.5)
+    assert p.push_signal({'symbol': 'TSLA', 'entry': 1})
+    assert p.push_signal({'symbol': 'AAPL', 'entry': 2})
+    assert p.push_signal({'symbol': 'TSLA', 'entry': 3})
+    # Another timeframe is another signal
+    assert p.push_signal({'symbol': 'TSLA', 'timeframe': '15m', 'entry': 4})
+    assert p.stats()['queued'] == 3 and p.coalesced == 1
+    assert p.flush()
+    assert sink.batches == [[('TSLA', 3), ('AAPL', 2), ('TSLA', 4)]]
+    p.close()
+
+
+def test_full_buffer_drops_new_symbols_only():
+    sink = Recorder()
+    p = pusher(sink, max_queue=2, window=0.5)
+    assert p.push_multiple_signals([{'symbol': s} for s in ('A', 'B', 'C')]) == 2
+    assert p.push_signal({'symbol': 'A', 'entry': 9})   # still coalesces
+    assert not p.push_signal({'entry': 1})              # no symbol
+    assert p.dropped == 1 and p.stats()['queued'] == 2
+    p.flush()
+    assert sink.batches == [[('A', 9), ('B', None)]]
+    p.close()
+
+
+def test_batches_and_close_delivers_everything():
+    sink = Recorder()
+    p = pusher(sink, batch_size=2)
+    p.push_multiple_signals([{'symbol': f"S{i}"} for i in range(5)])
+    p.close()
+    assert [len(batch) for batch in sink.batches] == [2, 2, 1]
+    assert sink.closed and not p.push_signal({'symbol': 'LATE'})
+    assert p.stats()['pushed'] == 5 and not p.stats()['running']
+
+
+def test_retry_with_backoff_then_deliver():
+    sink = Recorder(failures=[PushError("HTTP 503"), ConnectionError("reset")])
+    p = pusher(sink, retries=3)
+    p.push_signal({'symbol': 'TSLA'})
+    p.close()
+    assert sink.calls == 3 and sink.batches == [[('TSLA', None)]] and p.failed == 0
+
+
+def test_give_up_after_retries_or_on_a_client_error():
+    flaky = Recorder(failures=[PushError("HTTP 503")] * 5)
+    rejected = Recorder(failures=[PushError("HTTP 400", retry=False)])
+    healthy = Recorder()
+    p = pusher(flaky, rejected, healthy, retries=2)
+    p.push_multiple_signals([{'symbol': 'A'}, {'symbol': 'B'}])
+    p.close()
+    assert flaky.calls == 3 and rejected.calls == 1
+    assert flaky.batches == rejected.batches == []
+    # One sink failing does not hold back the others
+    assert healthy.batches == [[('A', None), ('B', None)]]
+    assert p.failed == 4
+
+
+def test_flush_and_close_without_a_loop():
+    p = pusher(Recorder())
+    assert p.flush() and p.stats()['running'] is False
+    p.close()
+
+
+def test_file_sink_writes_json_lines(tmp_path):
+    path = tmp_path / 'signals.jsonl'
+    p = pusher(FileSink(str(path)))
+    p.push_signal({'symbol': 'TSLA', 'entry': np.float64(312.5), 'score': np.int64(7)})
+    p.close()
+    line = json.loads(path.read_text())
+    assert (line['symbol'], line['entry'], line['score'], line['type']) == ('TSLA', 312.5, 7, 'signal')
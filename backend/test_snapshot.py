@@ -0,0 +1,114 @@
+"""
+🥓 Snapshot tests
+Screen masks and argpartition top-k against plain Python over the same
+rows, and rows leaving with their symbols. Run from backend/: python -m pytest -q
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+import confluences as cc
+import main
+import snapshot
+from snapshot import Snapshot, SnapshotStore
+
+CODES = [cc.RSI_OVERSOLD, cc.VOLUME_EXPLOSION, cc.ML_BUY, cc.BREAKOUT]
+
+
+def rows(n: int = 300, seed: int = 0):
+    rng = random.Random(seed)
+    return [{
+        'symbol': f"S{i:03d}",
+        'market': rng.choice(['us', 'ca', 'crypto']),
+        'signal': rng.choice([None, '✅ MEDIUM SIGNAL']),
+        'rsi': None if i % 17 == 0 else rng.uniform(0, 100),
+        'volume_ratio': rng.uniform(0, 4),
+        'confluence_count': rng.randint(0, 6),
+        'confluence_mask': sum(code for code in CODES if rng.random() < 0.4),
+    } for i in range(n)]
+
+
+def matches(row, rsi_lt=None, market=None, all_of=0, any_of=0, none_of=0):
+    if rsi_lt is not None and (row['rsi'] is None or not row['rsi'] < rsi_lt):
+        return False
+    if market is not None and row['market'] not in market:
+        return False
+    mask = row['confluence_mask']
+    return (mask & all_of) == all_of and (not any_of or mask & any_of) and not mask & none_of
+
+
+def test_mask_equals_a_python_filter():
+    data = rows()
+    snap = Snapshot.from_rows(data)
+    cases = [
+        ({'rsi_lt': '30'}, dict(rsi_lt=30)),
+        ({'market': 'us,crypto', 'rsi_lt': '50'}, dict(market={'us', 'crypto'}, rsi_lt=50)),
+        ({'confluences': 'RSI_OVERSOLD,ML_BUY'}, dict(all_of=cc.RSI_OVERSOLD | cc.ML_BUY)),
+        ({'confluences_any': 'BREAKOUT,ML_BUY'}, dict(any_of=cc.BREAKOUT | cc.ML_BUY)),
+        ({'confluences_none': 'VOLUME_EXPLOSION', 'market': 'ca'},
+         dict(none_of=cc.VOLUME_EXPLOSION, market={'ca'})),
+    ]
+    for filters, expected in cases:
+        got = snap.columns['symbol'][snap.mask(filters)].tolist()
+        assert got == [r['symbol'] for r in data if matches(r, **expected)], filters
+
+
+def test_bad_filters():
+    snap = Snapshot.from_rows(rows(5))
+    for filters in ({'rsi_about': '3'}, {'colour_lt': '3'}, {'rsi_lt': 'low'},
+                    {'confluences': 'NOT_A_CODE'}):
+        with pytest.raises(ValueError):
+            snap.mask(filters)
+    with pytest.raises(ValueError):
+        snap.top(np.arange(5), 'market', 3)
+
+
+@pytest.mark.parametrize("sort", ['rsi', '-rsi', '-volume_ratio'])
+@pytest.mark.parametrize("limit", [1, 10, 500])
+def test_top_equals_a_stable_sort(sort, limit):
+    data = rows()
+    snap = Snapshot.from_rows(data)
+    index = np.flatnonzero(snap.mask({'market': 'us,ca'}))
+    field, sign = sort.lstrip('-'), -1 if sort.startswith('-') else 1
+    # Missing values last, ties in row order
+    expected = sorted(index, key=lambda i: (data[i][field] is None,
+                                            0 if data[i][field] is None else sign * data[i][field], i))
+    assert snap.top(index, sort, limit).tolist() == expected[:limit]
+
+
+def test_screen_rows_and_limit():
+    snap = Snapshot.from_rows(rows())
+    out = snap.screen({'rsi_lt': '40'}, sort='-confluence_count', limit=10_000)
+    assert out['matched'] == int(snap.mask({'rsi_lt': '40'}).sum())
+    assert len(out['results']) == min(out['matched'], snapshot.MAX_LIMIT)
+    counts = [r['confluence_count'] for r in out['results']]
+    assert counts == sorted(counts, reverse=True)
+    missing = Snapshot.from_rows(rows()[:1]).rows([0])[0]
+    assert missing['rsi'] is None and not math.isnan(missing['volume_ratio'])
+
+
+def test_retain_drops_symbols_that_left():
+    store = SnapshotStore()
+    for row in rows(4):
+        store.upsert(row)
+    assert store.retain(['S000', 'S002', 'OTHER']) == 2
+    assert store.publish().columns['symbol'].tolist() == ['S000', 'S002']
+
+
+def test_unwatched_symbols_leave_the_snapshot_and_top_board(monkeypatch):
+    store = SnapshotStore()
+    board = main.TopKBoard(5, key=lambda item: item, market_of=main.market_of)
+    monkeypatch.setattr(snapshot, 'STORE', store)
+    monkeypatch.setattr(main, 'TOP', board)
+    builtin = main.markets.all_symbols()[0]
+    for symbol in (builtin, 'WATCHED', 'DROPPED'):
+        store.upsert({'symbol': symbol})
+        board.offer(symbol, 1)
+    monkeypatch.setattr(main.WATCHLISTS, 'union', lambda: ['WATCHED'])
+    main.retire_symbols()
+    assert sorted(store.publish().columns['symbol']) == sorted([builtin, 'WATCHED'])
+    board.publish()
+    assert len(board.top(5)) == 2
@@ -0,0 +1,60 @@
+"""
+🥓 Sweep tests
+Resuming from the results table, pool results against an in-process
+backtest, and the search space helpers. Run from backend/: python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from fixtures import synthetic_ohlcv, synthetic_universe  # noqa: E402
+
+import sweep  # noqa: E402
+from backtest import BacktestParams, BarPanel, compute_indicators, simulate  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def panel():
+    frames = synthetic_universe(3, '15m', n_bars=400, seed=2)
+    return BarPanel.from_frames({symbol: df for (symbol, _), df in frames.items()})
+
+
+def test_interrupted_sweep_resumes(panel, tmp_path, capsys):
+    path = tmp_path / 'q1.db'
+    candidates = [BacktestParams(min_score=score) for score in (60, 80, 100)]
+    sweep.sweep(panel, candidates[:2], path, workers=1, min_trades=0)
+    assert '2 to run' in capsys.readouterr().out
+
+    db = sweep.open_results(path, sweep.data_fingerprint(panel))
+    assert sweep.done_keys(db) == {sweep.params_key(p) for p in candidates[:2]}
+    board = sweep.sweep(panel, candidates, path, workers=1, min_trades=0)
+    assert '2 done, 1 to run' in capsys.readouterr().out
+    assert len(sweep.done_keys(db)) == 3 and len(board) == 3
+
+    # Pool results equal an in-process backtest of the same parameters
+    indicators = compute_indicators(panel)
+    expected = {p.min_score: simulate(panel, indicators, p).summary() for p in candidates}
+    assert expected[60]['trades'] > 0
+    for row in board:
+        summary = expected[row['min_score']]
+        assert {c: row[c] for c in summary} == pytest.approx(summary)
+
+
+def test_results_table_is_bound_to_its_bars(panel, tmp_path):
+    path = tmp_path / 'q1.db'
+    sweep.open_results(path, sweep.data_fingerprint(panel)).close()
+    other = BarPanel.from_frames({'X': synthetic_ohlcv(100, '15m', seed=9)})
+    with pytest.raises(ValueError):
+        sweep.open_results(path, sweep.data_fingerprint(other))
+
+
+def test_search_space():
+    space = {'min_score': [140, 150], 'stop_atr': [1.0, 2.0], 'vol_mid': [1.5]}
+    assert len(sweep.grid(space)) == 4
+    draws = sweep.random_search({'min_score': (100, 200), 'stop_atr': (0.5, 2.0)}, 20, seed=1)
+    assert len(set(draws)) == 20
+    assert all(100 <= p.min_score <= 200 and 0.5 <= p.stop_atr <= 2.0 for p in draws)
+    assert all(isinstance(p.min_score, int) for p in draws)
@@ -0,0 +1,93 @@
+"""
+🥓 Top-K tests
+Bounded heaps against a stable sort, per-market boards, and when
+/api/top rescans. Run from backend/: python -m pytest -q
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from markets import MARKETS, market_of
+from topk import TopK, TopKBoard
+
+
+def test_topk_equals_a_stable_sort():
+    rng = random.Random(1)
+    items = [(rng.randint(0, 20), i) for i in range(500)]
+    for k in (0, 1, 7, 500, 900):
+        top = TopK(k, key=lambda item: item[0]).extend(items)
+        assert top.sorted() == sorted(items, key=lambda item: item[0], reverse=True)[:k]
+        assert len(top) == min(k, len(items))
+
+
+def test_board_keeps_the_latest_result_per_symbol():
+    us, crypto = MARKETS['us'][:3], MARKETS['crypto'][:2]
+    board = TopKBoard(2, key=lambda item: item, market_of=market_of)
+    for score, symbol in enumerate(us + crypto):
+        board.offer(symbol, score)
+    board.offer(us[2], None)   # no longer a signal
+    board.offer(us[0], 10)     # newer result replaces the old one
+    board.publish(us + crypto)
+    assert board.top(5) == [10, 4]
+    assert board.top(5, 'us') == [10, 1]
+    assert board.top(1, 'crypto') == [4]
+    assert board.top(-1) == []
+
+
+def test_scanned_market_without_signals_gets_an_empty_board():
+    board = TopKBoard(5, key=lambda item: item, market_of=market_of)
+    assert board.scanned_at('ca') is None
+    board.publish(MARKETS['ca'][:3])
+    assert board.top(5, 'ca') == [] and board.scanned_at('ca') is not None
+    assert board.scanned_at('us') is None
+
+
+@pytest.fixture
+def top_endpoint(monkeypatch):
+    """/api/top over a fresh board; scans offer one signal per crypto symbol"""
+    board = TopKBoard(main.TOP_K, key=lambda r: r.confluence_count, market_of=market_of)
+    scans = []
+
+    def run_scan(symbols):
+        scans.append(sorted({market_of(s) for s in symbols}))
+        for i, symbol in enumerate(symbols):
+            row = SimpleNamespace(confluence_count=i, confluence_mask=0,
+                                  to_dict=lambda labels, symbol=symbol: {'symbol': symbol})
+            board.offer(symbol, row if market_of(symbol) == 'crypto' else None)
+        board.publish(symbols)
+
+    monkeypatch.setattr(main, 'TOP', board)
+    monkeypatch.setattr(main, 'run_scan', run_scan)
+    return TestClient(main.app), board, scans
+
+
+def test_top_scans_each_market_once_within_its_cadence(top_endpoint):
+    client, board, scans = top_endpoint
+    assert len(client.get('/api/top/5?market=crypto').json()['top_signals']) == 5
+    assert client.get('/api/top/5?market=us').json()['top_signals'] == []
+    client.get('/api/top/5?market=us')
+    assert scans == [['crypto'], ['us']]
+    # Without a market, only the markets not scanned yet
+    client.get('/api/top/5')
+    assert scans[-1] == sorted(set(MARKETS) - {'crypto', 'us'})
+    client.get('/api/top/5')
+    assert len(scans) == 3
+
+
+def test_top_rescans_a_board_older_than_the_cadence(top_endpoint):
+    client, board, scans = top_endpoint
+    client.get('/api/top/5?market=crypto')
+    board._scanned_at['crypto'] -= main.SCHEDULER.cadence['crypto'] + 1
+    client.get('/api/top/5?market=crypto')
+    client.get('/api/top/5?market=crypto&refresh=true')
+    assert scans == [['crypto']] * 3
+
+
+def test_top_count_is_clamped(top_endpoint):
+    client, board, scans = top_endpoint
+    assert len(client.get(f'/api/top/{main.TOP_K + 50}?market=crypto').json()['top_signals']) == \
+        min(main.TOP_K, len(MARKETS['crypto']))
@@ -0,0 +1,114 @@
+"""
+🥓 Volume profile tests
+Batch histograms against a per-bar loop, incremental updates against a
+fresh build over the same window. Run from backend/: python -m pytest -q
+"""
+
+import numpy as np
+import pandas as pd
+
+import confluences
+import main
+import volume_profile as vp
+
+
+def trending(seed: int, n_bars: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    trend = np.linspace(0, (seed % 7 - 3) * 0.3, n_bars)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)) + trend)
+    spread = np.abs(rng.normal(0, 0.02, n_bars)) * close
+    return pd.DataFrame({
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.lognormal(13, 0.5, n_bars).astype(np.int64),
+    }, index=pd.date_range(end='2025-01-03', periods=n_bars, freq='B', tz='UTC'))
+
+
+def same(a: vp.Profile, b: vp.Profile) -> bool:
+    return (np.isclose(a.poc, b.poc) and np.isclose(a.vah, b.vah) and np.isclose(a.val, b.val)
+            and np.allclose(a.hvn, b.hvn) and np.allclose(a.lvn, b.lvn)
+            and np.isclose(a.total_volume, b.total_volume) and a.bin_width == b.bin_width)
+
+
+def test_histogram_matches_per_bar_loop():
+    df = trending(1, 120)
+    profile = vp.ProfileEngine(lookback=120).histograms({'X': df})['X']
+    expected = np.zeros(len(profile.volume))
+    for high, low, volume in zip(df['High'], df['Low'], df['Volume']):
+        first = int(np.floor(low / profile.width)) - profile.base
+        last = int(np.floor(high / profile.width)) - profile.base
+        expected[first:last + 1] += volume / (last - first + 1)
+    assert np.allclose(profile.volume, expected)
+    assert len(profile.volume) <= vp.BINS + 1
+    assert np.isclose(profile.volume.sum(), df['Volume'].sum())
+
+
+def test_poc_and_value_area():
+    df = trending(2, 120)
+    engine = vp.ProfileEngine(lookback=120)
+    profile = engine.profiles({'X': df})['X']
+    histogram = engine.histograms({'X': df})['X']
+    volume = histogram.volume
+    assert np.isclose(profile.poc, histogram.origin + (volume.argmax() + 0.5) * histogram.width)
+    lower = histogram.origin + np.arange(len(volume)) * histogram.width
+    inside = (lower >= profile.val - 1e-9) & (lower + histogram.width <= profile.vah + 1e-9)
+    assert volume[inside].sum() >= vp.VALUE_AREA * volume.sum()
+    assert profile.val <= profile.poc <= profile.vah
+
+
+def test_incremental_equals_rebuild_over_a_long_run():
+    # 63-bar windows slid over 137 new bars on trending symbols: the grid
+    # must follow the window instead of the first build's range
+    frames = {f"T{i}": trending(i) for i in range(30)}
+    engine = vp.ProfileEngine(lookback=63)
+    for n in range(63, 201):
+        incremental = engine.profiles({s: df.iloc[:n] for s, df in frames.items()})
+    rebuilt = vp.ProfileEngine(lookback=63).profiles(frames)
+    assert engine.updated > 0 and engine.rebinned > 0
+    assert max(len(p.volume) for p in engine._cache.values()) <= vp.BINS + 1
+    for symbol, df in frames.items():
+        assert same(incremental[symbol], rebuilt[symbol]), symbol
+        price = float(df['Close'].iloc[-1])
+        a, b = incremental[symbol], rebuilt[symbol]
+        assert confluences.detect_profile(price, a.poc, a.vah, a.hvn) == \
+            confluences.detect_profile(price, b.poc, b.vah, b.hvn)
+
+
+def test_last_bar_updated_in_place():
+    df = trending(3, 100)
+    engine = vp.ProfileEngine(lookback=60)
+    engine.profiles({'X': df})
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc('Volume')] *= 3
+    changed.iloc[-1, changed.columns.get_loc('High')] *= 1.05
+    assert same(engine.profiles({'X': changed})['X'], vp.ProfileEngine(lookback=60).profiles({'X': changed})['X'])
+    assert engine.built == 1
+
+
+def test_missing_bars_are_skipped():
+    df = trending(4, 80)
+    gappy = df.copy()
+    gappy.iloc[-5] = np.nan
+    profile = vp.ProfileEngine(lookback=80).profiles({'X': gappy})['X']
+    assert np.isclose(profile.total_volume, df['Volume'].drop(df.index[-5]).sum())
+
+
+def test_profile_confluences_are_not_scored():
+    mask = confluences.detect_profile(110.0, poc=100.0, vah=105.0, hvn=(108.0,))
+    assert mask == confluences.ABOVE_VALUE_AREA | confluences.HVN_SUPPORT
+    assert confluences.score(mask | confluences.RSI_OVERSOLD) == 1
+    assert confluences.detect_profile(102.0, poc=100.0, vah=105.0, hvn=(90.0,)) == confluences.ABOVE_POC
+
+
+def test_profile_labels_are_a_separate_field():
+    mask = confluences.RSI_OVERSOLD | confluences.VOLUME_EXPLOSION | confluences.ABOVE_POC
+    row = main.ScanRow(symbol='X', price=100.0, signal='✅ MEDIUM SIGNAL', rsi=25.0, volume=1,
+                       volume_ratio=3.0, change_1d=0.0, change_5d=0.0, avwap_5d=None,
+                       avwap_13d=None, avwap_21d=None, confluence_mask=mask,
+                       confluence_params=(25.0, 3.0), confluence_count=confluences.score(mask))
+    out = row.to_model().model_dump()
+    assert len(out['confluences']) == out['confluence_count'] == 2
+    assert out['profile_confluences'] == [confluences.LABELS[confluences.ABOVE_POC]]
+    scored = {c['name']: c['scored'] for c in confluences.code_table()}
+    assert not scored['ABOVE_POC'] and scored['RSI_OVERSOLD']
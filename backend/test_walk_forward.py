@@ -0,0 +1,47 @@
+"""
+🥓 Walk-forward tests
+Folds whose training window holds a single class are skipped instead of
+aborting the pool. Run from backend/: python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+from fixtures import synthetic_ohlcv  # noqa: E402
+
+pytest.importorskip('sklearn')
+
+from feature_store import FeatureStore  # noqa: E402
+from walk_forward import make_folds, run_fold, walk_forward  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeatureStore(str(tmp_path / 'features'))
+    store.update('AAPL', synthetic_ohlcv(400, seed=1))
+    return store
+
+
+def folds_of(store):
+    ts, _ = store.read('AAPL', [])
+    return make_folds(ts[0], ts[-1], train_days=200, test_days=60)
+
+
+def test_single_class_fold_is_skipped(store, tmp_path):
+    # Every forward return beats -1000%: the training labels are all 1
+    params = {'horizon': 5, 'target': -1000.0, 'n_estimators': 10}
+    folds = folds_of(store)
+    with pytest.raises(ValueError, match='single class'):
+        run_fold(folds[0], str(store.root), {'us': ['AAPL']}, params)
+    reports = walk_forward(folds, store, ['AAPL'], params['horizon'], params['target'],
+                           params['n_estimators'], workers=1, cache_dir=tmp_path / 'cache')
+    assert reports == []
+
+
+def test_two_class_fold_is_scored(store):
+    report = run_fold(folds_of(store)[0], str(store.root), {'us': ['AAPL']},
+                      {'horizon': 5, 'target': 0.0, 'n_estimators': 10})
+    assert report['train_rows'] > 0 and report['overall']['rows'] > 0
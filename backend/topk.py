@@ -0,0 +1,108 @@
+"""
+🥓 Streaming Top-K
+Bounded heaps that keep the best K results as they arrive, overall and per
+market, so top queries never sort the full result list.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """
+    The k largest items by key, in O(log k) per push. Ties keep the item
+    that arrived first, like a stable sort would.
+    """
+
+    def __init__(self, k: int, key: Callable[[T], Any] = lambda item: item):
+        self.k = k
+        self.key = key
+        self._heap: List[tuple] = []   # min-heap of (key, -seq, item)
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item: T) -> bool:
+        """Offer an item; True if it made the cut"""
+        if self.k <= 0:
+            return False
+        entry = (self.key(item), -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def extend(self, items) -> "TopK[T]":
+        for item in items:
+            self.push(item)
+        return self
+
+    def sorted(self) -> List[T]:
+        """Best first (O(k log k))"""
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+class TopKBoard:
+    """
+    Latest result per symbol plus published top-K lists ('all' and one per
+    market). publish() costs O(n log k); top() is a slice of a pre-sorted
+    list, O(count). scanned_at() tells how old a market's board is.
+    """
+
+    def __init__(self, k: int, key: Callable[[Any], Any], market_of: Callable[[str], str]):
+        self.k = k
+        self.key = key
+        self.market_of = market_of
+        self._latest: Dict[str, Any] = {}
+        self._markets = set()   # every market offered, signal or not
+        self._scanned_at: Dict[str, float] = {}
+        self._published: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    def offer(self, symbol: str, item: Optional[Any]):
+        """Record the latest result of a symbol (None = no longer a signal)"""
+        with self._lock:
+            self._markets.add(self.market_of(symbol))
+            if item is None:
+                self._latest.pop(symbol, None)
+            else:
+                self._latest[symbol] = item
+
+    def retain(self, symbols: Iterable[str]):
+        """Forget the results of symbols that left the universe"""
+        keep = set(symbols)
+        with self._lock:
+            for symbol in [s for s in self._latest if s not in keep]:
+                del self._latest[symbol]
+
+    def publish(self, scanned: Iterable[str] = ()):
+        """Rebuild the boards; scanned = symbols the scan looked at (reused ones included)"""
+        now = time.time()
+        with self._lock:
+            for market in {self.market_of(symbol) for symbol in scanned}:
+                self._markets.add(market)
+                self._scanned_at[market] = now
+            latest = list(self._latest.items())
+            markets = list(self._markets)
+        # A scanned market without signals still gets its (empty) board
+        boards: Dict[str, TopK] = {market: TopK(self.k, self.key) for market in ['all'] + markets}
+        for symbol, item in latest:
+            boards['all'].push(item)
+            boards[self.market_of(symbol)].push(item)
+        self._published = {market: board.sorted() for market, board in boards.items()}
+
+    def scanned_at(self, market: str) -> Optional[float]:
+        """Epoch seconds of the last published scan of the market, None if never"""
+        return self._scanned_at.get(market)
+
+    def top(self, count: int, market: Optional[str] = None) -> List:
+        return self._published.get(market or 'all', [])[:max(count, 0)]
@@ -0,0 +1,378 @@
+"""
+🥓 Volume Profile
+Volume by price for a whole universe at once, plus incremental updates as
+bars are appended.
+
+Each bar's volume is spread evenly over the price bins its low-high range
+covers. For a batch, every (symbol, bin) pair gets a flat id and a single
+np.bincount builds all the histograms. Each histogram is then summarized:
+    poc       centre of the highest-volume bin (point of control)
+    vah / val top / bottom of the value area: the highest-volume bins
+              holding value_area (70%) of the volume
+    hvn / lvn high / low volume nodes: peaks and troughs of the 3-bin
+              smoothed histogram, above hvn_ratio / below lvn_ratio
+              times the mean traded bin
+
+Bins sit on a fixed lattice: bin i covers [i * width, (i + 1) * width),
+and width is the smallest 2 ** (k / 4) giving at most `bins` bins over
+the window's range. The grid is therefore a function of the bars alone,
+whoever builds it. A VolumeProfile adds a new bar to its bins (padding the
+grid when price leaves it), subtracts the bars that leave the lookback
+from the bins they went into, and trims empty edges. When the window's
+range calls for another width, the kept bars are re-binned as a build
+would. The incremental histogram thus stays the rebuilt one.
+
+The scan feeds it its daily bars (main.fetch_bars, 3mo), so a profile is
+an approximation: spreading a day's volume evenly over its low-high range
+flattens the intraday shelves a 15m-bar profile would show. It is coarse
+by design; the same code takes 15m frames (ResamplingProvider base) for
+an exact-resolution profile, at ~26x the bars per symbol.
+"""
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+BINS = 50
+VALUE_AREA = 0.70
+STEPS = 4  # bin widths per octave
+
+
+@dataclass(slots=True)
+class Profile:
+    poc: float
+    vah: float
+    val: float
+    hvn: Tuple[float, ...]
+    lvn: Tuple[float, ...]
+    total_volume: float
+    bin_width: float
+
+    def to_dict(self) -> Dict:
+        return {
+            'poc': self.poc,
+            'vah': self.vah,
+            'val': self.val,
+            'hvn': list(self.hvn),
+            'lvn': list(self.lvn),
+            'total_volume': self.total_volume,
+            'bin_width': self.bin_width,
+        }
+
+
+# ============================================
+# HISTOGRAMS
+# ============================================
+
+def bin_width(low: np.ndarray, high: np.ndarray, bins: int = BINS) -> np.ndarray:
+    """Lattice width for price ranges [low, high]: at most `bins` bins each"""
+    # A flat range still needs a non-zero bin
+    raw = np.maximum((high - low) / bins, np.maximum(np.abs(low), 1.0) * 1e-6)
+    return 2.0 ** (np.ceil(np.log2(raw) * STEPS) / STEPS)
+
+
+def histograms(high: np.ndarray, low: np.ndarray, volume: np.ndarray,
+               bins: int = BINS) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (symbols x bars) arrays, NaN = no bar -> (symbols x bins + 2) volume,
+    lattice index of the first bin and bin width per symbol, and each bar's
+    first lattice bin and number of bins covered (symbols x bars, 0 bins
+    for a missing bar)
+    """
+    count = high.shape[0]
+    valid = ~(np.isnan(high) | np.isnan(low) | np.isnan(volume))
+    with np.errstate(invalid='ignore'):
+        bottom = np.nanmin(np.where(valid, low, np.nan), axis=1, initial=np.inf)
+        top = np.nanmax(np.where(valid, high, np.nan), axis=1, initial=-np.inf)
+    empty = ~np.isfinite(bottom)
+    width = bin_width(np.where(empty, 0.0, bottom), np.where(empty, 0.0, top), bins)
+
+    # Each bar's volume spread evenly over the lattice bins of its low-high range
+    with np.errstate(invalid='ignore'):
+        first = np.where(valid, np.floor(low / width[:, None]), 0).astype(np.int64)
+        last = np.where(valid, np.floor(high / width[:, None]), 0).astype(np.int64)
+    covered = np.where(valid, np.maximum(last - first + 1, 1), 0)
+    base = np.where(empty, 0, np.where(valid, first, np.iinfo(np.int64).max).min(axis=1))
+
+    columns = bins + 2  # widths round up: the range spans at most bins + 1 lattice bins
+    rows = np.broadcast_to(np.arange(count)[:, None], high.shape)[valid]
+    starts, spans = (first - base[:, None])[valid], covered[valid]
+    # One flat id per (bar, bin covered): symbol * columns + bin
+    offsets = np.repeat(rows * columns + starts - (np.cumsum(spans) - spans), spans)
+    flat = np.arange(int(spans.sum())) + offsets
+    volume_by_bin = np.bincount(flat, weights=np.repeat(volume[valid] / spans, spans),
+                                minlength=count * columns)
+    return volume_by_bin.reshape(count, columns), base, width, first, covered
+
+
+def summarize(volume: np.ndarray, origin: np.ndarray, width: np.ndarray, value_area: float = VALUE_AREA,
+              hvn_ratio: float = 1.5, lvn_ratio: float = 0.5) -> List[Optional[Profile]]:
+    """
+    (symbols x bins) histograms with the price of their first bin's lower
+    edge -> Profile per symbol (None without volume). Empty bins added on
+    either side never change the result.
+    """
+    count, bins = volume.shape
+    if not bins:
+        return [None] * count
+    total = volume.sum(axis=1)
+    # Shares of the total in 1e-9 steps: a bar spread over several bins gives
+    # them equal volume, and ties must not hinge on float residue
+    volume = np.round(volume * (1e9 / np.where(total > 0, total, 1.0))[:, None])
+    centre = origin[:, None] + (np.arange(bins) + 0.5) * width[:, None]
+    poc = np.take_along_axis(centre, volume.argmax(axis=1)[:, None], axis=1)[:, 0]
+
+    # Value area: biggest bins first until value_area of the volume is in
+    order = np.argsort(-volume, axis=1, kind='stable')
+    ranked = np.take_along_axis(volume, order, axis=1)
+    before = np.cumsum(ranked, axis=1) - ranked
+    inside = np.zeros_like(volume, dtype=bool)
+    np.put_along_axis(inside, order, (before < value_area * 1e9) & (ranked > 0), axis=1)
+    index = np.arange(bins)
+    vah = origin + (np.where(inside, index, -1).max(axis=1) + 1) * width
+    val = origin + np.where(inside, index, bins).min(axis=1) * width
+
+    # Nodes on the smoothed histogram; the bins just outside the grid are
+    # smoothed from zero volume like any other empty bin
+    padded = np.pad(volume, ((0, 0), (2, 2)))
+    smoothed = (padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]) / 3
+    smooth, left, right = smoothed[:, 1:-1], smoothed[:, :-2], smoothed[:, 2:]
+    traded = volume > 0
+    mean = volume.sum(axis=1) / np.maximum(traded.sum(axis=1), 1)
+    # Low volume nodes only strictly between the first and last traded bin
+    interior = (index > traded.argmax(axis=1)[:, None]) & \
+        (index < bins - 1 - traded[:, ::-1].argmax(axis=1)[:, None])
+    hvn = (smooth > left) & (smooth >= right) & (smooth >= hvn_ratio * mean[:, None])
+    lvn = interior & (smooth < left) & (smooth <= right) & (smooth <= lvn_ratio * mean[:, None])
+
+    profiles = []
+    for i in range(count):
+        if total[i] <= 0:
+            profiles.append(None)
+            continue
+        profiles.append(Profile(
+            poc=float(poc[i]), vah=float(vah[i]), val=float(val[i]),
+            hvn=tuple(centre[i, hvn[i]].tolist()), lvn=tuple(centre[i, lvn[i]].tolist()),
+            total_volume=float(total[i]), bin_width=float(width[i]),
+        ))
+    return profiles
+
+
+# ============================================
+# INCREMENTAL PROFILE
+# ============================================
+
+class VolumeProfile:
+    """One symbol's histogram over lattice bins base .. base + len(volume) - 1"""
+
+    __slots__ = ('width', 'base', 'volume', 'counts', 'bars', 'dirty')
+
+    def __init__(self, width: float, base: int, volume: np.ndarray, counts: np.ndarray, bars: deque):
+        self.width = width
+        self.base = base
+        self.volume = volume
+        self.counts = counts  # bars covering each bin: 0 means exactly empty
+        # (timestamp, high, low, volume, first lattice bin, bins covered), oldest first
+        self.bars = bars
+        self.dirty = True  # bars changed since the last settle()
+
+    @property
+    def origin(self) -> float:
+        return self.base * self.width
+
+    def _pad(self, first: int, last: int):
+        below = max(self.base - first, 0)
+        above = max(last - (self.base + len(self.volume) - 1), 0)
+        if below or above:
+            self.volume = np.pad(self.volume, (below, above))
+            self.counts = np.pad(self.counts, (below, above))
+            self.base -= below
+
+    def _remove(self, bar: tuple):
+        _, _, _, volume, first, covered = bar
+        if covered:
+            start = first - self.base
+            self.volume[start:start + covered] -= volume / covered
+            self.counts[start:start + covered] -= 1
+            self.dirty = True
+
+    def append(self, timestamp: int, high: float, low: float, volume: float):
+        first = covered = 0
+        # Missing bars are kept (they hold their timestamp) but never binned
+        if math.isfinite(high) and math.isfinite(low) and math.isfinite(volume):
+            first = math.floor(low / self.width)
+            covered = max(math.floor(high / self.width) - first + 1, 1)
+            self._pad(first, first + covered - 1)
+            start = first - self.base
+            self.volume[start:start + covered] += volume / covered
+            self.counts[start:start + covered] += 1
+            self.dirty = True
+        self.bars.append((timestamp, high, low, volume, first, covered))
+
+    def replace_last(self, high: float, low: float, volume: float):
+        """The last bar was updated in place (today's bar still forming)"""
+        bar = self.bars.pop()
+        self._remove(bar)
+        self.append(bar[0], high, low, volume)
+
+    def expire(self, oldest: int):
+        """Drop bars older than `oldest`"""
+        while self.bars and self.bars[0][0] < oldest:
+            self._remove(self.bars.popleft())
+
+    def settle(self, bins: int) -> bool:
+        """
+        Clear float residue and trim empty edges; False when the kept bars
+        call for another bin width (re-bin them)
+        """
+        if not self.dirty:
+            return True
+        self.dirty = False
+        self.volume[self.counts == 0] = 0.0
+        _, high, low, _, _, covered = zip(*self.bars)
+        binned = np.array(covered) > 0
+        if not binned.any():
+            return True
+        low, high = np.array(low)[binned].min(), np.array(high)[binned].max()
+        if bin_width(low, high, bins) != self.width:
+            return False
+        used = np.flatnonzero(self.counts)
+        if used[0] or used[-1] < len(self.volume) - 1:
+            self.volume = self.volume[used[0]:used[-1] + 1].copy()
+            self.counts = self.counts[used[0]:used[-1] + 1].copy()
+            self.base += int(used[0])
+        return True
+
+    def columns(self) -> tuple:
+        """The kept bars as (timestamps, high, low, volume) arrays, for a re-bin"""
+        ts, high, low, volume, _, _ = zip(*self.bars)
+        return (np.array(ts, dtype=np.int64), np.array(high, dtype=np.float64),
+                np.array(low, dtype=np.float64), np.array(volume, dtype=np.float64))
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return self.bars[-1][0] if self.bars else None
+
+
+# ============================================
+# ENGINE
+# ============================================
+
+def _columns(df: "pd.DataFrame", start: int):
+    return (df.index.asi8[start:], df['High'].to_numpy(dtype=np.float64)[start:],
+            df['Low'].to_numpy(dtype=np.float64)[start:], df['Volume'].to_numpy(dtype=np.float64)[start:])
+
+
+class ProfileEngine:
+    """
+    Profiles per (symbol, interval) over the last `lookback` bars. New
+    frames are built in one batch; frames that only gained bars (or whose
+    last bar changed) since the last call are updated in place from their
+    new rows, and re-binned in that same batch when their range calls for
+    another bin width.
+    """
+
+    def __init__(self, bins: int = BINS, lookback: int = 120, value_area: float = VALUE_AREA):
+        self.bins = bins
+        self.lookback = lookback
+        self.value_area = value_area
+        self._cache: Dict[Hashable, VolumeProfile] = {}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.updated = 0
+        self.rebinned = 0
+
+    def _update(self, profile: VolumeProfile, df: "pd.DataFrame") -> bool:
+        """Apply the frame's new bars in place; False when it needs a rebuild"""
+        ts = df.index.asi8
+        last = profile.last_timestamp
+        if last is None or ts[-1] < last:
+            return False
+        at = int(np.searchsorted(ts, last))
+        if at == len(ts) or ts[at] != last or ts[max(len(ts) - self.lookback, 0)] < profile.bars[0][0]:
+            return False
+        _, high, low, volume = _columns(df, at)
+        if (high[0], low[0], volume[0]) != profile.bars[-1][1:4]:
+            profile.replace_last(float(high[0]), float(low[0]), float(volume[0]))
+        for i in range(1, len(high)):
+            profile.append(int(ts[at + i]), float(high[i]), float(low[i]), float(volume[i]))
+        profile.expire(int(ts[max(len(ts) - self.lookback, 0)]))
+        return True
+
+    def build(self, columns: List[tuple]) -> List[VolumeProfile]:
+        """Fresh profiles for many frames in one bincount"""
+        if not columns:
+            return []
+        shape = (len(columns), max(len(c[0]) for c in columns))
+        high, low, volume = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+        for i, (_, h, l, v) in enumerate(columns):
+            if len(h):
+                high[i, -len(h):], low[i, -len(h):], volume[i, -len(h):] = h, l, v
+        by_bin, base, width, first, covered = histograms(high, low, volume, self.bins)
+        profiles = []
+        for i, (ts, h, l, v) in enumerate(columns):
+            firsts, spans = first[i, shape[1] - len(ts):], covered[i, shape[1] - len(ts):]
+            counts = np.zeros(by_bin.shape[1], dtype=np.int64)
+            for start, span in zip((firsts - base[i]).tolist(), spans.tolist()):
+                counts[start:start + span] += 1
+            profile = VolumeProfile(float(width[i]), int(base[i]), by_bin[i].copy(), counts,
+                                    deque(zip(ts.tolist(), h.tolist(), l.tolist(), v.tolist(),
+                                              firsts.tolist(), spans.tolist())))
+            profile.settle(self.bins)
+            profiles.append(profile)
+        return profiles
+
+    def histograms(self, frames: Dict[str, "pd.DataFrame"], interval: str = '1d') -> Dict[str, VolumeProfile]:
+        out, stale = {}, []
+        with self._lock:
+            for symbol, df in frames.items():
+                if df is None or df.empty:
+                    continue
+                profile = self._cache.get((symbol, interval))
+                if profile is None or not self._update(profile, df):
+                    stale.append((symbol, _columns(df, max(len(df) - self.lookback, 0))))
+                elif not profile.settle(self.bins):
+                    stale.append((symbol, profile.columns()))
+                    self.rebinned += 1
+                else:
+                    out[symbol] = profile
+                    self.updated += 1
+            for (symbol, _), profile in zip(stale, self.build([c for _, c in stale])):
+                self._cache[(symbol, interval)] = profile
+                out[symbol] = profile
+            self.built += len(stale)
+        return out
+
+    def profiles(self, frames: Dict[str, "pd.DataFrame"], interval: str = '1d') -> Dict[str, Profile]:
+        """Profile per symbol, summarized in one pass"""
+        current = self.histograms(frames, interval)
+        symbols = list(current)
+        if not symbols:
+            return {}
+        with self._lock:
+            width = max(len(current[s].volume) for s in symbols)
+            volume = np.zeros((len(symbols), width))
+            for i, symbol in enumerate(symbols):
+                volume[i, :len(current[symbol].volume)] = current[symbol].volume
+            origin = np.array([current[s].origin for s in symbols])
+            bin_widths = np.array([current[s].width for s in symbols])
+        summaries = summarize(volume, origin, bin_widths, self.value_area)
+        return {symbol: profile for symbol, profile in zip(symbols, summaries) if profile is not None}
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == symbol]:
+                    del self._cache[key]
+
+
+PROFILES = ProfileEngine()
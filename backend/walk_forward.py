@@ -0,0 +1,242 @@
+"""
+🥓 Walk-Forward Evaluation
+Rolling train/test windows over the feature store, one process per fold,
+scored per window and per market (hit rate + calibration).
+
+Fully offline: reads only the feature store (python feature_store.py backfill).
+Unchanged folds are served from a cache on reruns.
+
+Run:  python walk_forward.py --train-days 730 --test-days 90
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_store import FeatureStore, STORE_DIR
+from markets import market_of
+from ml_engine import MLEngine, HORIZON, TARGET_RETURN
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).resolve().parent / "data" / "walk_forward"
+BUY_THRESHOLD = 0.55    # P(up) that ml_engine labels as BUY or better
+CALIBRATION_BINS = 10
+
+
+@dataclass(frozen=True)
+class Fold:
+    index: int
+    train_start: str
+    train_end: str
+    test_start: str
+    test_end: str
+
+
+def make_folds(start, end, train_days: int, test_days: int,
+               step_days: Optional[int] = None) -> List[Fold]:
+    """Rolling windows: train [t, t+train) then test [t+train, t+train+test), step = test"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    step = pd.Timedelta(days=step_days or test_days)
+    train, test = pd.Timedelta(days=train_days), pd.Timedelta(days=test_days)
+    one_ns = pd.Timedelta(1, 'ns')
+
+    folds, t = [], start
+    while t + train + test <= end + pd.Timedelta(days=1):
+        folds.append(Fold(
+            index=len(folds),
+            train_start=t.isoformat(),
+            train_end=(t + train - one_ns).isoformat(),
+            test_start=(t + train).isoformat(),
+            test_end=(t + train + test - one_ns).isoformat(),
+        ))
+        t += step
+    return folds
+
+
+# ============================================
+# METRICS
+# ============================================
+
+def evaluate(proba: np.ndarray, y: np.ndarray) -> Dict:
+    """Hit rate of BUY calls, accuracy, Brier score and a reliability table"""
+    if len(y) == 0:
+        return {'rows': 0}
+
+    calls = proba >= BUY_THRESHOLD
+    bins = np.minimum((proba * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    counts = np.bincount(bins, minlength=CALIBRATION_BINS)
+    predicted = np.bincount(bins, weights=proba, minlength=CALIBRATION_BINS)
+    observed = np.bincount(bins, weights=y, minlength=CALIBRATION_BINS)
+    nonzero = counts > 0
+
+    return {
+        'rows': int(len(y)),
+        'base_rate': round(float(y.mean()), 4),
+        'signals': int(calls.sum()),
+        'hit_rate': round(float(y[calls].mean()), 4) if calls.any() else None,
+        'accuracy': round(float(((proba >= 0.5) == (y == 1)).mean()), 4),
+        'brier': round(float(np.mean((proba - y) ** 2)), 4),
+        'calibration': [
+            {'bin': f"{i / CALIBRATION_BINS:.1f}-{(i + 1) / CALIBRATION_BINS:.1f}",
+             'count': int(counts[i]),
+             'predicted': round(float(predicted[i] / counts[i]), 4),
+             'observed': round(float(observed[i] / counts[i]), 4)}
+            for i in np.flatnonzero(nonzero)
+        ],
+    }
+
+
+# ============================================
+# FOLDS
+# ============================================
+
+def fold_key(fold: Fold, store: FeatureStore, symbols: List[str], params: Dict) -> str:
+    """Hash of the fold window, parameters and the bars inside the window"""
+    digest = hashlib.sha1(json.dumps([asdict(fold), params], sort_keys=True).encode())
+    for symbol in symbols:
+        ts, cols = store.read(symbol, ['close'], fold.train_start, fold.test_end)
+        digest.update(symbol.encode())
+        if len(ts):
+            digest.update(np.array([len(ts), ts[0], ts[-1]], dtype=np.int64).tobytes())
+            digest.update(np.float64(cols['close'].sum()).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def run_fold(fold: Fold, store_root: str, symbols_by_market: Dict[str, List[str]], params: Dict) -> Dict:
+    """Train on the fold's train window, score its test window (runs in a worker)"""
+    store = FeatureStore(store_root)
+    symbols = [s for group in symbols_by_market.values() for s in group]
+    horizon, target = params['horizon'], params['target']
+
+    # Labels need `horizon` future closes inside the slice, so the last
+    # training rows are dropped automatically: no look-ahead into the test set.
+    X, y, ts = store.training_set(symbols, horizon, target, fold.train_start, fold.train_end)
+    if len(np.unique(y)) < 2:
+        # A one-class forest has no P(up) column; walk_forward() skips the fold
+        raise ValueError(f"train window has a single class ({int(y[0])})")
+    engine = MLEngine.fit(X, y, ts, horizon=horizon, target=target, symbols=len(symbols),
+                          n_estimators=params['n_estimators'], holdout=0, n_jobs=1)
+
+    report = {'fold': asdict(fold), 'train_rows': int(len(y)), 'markets': {}}
+    all_proba, all_y = [], []
+    for market, group in symbols_by_market.items():
+        try:
+            Xt, yt, _ = store.training_set(group, horizon, target, fold.test_start, fold.test_end)
+        except ValueError:
+            continue
+        proba = engine.predict_proba(Xt)
+        report['markets'][market] = evaluate(proba, yt)
+        all_proba.append(proba)
+        all_y.append(yt)
+
+    if all_proba:
+        report['overall'] = evaluate(np.concatenate(all_proba), np.concatenate(all_y))
+    return report
+
+
+def walk_forward(folds: List[Fold], store: FeatureStore, symbols: List[str],
+                 horizon: int = HORIZON, target: float = TARGET_RETURN,
+                 n_estimators: int = 200, workers: Optional[int] = None,
+                 cache_dir: Path = CACHE_DIR) -> List[Dict]:
+    """Evaluate every fold (cached folds are skipped), in fold order"""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    params = {'horizon': horizon, 'target': target, 'n_estimators': n_estimators}
+
+    symbols_by_market: Dict[str, List[str]] = {}
+    for symbol in symbols:
+        symbols_by_market.setdefault(market_of(symbol), []).append(symbol)
+
+    reports: Dict[int, Dict] = {}
+    pending = []
+    for fold in folds:
+        key = fold_key(fold, store, symbols, params)
+        path = cache_dir / f"fold_{key}.json"
+        if path.exists():
+            reports[fold.index] = json.loads(path.read_text())
+            reports[fold.index]['cached'] = True
+        else:
+            pending.append((fold, path))
+
+    print(f"🧮 {len(folds)} folds: {len(folds) - len(pending)} cached, {len(pending)} to train")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(run_fold, fold, str(store.root), symbols_by_market, params): (fold, path)
+            for fold, path in pending
+        }
+        for future in as_completed(futures):
+            fold, path = futures[future]
+            try:
+                report = future.result()
+            except ValueError as e:
+                logger.warning(f"Fold {fold.index} skipped: {e}")
+                continue
+            path.write_text(json.dumps(report, indent=2))
+            report['cached'] = False
+            reports[fold.index] = report
+            print(f"  ✅ fold {fold.index} ({fold.test_start[:10]} → {fold.test_end[:10]})")
+
+    return [reports[i] for i in sorted(reports)]
+
+
+def print_report(reports: List[Dict]):
+    print(f"\n{'fold':>4} {'test window':23} {'market':8} {'rows':>7} {'signals':>8} "
+          f"{'hit rate':>9} {'base':>6} {'brier':>7}")
+    for report in reports:
+        window = f"{report['fold']['test_start'][:10]} → {report['fold']['test_end'][:10]}"
+        rows = dict(report['markets'], **({'ALL': report['overall']} if 'overall' in report else {}))
+        for market, m in rows.items():
+            hit = f"{m['hit_rate']:.1%}" if m.get('hit_rate') is not None else "-"
+            print(f"{report['fold']['index']:>4} {window:23} {market:8} {m['rows']:>7} "
+                  f"{m.get('signals', 0):>8} {hit:>9} {m.get('base_rate', 0):>6.1%} {m.get('brier', 0):>7.4f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from markets import all_symbols
+
+    parser = argparse.ArgumentParser(description="Walk-forward training and evaluation")
+    parser.add_argument("symbols", nargs="*", help="defaults to every market in markets.py")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--start", help="first train day (default: first stored bar)")
+    parser.add_argument("--end", help="last test day (default: last stored bar)")
+    parser.add_argument("--train-days", type=int, default=730)
+    parser.add_argument("--test-days", type=int, default=90)
+    parser.add_argument("--step-days", type=int)
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--target", type=float, default=TARGET_RETURN)
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", default=str(CACHE_DIR / "report.json"))
+    args = parser.parse_args()
+
+    store = FeatureStore(args.store)
+    symbols = [s for s in (args.symbols or all_symbols()) if store.rows(s)]
+    if not symbols:
+        raise SystemExit("❌ Feature store is empty - run: python feature_store.py backfill")
+
+    bounds = [store.read(s, [])[0] for s in symbols]
+    start = pd.Timestamp(args.start or min(int(ts[0]) for ts in bounds), tz='UTC')
+    end = pd.Timestamp(args.end or max(int(ts[-1]) for ts in bounds), tz='UTC')
+
+    folds = make_folds(start, end, args.train_days, args.test_days, args.step_days)
+    t0 = time.perf_counter()
+    reports = walk_forward(folds, store, symbols, args.horizon, args.target,
+                           args.n_estimators, args.workers)
+    print_report(reports)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(reports, indent=2))
+    print(f"\n⏱️  {time.perf_counter() - t0:.1f}s - report saved to {args.output}")
@@ -0,0 +1,148 @@
+"""
+🥓 Watchlists
+Inverted index over every active user watchlist (symbol -> subscribers).
+A scan cycle covers the de-duplicated union of all lists once, then each
+result is fanned out to the symbol's subscribers, so fetch and compute cost
+grows with unique symbols, not with users.
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+MAX_SYMBOLS_PER_LIST = int(os.getenv("BACON_WATCHLIST_MAX_SYMBOLS", "100"))
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9^][A-Z0-9.\-=^]{0,14}$")
+
+
+def normalize_symbols(symbols: Iterable[str]) -> List[str]:
+    """Upper-cased, de-duplicated (order kept); ValueError on a bad symbol"""
+    out = []
+    for raw in symbols:
+        symbol = str(raw).strip().upper()
+        if not symbol or symbol in out:
+            continue
+        if not SYMBOL_PATTERN.match(symbol):
+            raise ValueError(f"Invalid symbol '{raw}'")
+        out.append(symbol)
+    if len(out) > MAX_SYMBOLS_PER_LIST:
+        raise ValueError(f"A watchlist holds at most {MAX_SYMBOLS_PER_LIST} symbols")
+    return out
+
+
+class WatchlistIndex:
+    """
+    Watchlists by id, a reference-counted symbol -> {user: lists} index and
+    each user's latest results. A user with the same symbol on two lists
+    is one subscriber.
+    """
+
+    def __init__(self):
+        self._lists: Dict[Any, Tuple[str, frozenset]] = {}
+        self._subscribers: Dict[str, Counter] = {}
+        self._feeds: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+    def _link(self, user_id: str, symbols: Iterable[str]):
+        for symbol in symbols:
+            self._subscribers.setdefault(symbol, Counter())[user_id] += 1
+
+    def _unlink(self, user_id: str, symbols: Iterable[str]):
+        for symbol in symbols:
+            users = self._subscribers.get(symbol)
+            if users is None:
+                continue
+            users[user_id] -= 1
+            if users[user_id] <= 0:
+                del users[user_id]
+                self._feeds.get(user_id, {}).pop(symbol, None)
+            if not users:
+                del self._subscribers[symbol]
+
+    def set_list(self, watchlist_id: Any, user_id: str, symbols: Iterable[str]):
+        symbols = frozenset(symbols)
+        with self._lock:
+            old = self._lists.get(watchlist_id)
+            if old is not None:
+                self._unlink(*old)
+            self._lists[watchlist_id] = (user_id, symbols)
+            self._link(user_id, symbols)
+
+    def remove_list(self, watchlist_id: Any):
+        with self._lock:
+            old = self._lists.pop(watchlist_id, None)
+            if old is not None:
+                self._unlink(*old)
+
+    def replace(self, watchlists: Iterable[Tuple[Any, str, Iterable[str]]], loaded_at: Optional[float] = None):
+        """Swap in the full set of active lists: (watchlist_id, user_id, symbols)"""
+        lists = {wid: (user, frozenset(symbols)) for wid, user, symbols in watchlists}
+        with self._lock:
+            self._lists = {}
+            self._subscribers = {}
+            for wid, (user, symbols) in lists.items():
+                self._lists[wid] = (user, symbols)
+                self._link(user, symbols)
+            users = {user for user, _ in lists.values()}
+            self._feeds = {user: {s: row for s, row in feed.items() if s in self._subscribers
+                                  and user in self._subscribers[s]}
+                           for user, feed in self._feeds.items() if user in users}
+            self.loaded_at = loaded_at
+
+    # ---------- queries ----------
+
+    def union(self) -> List[str]:
+        """Every symbol on at least one active list, once"""
+        with self._lock:
+            return sorted(self._subscribers)
+
+    def subscribers(self, symbol: str) -> Set[str]:
+        with self._lock:
+            return set(self._subscribers.get(symbol, ()))
+
+    def symbols_of(self, user_id: str) -> Set[str]:
+        with self._lock:
+            return {s for user, symbols in self._lists.values() if user == user_id for s in symbols}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "watchlists": len(self._lists),
+                "users": len({user for user, _ in self._lists.values()}),
+                "subscriptions": sum(len(users) for users in self._subscribers.values()),
+                "unique_symbols": len(self._subscribers),
+            }
+
+    # ---------- fan-out ----------
+
+    def fan_out(self, scanned: Iterable[str], results: Iterable[Any],
+                symbol_of: Callable[[Any], str] = lambda r: r.symbol) -> Dict[str, List[Any]]:
+        """
+        Route one cycle's results to subscribers. Scanned symbols without a
+        result leave the feeds of their subscribers. Returns {user: [new results]}.
+        """
+        by_symbol = {symbol_of(r): r for r in results}
+        delivered: Dict[str, List[Any]] = {}
+        with self._lock:
+            for symbol in scanned:
+                users = self._subscribers.get(symbol)
+                if not users:
+                    continue
+                result = by_symbol.get(symbol)
+                for user in users:
+                    feed = self._feeds.setdefault(user, {})
+                    if result is None:
+                        feed.pop(symbol, None)
+                    else:
+                        feed[symbol] = result
+                        delivered.setdefault(user, []).append(result)
+        return delivered
+
+    def feed(self, user_id: str) -> List[Any]:
+        with self._lock:
+            return list(self._feeds.get(user_id, {}).values())
+
+
+WATCHLISTS = WatchlistIndex()
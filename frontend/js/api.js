@@ -40,6 +40,33 @@ class BaconAPI {
         }
     }
     
+    async getConfluenceCodes() {
+        // Bit -> label table, fetched once; lets scans use ?labels=false
+        if (!this.confluenceCodes) {
+            try {
+                const response = await fetch(`${this.baseURL}/api/confluences`);
+                const data = await response.json();
+                this.confluenceCodes = data.codes;
+            } catch (error) {
+                console.error('API Error:', error);
+                return [];
+            }
+        }
+        return this.confluenceCodes;
+    }
+    
+    decodeConfluences(mask, params = [], codes = this.confluenceCodes || []) {
+        // Same order as the backend: ascending bit, params consumed in order
+        let next = 0;
+        return codes
+            .filter(code => mask & code.bit)
+            .sort((a, b) => a.bit - b.bit)
+            .map(code => {
+                if (!code.param || next >= params.length) return code.label.replace(/\{[^}]*\}/, '').trim();
+                return formatLabel(code.label, params[next++]);
+            });
+    }
+    
     connectWebSocket(onMessage) {
         const wsURL = this.baseURL.replace('https://', 'wss://');
         this.ws = new WebSocket(`${wsURL}/ws`);
@@ -64,5 +91,10 @@ class BaconAPI {
     }
 }
 
+// Fills a backend label template like "High Volume ({:.1f}x)"
+function formatLabel(template, value) {
+    return template.replace(/\{:\.(\d)f\}/, (_, digits) => Number(value).toFixed(Number(digits)));
+}
+
 // Export
 window.BaconAPI = BaconAPI;
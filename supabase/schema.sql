@@ -1,6 +1,7 @@
--- Create signals table
+-- Create signals table, range-partitioned by month on created_at
+-- (retention drops whole partitions; see backend/retention.py)
 CREATE TABLE signals (
-    id BIGSERIAL PRIMARY KEY,
+    id BIGSERIAL,
     symbol VARCHAR(10) NOT NULL,
     direction VARCHAR(4) NOT NULL,
     entry DECIMAL(10, 2) NOT NULL,
@@ -11,16 +12,124 @@ CREATE TABLE signals (
     total_score INTEGER NOT NULL,
     rsi DECIMAL(5, 2),
     volume_ratio DECIMAL(5, 2),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Monthly partitions: signals_pYYYY_MM holds [month, month + 1). Rows that
+-- landed in signals_default while their month had no partition would make
+-- CREATE ... PARTITION OF fail, so a missing month is built as a plain table,
+-- filled from the default partition, then attached. Run by the retention
+-- job; safe to also schedule on its own (e.g. pg_cron, daily).
+CREATE OR REPLACE FUNCTION ensure_signals_partitions(months_ahead INTEGER DEFAULT 2)
+RETURNS VOID AS $$
+DECLARE
+    month_start DATE;
+    part TEXT;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_start := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => i))::DATE;
+        part := 'signals_p' || to_char(month_start, 'YYYY_MM');
+        CONTINUE WHEN to_regclass(part) IS NOT NULL;
+        EXECUTE format('CREATE TABLE %I (LIKE signals INCLUDING DEFAULTS)', part);
+        IF to_regclass('signals_default') IS NOT NULL THEN
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM signals_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                month_start::TIMESTAMPTZ, (month_start + INTERVAL '1 month')::TIMESTAMPTZ, part
+            );
+        END IF;
+        EXECUTE format(
+            'ALTER TABLE signals ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            part,
+            month_start::TIMESTAMPTZ,
+            (month_start + INTERVAL '1 month')::TIMESTAMPTZ
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rows outside every monthly partition land here instead of failing
+CREATE TABLE signals_default PARTITION OF signals DEFAULT;
+SELECT ensure_signals_partitions(2);
 
 -- Index for faster queries
-CREATE INDEX idx_signals_created_at ON signals(created_at DESC);
 CREATE INDEX idx_signals_total_score ON signals(total_score DESC);
-CREATE INDEX idx_signals_symbol ON signals(symbol);
+
+-- Keyset pagination for the history API: every page is an index seek on
+-- (created_at, id) past the cursor, optionally under a symbol/direction
+-- prefix. total_score is included so score-range filters stay index-only.
+CREATE INDEX idx_signals_created_id ON signals(created_at DESC, id DESC) INCLUDE (total_score);
+CREATE INDEX idx_signals_symbol_created_id ON signals(symbol, created_at DESC, id DESC) INCLUDE (total_score);
+CREATE INDEX idx_signals_direction_created_id ON signals(direction, created_at DESC, id DESC) INCLUDE (total_score);
+
+-- Hourly and daily aggregates for stats; raw rows older than the retention
+-- window are compacted into these (backend/retention.py)
+CREATE TABLE signal_rollups (
+    granularity VARCHAR(4) NOT NULL,          -- 'hour' | 'day'
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    symbol VARCHAR(10) NOT NULL,
+    direction VARCHAR(4) NOT NULL,
+    signal_count INTEGER NOT NULL,
+    score_sum BIGINT NOT NULL,
+    score_max INTEGER NOT NULL,
+    tech_sum BIGINT NOT NULL,
+    social_sum BIGINT NOT NULL,
+    PRIMARY KEY (granularity, bucket_start, symbol, direction)
+);
+
+CREATE INDEX idx_signal_rollups_bucket ON signal_rollups(granularity, bucket_start DESC);
+
+-- Where the last retention run stopped: hours from rolled_until minus the
+-- grace period are recomputed, rows with a higher id are late arrivals
+CREATE TABLE signal_rollup_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    rolled_until TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_signal_id BIGINT NOT NULL
+);
+
+-- User watchlists: the scanner covers the union of active lists once per
+-- cycle and fans results out per subscriber (backend/watchlists.py)
+CREATE TABLE watchlists (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    name VARCHAR(50) NOT NULL DEFAULT 'Default',
+    symbols TEXT[] NOT NULL DEFAULT '{}',
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    UNIQUE (user_id, name)
+);
+
+CREATE INDEX idx_watchlists_user ON watchlists(user_id);
+CREATE INDEX idx_watchlists_active ON watchlists(id) WHERE active;
+CREATE INDEX idx_watchlists_symbols ON watchlists USING GIN (symbols);
+
+-- Alert rules, e.g. {"rsi_lt": 30, "volume_ratio_gt": 2} on a few symbols,
+-- on the user's watchlists, or on everything (backend/alerts.py)
+CREATE TABLE alert_rules (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    name VARCHAR(50) NOT NULL,
+    conditions JSONB NOT NULL,
+    symbols TEXT[],
+    watchlist BOOLEAN NOT NULL DEFAULT FALSE,
+    cooldown_seconds INTEGER NOT NULL DEFAULT 3600,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    UNIQUE (user_id, name)
+);
+
+CREATE INDEX idx_alert_rules_user ON alert_rules(user_id);
+CREATE INDEX idx_alert_rules_active ON alert_rules(id) WHERE active;
 
 -- Enable Row Level Security
 ALTER TABLE signals ENABLE ROW LEVEL SECURITY;
+ALTER TABLE signal_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE signal_rollup_state ENABLE ROW LEVEL SECURITY;
+ALTER TABLE watchlists ENABLE ROW LEVEL SECURITY;
+ALTER TABLE alert_rules ENABLE ROW LEVEL SECURITY;
 
 -- Allow public read
 CREATE POLICY "Public read access" ON signals
@@ -30,3 +139,17 @@ CREATE POLICY "Public read access" ON signals
 CREATE POLICY "Authenticated insert" ON signals
     FOR INSERT TO authenticated
     WITH CHECK (true);
+
+CREATE POLICY "Public read access" ON signal_rollups
+    FOR SELECT USING (true);
+
+-- Users manage their own watchlists (the scanner uses the service key)
+CREATE POLICY "Own watchlists" ON watchlists
+    FOR ALL TO authenticated
+    USING (auth.uid() = user_id)
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Own alert rules" ON alert_rules
+    FOR ALL TO authenticated
+    USING (auth.uid() = user_id)
+    WITH CHECK (auth.uid() = user_id);